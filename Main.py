@@ -1,5 +1,9 @@
 import sys
 import os
+import asyncio
+import inspect
+import threading
+import time
 
 # --- IMPORTS ---
 # It's good practice to group imports and sort them alphabetically
@@ -8,12 +12,12 @@ from SearchAL import search_al
 from SearchAR import search_ar
 from SearchAZ import search_az
 from SearchCA import search_ca
-from SearchCO import search_co
+from SearchCO import search_co, lookup_co_by_id
 from SearchCT import search_ct
 from SearchDE import search_de
 from SearchFL import search_fl
 from SearchGA import search_ga
-from SearchHI import search_hi
+from SearchHI import search_hi, lookup_hi_by_id
 from SearchIA import search_ia
 from SearchID import search_id
 from SearchIL import search_il
@@ -35,7 +39,7 @@ from SearchND import search_nd
 from SearchNE import search_ne
 from SearchNH import search_nh
 from SearchNJ import search_nj
-from SearchNY import search_ny
+from SearchNY import search_ny, lookup_ny_by_id
 from SearchNV import search_nv
 from SearchOH import search_oh
 from SearchOK import search_ok
@@ -55,6 +59,22 @@ from SearchWV import search_wv
 from SearchWY import search_wy
 
 import json
+from locator_index import get_locator_index
+from single_flight import NON_QUERY_ARGS, SingleFlight, flight_key
+from deadline import as_deadline, deadline_context
+from state_stats import get_state_stats, order_states
+from circuit_breaker import get_circuit_breakers
+from scraper_errors import AMBIGUOUS, INVALID_INPUT, NOT_FOUND, PARSE, PORTAL_FAILURES, UNAVAILABLE, classify
+from retry_policy import retry_policy, run_with_retries
+from telemetry import lookup_context
+from metrics import IN_FLIGHT, observe_cache, observe_lookup
+from traffic_capture import serve_replay
+from memory_profile import profile_lookup
+from cancellation import CancelScope, ScrapeCancelled, check_cancelled, current_scope, scope_context
+from search_cache import (
+    Revalidator, get_negative_cache, get_result_cache, is_not_found, mark_stale,
+    refresh_args, search_key, stale_while_revalidate_default,
+)
 
 # --- DISPATCH TABLE ---
 # This dictionary maps state codes directly to the functions that handle them.
@@ -113,9 +133,145 @@ STATE_SEARCH_FUNCTIONS = {
     # Add new states here - it's clean and easy!
 }
 
-def search_business_by_state(state_code, search_args):
+# --- LOOKUP BY ID ---
+# States whose detail record can be fetched straight from a filing number,
+# without going through the search form.
+STATE_ID_LOOKUP_FUNCTIONS = {
+    "co": lookup_co_by_id,
+    "hi": lookup_hi_by_id,
+    "ny": lookup_ny_by_id,
+}
+
+# States whose search function accepts "state_filing_number" but still runs it
+# through the portal's search form.
+STATES_WITH_FILING_NUMBER_SEARCH = {
+    "al", "ar", "ct", "de", "fl", "hi", "ky", "ma", "mn", "mo", "nc", "nj", "nm", "ny",
+}
+
+def id_lookup_capability(state_code):
+    """
+    Returns "direct" if the state can jump straight to the detail record for a
+    filing number, "search" if it has to use the search form, or None if the
+    state can only be searched by name.
+    """
+    state_code = state_code.lower()
+    if state_code in STATE_ID_LOOKUP_FUNCTIONS:
+        return "direct"
+    if state_code in STATES_WITH_FILING_NUMBER_SEARCH:
+        return "search"
+    return None
+
+def run_search_function(search_function, search_args):
+    """
+    Calls a search function, running it to completion if it is async. When
+    search_args carries a running "event_loop" (the search service), async
+    scrapers run on that loop so they can share its warm page pool.
+    """
+    check_cancelled()
+    deadline = search_args.get("deadline")
+    with deadline_context(deadline):
+        result = search_function(search_args)
+    if inspect.isawaitable(result):
+        scope = current_scope()
+        loop = search_args.get("event_loop")
+        if loop is not None and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(with_deadline(result, deadline), loop)
+            token = scope.register(future.cancel) if scope else None
+            try:
+                result = future.result()
+            finally:
+                if scope:
+                    scope.unregister(token)
+        else:
+            result = asyncio.run(cancel_with_scope(with_deadline(result, deadline), scope))
+    return result
+
+async def with_deadline(coro, deadline):
+    """Awaits coro with deadline current inside the task running it."""
+    with deadline_context(deadline):
+        return await coro
+
+async def cancel_with_scope(coro, scope):
+    """Awaits coro, cancelling it (so its browser is closed) if scope is cancelled."""
+    if scope is None:
+        return await coro
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    token = scope.register(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await coro
+    finally:
+        scope.unregister(token)
+
+def is_found(result):
+    """True if a search result holds a record rather than an error or an empty list."""
+    if isinstance(result, dict):
+        return "error" not in result
+    return bool(result)
+
+def lookup_business_by_id(state_code, filing_number, search_args=None):
+    """
+    Looks up a business by its state filing number. Uses the state's direct
+    detail lookup when it has one, otherwise the search form, then falls back
+    to a name search if search_args carries an entity_name.
+    """
+    state_code = state_code.lower()
+    if state_code not in STATE_SEARCH_FUNCTIONS:
+        return {"error": f"State {state_code.upper()} is not supported."}
+
+    search_args = dict(search_args or {}, state_filing_number=str(filing_number or "").strip())
+    # The ID lookup gets only the filing number (plus plumbing), so a search
+    # form that prefers a name can't ignore it
+    id_args = {k: v for k, v in search_args.items() if k in NON_QUERY_ARGS or k == "state_filing_number"}
+    capability = id_lookup_capability(state_code)
+
+    if capability is not None:
+        lookup = STATE_ID_LOOKUP_FUNCTIONS[state_code] if capability == "direct" else STATE_SEARCH_FUNCTIONS[state_code]
+        result = run_search_function(lookup, id_args)
+        if is_found(result) or not search_args.get("entity_name"):
+            return result
+
+    if search_args.get("entity_name"):
+        name_args = {k: v for k, v in search_args.items() if k != "state_filing_number"}
+        return run_search_function(STATE_SEARCH_FUNCTIONS[state_code], name_args)
+
+    return {"error": f"State {state_code.upper()} does not support lookup by filing number."}
+
+# --- DETAIL LOCATOR INDEX ---
+# States whose search function reports the detail locator it followed (via
+# search_args["on_locator"]) and accepts it back as search_args["detail_locator"].
+STATES_WITH_DETAIL_LOCATOR = {"ct", "fl", "hi", "mn", "mo", "ny"}
+
+def search_with_locator_index(state_code, search_function, search_args):
+    """
+    Name search that goes straight to the remembered detail page when this
+    (state, name) has been resolved before, and records the locator otherwise.
+    A remembered locator that no longer resolves (not found, or a page that
+    doesn't parse) is dropped and the normal search is run instead; other
+    errors, such as a timeout, are returned as they are for the retry layer,
+    keeping the locator.
+    """
+    index = get_locator_index()
+    entity_name = search_args.get("entity_name")
+    if index is None or not entity_name:
+        return run_search_function(search_function, search_args)
+
+    locator = index.get(state_code, entity_name)
+    if locator:
+        result = run_search_function(search_function, dict(search_args, detail_locator=locator))
+        if is_found(result) or classify(state_code, result) not in (NOT_FOUND, PARSE):
+            return result
+        index.forget(state_code, entity_name)
+
+    def on_locator(found):
+        index.put(state_code, entity_name, found)
+
+    return run_search_function(search_function, dict(search_args, on_locator=on_locator))
+
+def dispatch_search(state_code, search_args):
     """
     Looks up the state code in the dispatch table and calls the correct function.
+    Searches that carry a state_filing_number go through lookup_business_by_id.
     """
     state_code = state_code.lower()
     
@@ -123,12 +279,308 @@ def search_business_by_state(state_code, search_args):
     search_function = STATE_SEARCH_FUNCTIONS.get(state_code)
     
     if search_function:
+        filing_number = search_args.get("state_filing_number")
+        if filing_number:
+            return lookup_business_by_id(state_code, filing_number, search_args)
+        if state_code in STATES_WITH_DETAIL_LOCATOR:
+            return search_with_locator_index(state_code, search_function, search_args)
         # If the function was found, call it
-        return search_function(search_args)
+        return run_search_function(search_function, search_args)
     else:
         # If not found, return a consistent error dictionary
         return {"error": f"State {state_code.upper()} is not supported."}
 
+_single_flight = SingleFlight()
+
+def search_outcome(state_code, result):
+    if is_hit(state_code, result):
+        return "hit"
+    if is_not_found(state_code, result):
+        return "miss"
+    return "error"
+
+def dispatch_with_deadline(state_code, search_args):
+    """
+    Live dispatch under search_args["deadline"]: engines size their waits from
+    what is left of it, and once it runs out the scrape is cancelled (browser,
+    driver or Node process killed) and a deadline error is returned.
+    """
+    deadline = search_args.get("deadline")
+    if deadline is None:
+        return dispatch_search(state_code, search_args)
+    if deadline.expired:
+        return {"error": f"Deadline exceeded before the {state_code.upper()} search started.", "deadline_exceeded": True}
+
+    scope = current_scope() or CancelScope()
+    timer = threading.Timer(deadline.remaining(), scope.cancel)
+    timer.daemon = True
+    timer.start()
+    try:
+        with scope_context(scope):
+            result = dispatch_search(state_code, search_args)
+    except (ScrapeCancelled, asyncio.CancelledError):
+        if not deadline.expired:
+            raise
+        result = None
+    finally:
+        timer.cancel()
+    if deadline.expired and not is_hit(state_code, result):
+        return {"error": f"{state_code.upper()} search exceeded its {deadline.seconds:g}s deadline.", "deadline_exceeded": True}
+    return result
+
+def timed_dispatch(state_code, search_args):
+    """
+    Live dispatch that records the state's latency and outcome for fan-out
+    ordering, as one telemetry lookup whose phase spans share its id (and,
+    with SOS_MEMORY_PROFILE set, one memory profile).
+    """
+    started = time.monotonic()
+    IN_FLIGHT.inc(state=state_code)
+    try:
+        with lookup_context(state_code) as current, profile_lookup(state_code):
+            result = dispatch_with_deadline(state_code, search_args)
+            outcome = search_outcome(state_code, result)
+            error_type = classify(state_code, result) if outcome == "error" else None
+            current.outcome = error_type or outcome
+            current.bytes = len(json.dumps(result, default=str))
+    finally:
+        IN_FLIGHT.dec(state=state_code)
+    elapsed = time.monotonic() - started
+    observe_lookup(state_code, elapsed, outcome, "dispatch", error_type)
+    stats = get_state_stats()
+    if stats:
+        stats.record(state_code, elapsed, outcome)
+    return result
+
+def guarded_dispatch(state_code, search_args):
+    """
+    Live dispatch behind the state's circuit breaker, with retries. While the
+    circuit is open the portal is not touched and an "unavailable" error comes
+    back at once. Transient errors are retried per retry_policy; the final
+    answer then feeds the breaker: portal failures (timeouts, network,
+    blocked, parse, internal) count towards opening it, anything else closes
+    it. Error results carry "error_type" and "retryable" (scraper_errors).
+    """
+    deadline = search_args.get("deadline")
+
+    def attempts():
+        return run_with_retries(
+            state_code, lambda: timed_dispatch(state_code, search_args), retry_policy(search_args), deadline
+        )
+
+    breakers = get_circuit_breakers()
+    if not breakers:
+        return attempts()
+    breaker = breakers.get(state_code)
+    if not breaker.allow():
+        return {
+            "error": f"State {state_code.upper()} portal is temporarily unavailable (circuit open).",
+            "error_type": UNAVAILABLE,
+            "retryable": False,
+            "unavailable": True,
+            "retry_after": round(breaker.retry_after(), 1),
+        }
+    try:
+        result = attempts()
+    except (ScrapeCancelled, asyncio.CancelledError):
+        breaker.release_probe()
+        raise
+    except Exception as e:
+        breaker.record_failure(type(e).__name__)
+        raise
+    error_type = classify(state_code, result)
+    if error_type in PORTAL_FAILURES:
+        breaker.record_failure(error_type)
+    elif error_type in (None, NOT_FOUND, AMBIGUOUS, INVALID_INPUT):
+        breaker.record_success()
+    else:
+        breaker.release_probe()
+    return result
+
+def search_business_by_state(state_code, search_args):
+    """
+    Cached entry point for a single-state search.
+
+    Found records are served from the result cache while fresh. Once expired,
+    with "stale_while_revalidate" in search_args (default from
+    SOS_STALE_WHILE_REVALIDATE) the last good record is returned at once,
+    marked "stale", and refreshed in the background; otherwise the caller
+    waits for a live search. Not-found answers are kept in the negative cache
+    for a shorter TTL. Pass "refresh": True to always hit the live portal.
+
+    "deadline" (seconds, or a deadline.Deadline) bounds the live search end to
+    end; see dispatch_with_deadline. "retries" and "hedge" tune the retry
+    policy (retry_policy.py).
+    """
+    state_code = state_code.lower()
+    if state_code not in STATE_SEARCH_FUNCTIONS:
+        return dispatch_search(state_code, search_args)
+    if search_args.get("deadline") is not None:
+        search_args = dict(search_args, deadline=as_deadline(search_args["deadline"]))
+
+    negative = get_negative_cache()
+    results = get_result_cache()
+    key = search_key(search_args)
+
+    if key and not search_args.get("refresh"):
+        if negative:
+            cached = negative.get(state_code, key)
+            observe_cache("negative", "miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+        hit = results.get(state_code, key) if results else None
+        if results:
+            observe_cache("result", "hit" if hit and hit[2] else "stale" if hit else "miss")
+        if hit:
+            cached, stored_at, is_fresh = hit
+            if is_fresh:
+                return cached
+            if search_args.get("stale_while_revalidate", stale_while_revalidate_default()):
+                get_revalidator().schedule(state_code, key, refresh_args(search_args))
+                return mark_stale(cached, stored_at)
+
+    # Identical lookups already running share that scrape instead of launching another.
+    result = _single_flight.do(
+        flight_key(state_code, search_args), lambda: guarded_dispatch(state_code, search_args),
+        shareable=lambda shared: not (isinstance(shared, dict) and shared.get("deadline_exceeded")),
+    )
+
+    if key:
+        if is_not_found(state_code, result):
+            if negative:
+                negative.put(state_code, key, result)
+            if results:
+                results.discard(state_code, key)
+        elif is_found(result):
+            if negative:
+                negative.discard(state_code, key)
+            if results:
+                results.put(state_code, key, result)
+    return result
+
+_revalidator = None
+_revalidator_lock = threading.Lock()
+
+def get_revalidator():
+    """Background refresher for stale records; refreshes run through search_business_by_state."""
+    global _revalidator
+    with _revalidator_lock:
+        if _revalidator is None:
+            _revalidator = Revalidator(search_business_by_state)
+        return _revalidator
+
+# --- STREAMING ---
+async def stream_search_states(state_codes, search_args, run=None, max_concurrency=10):
+    """
+    Async generator that searches several states concurrently and yields
+    {"state", "result", "elapsed"} for each one as soon as it finishes, so
+    fast states are not held back by slow ones.
+
+    run(state_code, search_args) is an async callable used to perform one
+    search; by default search_business_by_state runs in a worker thread.
+    Closing the generator early cancels the searches that have not finished.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    started = time.monotonic()
+
+    async def run_one(state_code):
+        async with semaphore:
+            try:
+                if run is not None:
+                    result = await run(state_code, dict(search_args))
+                else:
+                    result = await asyncio.to_thread(search_business_by_state, state_code, dict(search_args))
+            except Exception as e:
+                result = {"error": f"An unexpected error occurred: {e}"}
+        return {"state": state_code, "result": result, "elapsed": round(time.monotonic() - started, 3)}
+
+    # Slowest states first so they don't end up starting last
+    tasks = [asyncio.ensure_future(run_one(code)) for code in order_states(state_codes, "makespan")]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+# --- FIRST N HITS ---
+def is_hit(state_code, result):
+    """True if the result is a positive match for the entity in this state."""
+    return is_found(result) and not is_not_found(state_code, result)
+
+def search_in_scope(scope, state_code, search_args):
+    with scope_context(scope):
+        return search_business_by_state(state_code, search_args)
+
+async def search_first_hits(state_codes, search_args, hits=1, deadline=None, max_concurrency=10):
+    """
+    Searches states concurrently and returns as soon as `hits` states have
+    produced a positive match, or when `deadline` seconds have passed. Every
+    search still running at that point is cancelled: async scrapers are
+    cancelled on their loop, sync browsers and uc drivers are killed and Node
+    processes are terminated (see cancellation.py).
+
+    Returns {"hits": {state: result}, "misses": {state: result},
+             "cancelled": [states], "timed_out": bool, "elapsed": seconds}.
+    """
+    started = time.monotonic()
+    if deadline is not None:
+        # Engines size their own waits from the same budget
+        search_args = dict(search_args, deadline=as_deadline(deadline))
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Likely, cheap hits first: with limited concurrency they get the first slots
+    scopes = {code: CancelScope() for code in order_states(state_codes, "first_hits")}
+
+    async def run_one(state_code):
+        async with semaphore:
+            scope = scopes[state_code]
+            if scope.cancelled:
+                raise ScrapeCancelled()
+            try:
+                result = await asyncio.to_thread(search_in_scope, scope, state_code, dict(search_args))
+            except (ScrapeCancelled, asyncio.CancelledError):
+                raise
+            except Exception as e:
+                result = {"error": f"An unexpected error occurred: {e}"}
+            if scope.cancelled:
+                raise ScrapeCancelled()
+            return state_code, result
+
+    tasks = {asyncio.ensure_future(run_one(code)): code for code in scopes}
+    found, misses, timed_out = {}, {}, False
+    pending = set(tasks)
+    try:
+        while pending and len(found) < hits:
+            remaining = None if deadline is None else deadline - (time.monotonic() - started)
+            if remaining is not None and remaining <= 0:
+                timed_out = True
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                state_code, result = task.result()
+                if is_hit(state_code, result):
+                    found[state_code] = result
+                else:
+                    misses[state_code] = result
+    finally:
+        cancelled = sorted(tasks[task] for task in pending)
+        for task in pending:
+            scopes[tasks[task]].cancel()
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return {
+        "hits": found,
+        "misses": misses,
+        "cancelled": cancelled,
+        "timed_out": timed_out,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+
 def main():
     """
     Prompts the user for a state and entity name, then runs the search,
@@ -147,6 +599,7 @@ def main():
         print("Entity name cannot be empty.")
 
     print(f"\nSearching for '{entity_name_input}' in {state_code_input.upper()}...")
+    serve_replay()
     
     search_args = {
         "entity_name": entity_name_input,
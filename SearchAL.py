@@ -1,5 +1,7 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import re
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 # URLs for Alabama SOS searches
 AL_SEARCH_ID_URL = "https://arc-sos.state.al.us/CGI/corpnumber.mbr/input"
@@ -55,7 +57,7 @@ def search_al(search_args):
         return {"error": "Entity ID or entity name required for Alabama search."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = launch_chromium(p, "al", headless=True)
         page = browser.new_page()
         try:
             # --- Search by entity ID ---
@@ -63,12 +65,12 @@ def search_al(search_args):
                 page.goto(AL_SEARCH_ID_URL)
                 page.fill('input[name="corp"]', entity_id)
                 page.click('input[type="submit"]')
-                page.wait_for_load_state('domcontentloaded', timeout=10000)
+                page.wait_for_load_state('domcontentloaded', timeout=budget_ms(10000))
 
                 if "No matches found" in page.content():
                     return {"error": f"No results found for entity ID: {entity_id}"}
 
-                page.wait_for_selector("td.aiSosDetailDesc", timeout=5000)
+                page.wait_for_selector("td.aiSosDetailDesc", timeout=budget_ms(5000))
                 entity_name_found = page.locator("thead:first-of-type td.aiSosDetailHead").inner_text().strip()
                 detail = extract_al_detail(page)
                 return format_al_detail(entity_name_found, detail)
@@ -78,7 +80,7 @@ def search_al(search_args):
             page.fill('input[name="search"]', entity_name)
             page.select_option('select[name="type"]', "ALL")
             page.click('input[type="submit"]')
-            page.wait_for_load_state('domcontentloaded', timeout=10000)
+            page.wait_for_load_state('domcontentloaded', timeout=budget_ms(10000))
 
             if "No matches found" in page.content():
                 return {"error": f"No results found for entity name: {entity_name}"}
@@ -99,7 +101,7 @@ def search_al(search_args):
             # If one or more results are found, always process the first one.
             first_result = results[0]
             page.goto(first_result["link"])
-            page.wait_for_selector("td.aiSosDetailDesc", timeout=10000)
+            page.wait_for_selector("td.aiSosDetailDesc", timeout=budget_ms(10000))
 
             entity_name_found = page.locator("thead:first-of-type td.aiSosDetailHead").inner_text().strip()
             detail = extract_al_detail(page)
@@ -1,5 +1,7 @@
 from playwright.sync_api import sync_playwright, TimeoutError
 import time
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 SEARCH_URL = "https://www.ark.org/corp-search/index.php"
 
@@ -11,9 +13,9 @@ def search_ar(search_args, headless=True, max_results=5, slow_mo=0):
         return {"error": "Filing number or entity name required for Arkansas search."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless, slow_mo=slow_mo)
+        browser = launch_chromium(p, "ar", headless=headless, slow_mo=slow_mo)
         page = browser.new_page()
-        page.goto(SEARCH_URL, timeout=60000)
+        page.goto(SEARCH_URL, timeout=budget_ms(60000))
 
         # Fill the search form
         if filing_num:
@@ -26,17 +28,17 @@ def search_ar(search_args, headless=True, max_results=5, slow_mo=0):
 
         # Handle "No Results Found" alert quickly
         try:
-            page.wait_for_selector("div.alert.alert-danger:has-text('No Results Found')", timeout=3000)
+            page.wait_for_selector("div.alert.alert-danger:has-text('No Results Found')", timeout=budget_ms(3000))
             return {"error": "No valid results found."}
         except TimeoutError:
             pass
 
         # Wait for table rows or direct modal
         try:
-            page.wait_for_selector("table.dataTable-table tbody tr", timeout=8000)
+            page.wait_for_selector("table.dataTable-table tbody tr", timeout=budget_ms(8000))
         except TimeoutError:
             if _is_modal_open(page):
-                _wait_for_modal_ready(page, timeout=8000)
+                _wait_for_modal_ready(page, timeout=budget_ms(8000))
                 record = _extract_modal(page)
                 return record
             return {"error": "No results table or modal appeared."}
@@ -51,8 +53,8 @@ def search_ar(search_args, headless=True, max_results=5, slow_mo=0):
             row = rows.nth(i)
             label = _safe_first_cell_text(row)
             try:
-                _open_details_modal(page, row, timeout=15000, force_name_cell=True)
-                _wait_for_modal_ready(page, timeout=15000)
+                _open_details_modal(page, row, timeout=budget_ms(15000), force_name_cell=True)
+                _wait_for_modal_ready(page, timeout=budget_ms(15000))
                 record = _extract_modal(page)
                 if not record["entity_name"]:
                     record["entity_name"] = label
@@ -220,6 +222,6 @@ def _close_modal_if_open(page):
         except Exception:
             pass
     try:
-        page.locator("#modalBody, .modal-body").first.wait_for(state="hidden", timeout=5000)
+        page.locator("#modalBody, .modal-body").first.wait_for(state="hidden", timeout=budget_ms(5000))
     except TimeoutError:
         pass
@@ -2,6 +2,7 @@ const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 const fs = require('fs');
 const path = require('path');
+const { instrumentPage } = require('./telemetry');
 
 puppeteer.use(StealthPlugin());
 
@@ -18,10 +19,11 @@ const scrapeArizona = async (searchTerm, outputFilename) => {
     let browser;
     try {
         browser = await puppeteer.launch({
+            userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
             headless: 'new', // Set to 'new' for system integration
             args: ['--no-sandbox', '--disable-setuid-sandbox']
         });
-        const page = await browser.newPage();
+        const page = instrumentPage(await browser.newPage());
         page.setDefaultTimeout(60000); // 60-second timeout
         await page.setViewport({ width: 1365, height: 919 });
 
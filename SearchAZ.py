@@ -1,6 +1,7 @@
 import subprocess
 import json
 import os
+from node_runner import run_node_script
 
 def search_az(search_args):
     """
@@ -18,10 +19,7 @@ def search_az(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=120, shell=True # 2-minute timeout
-        )
+        run_node_script("az", command, timeout=120) # 2-minute timeout
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -1,6 +1,43 @@
 const { chromium } = require('playwright');
 const fs = require('fs');
 const path = require('path');
+const { instrumentPage } = require('./telemetry');
+
+// The results grid and details drawer are rendered from these XHR calls;
+// reading their JSON directly skips the rendering waits and DOM parsing.
+const SEARCH_API_PATTERN = /\/api\/Records\/businesssearch/i;
+const DETAIL_API_PATTERN = /\/api\/FilingDetail\/business\//i;
+const CAPTURE_ENABLED = process.env.SOS_CA_RESPONSE_CAPTURE !== '0';
+
+const captureJson = (page, pattern, timeout) => new Promise((resolve) => {
+    const timer = setTimeout(() => { page.off('response', onResponse); resolve(null); }, timeout);
+    const onResponse = async (response) => {
+        if (!pattern.test(response.url()) || response.request().method() === 'OPTIONS') return;
+        clearTimeout(timer);
+        page.off('response', onResponse);
+        try { resolve(await response.json()); } catch (e) { resolve(null); }
+    };
+    page.on('response', onResponse);
+});
+
+const recordFromCapture = (searchPayload, detailPayload) => {
+    const rows = searchPayload && searchPayload.rows ? Object.values(searchPayload.rows) : [];
+    const list = detailPayload && detailPayload.DRAWER_DETAIL_LIST;
+    if (!rows.length || !Array.isArray(list) || !list.length) return null;
+    const getDetail = (label) => { const item = list.find((d) => (d.LABEL || '').trim().toUpperCase() === label.toUpperCase()); return item && item.VALUE ? String(item.VALUE).trim().replace(/\s\s+/g, ' ') : null; };
+    const title = Array.isArray(rows[0].TITLE) ? rows[0].TITLE[0] : (rows[0].TITLE || '');
+    let entityName = title.trim(); let businessId = null;
+    const match = entityName.match(/^(.*?)\s*\(([A-Za-z0-9]+)\)$/);
+    if (match) { entityName = match[1].trim(); businessId = match[2].trim(); }
+    if (!businessId) { businessId = getDetail("File Number"); }
+    const entityStatus = getDetail("Status");
+    return {
+        "entity_name": entityName, "registration_date": getDetail("Initial Filing Date"), "entity_type": getDetail("Entity Type"),
+        "business_identification_number": businessId, "entity_status": entityStatus,
+        "statusActive": entityStatus ? entityStatus.toLowerCase().includes("active") : false,
+        "address": getDetail("Mailing Address") || getDetail("Principal Address"),
+    };
+};
 
 const scrapeCalifornia = async (searchTerm, outputFilename) => {
     if (!searchTerm || !outputFilename) {
@@ -14,26 +51,44 @@ const scrapeCalifornia = async (searchTerm, outputFilename) => {
 
     let browser = null;
     try {
-        browser = await chromium.launch({
+        const launchOptions = {
             headless: true,
             args: ['--no-sandbox', '--disable-setuid-sandbox'],
-        });
-        const context = await browser.newContext({
+        };
+        const contextOptions = {
             userAgent: 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             viewport: { width: 1366, height: 768 }
-        });
-        const page = await context.newPage();
+        };
+        // With the shared browser cache enabled, run on the persistent profile (see browser_cache.py)
+        const profileDir = process.env.SOS_BROWSER_PROFILE_DIR;
+        let context;
+        if (profileDir) {
+            context = await chromium.launchPersistentContext(profileDir, { ...launchOptions, ...contextOptions });
+            browser = context;
+        } else {
+            browser = await chromium.launch(launchOptions);
+            context = await browser.newContext(contextOptions);
+        }
+        const page = instrumentPage(await context.newPage());
         page.setDefaultTimeout(30000);
 
         await page.goto('https://bizfileonline.sos.ca.gov/search/business');
 
         await page.locator('input[placeholder="Search by name or file number"]').fill(searchTerm);
+        const searchJson = CAPTURE_ENABLED ? captureJson(page, SEARCH_API_PATTERN, 15000) : Promise.resolve(null);
         await page.locator("button.search-button").click();
 
         const firstResultLocator = page.locator("table > tbody > tr:first-child > td:first-child > div[role='button']");
         await firstResultLocator.waitFor({ state: 'visible', timeout: 15000 });
+        const detailJson = CAPTURE_ENABLED ? captureJson(page, DETAIL_API_PATTERN, 10000) : Promise.resolve(null);
         await firstResultLocator.click();
 
+        const captured = recordFromCapture(await searchJson, await detailJson);
+        if (captured) {
+            fs.writeFileSync(outputFilename, JSON.stringify([captured], null, 2));
+            return;
+        }
+
         await page.locator("div.drawer.show table.details-list").waitFor({ state: 'visible' });
         await page.locator("div.title-box").waitFor({ state: 'visible' });
         
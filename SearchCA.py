@@ -1,6 +1,7 @@
 import subprocess
 import json
 import os
+from node_runner import run_node_script
 
 def search_ca(search_args):
     """
@@ -16,12 +17,11 @@ def search_ca(search_args):
     output_filename = os.path.join(script_dir, 'california_output.json')
 
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
+    # The script reads results from the portal's JSON responses unless told not to
+    env = {"SOS_CA_RESPONSE_CAPTURE": "1" if search_args.get("capture", True) else "0"}
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=120, shell=True # 2-minute timeout
-        )
+        run_node_script("ca", command, timeout=120, extra_env=env) # 2-minute timeout
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -1,6 +1,65 @@
 from playwright.async_api import async_playwright
 import asyncio
 import os
+import time
+from browser_cache import launch_chromium
+from deadline import budget_ms
+from telemetry import span
+
+CO_DETAIL_BY_ID_URL = "https://www.coloradosos.gov/biz/BusinessEntityDetail.do?quitButtonDestination=BusinessEntityResults&nameTyp=ENT&masterFileId={}"
+
+async def extract_co_detail(page):
+    """Reads the entity record from a BusinessEntityDetail page."""
+    show_entity_selector = 'a:has-text("Show entity"):not(.leftnav)'
+    if await page.locator(show_entity_selector).count() > 0:
+        async with page.expect_navigation(wait_until="domcontentloaded"):
+            await page.locator(show_entity_selector).click()
+        await page.wait_for_selector("th.entity_conf_column_header_medium", state="visible")
+
+    async def get_text_by_header(header_texts):
+        for text in header_texts:
+            header = page.locator(f'//th[normalize-space(.)="{text}"]').first
+            if await header.count() > 0:
+                value = header.locator("xpath=./following-sibling::td[1]")
+                if await value.count() > 0:
+                    return await value.inner_text()
+        return ""
+
+    entity_status = await get_text_by_header(["Status"])
+    scraped_data = {
+        "entity_name": (await get_text_by_header(["Name", "Entity name", "Trade name"])).split(',')[0].strip(),
+        "entity_status": entity_status,
+        "registration_date": await get_text_by_header(["Formation date"]),
+        "business_identification_number": await get_text_by_header(["ID number"]),
+        "entity_type": await get_text_by_header(["Form"]),
+        "address": await get_text_by_header(["Principal office street address"]),
+    }
+    scraped_data["statusActive"] = "good standing" in scraped_data.get("entity_status", "").lower()
+    return scraped_data
+
+async def lookup_co_by_id(search_args):
+    """
+    Opens the detail page for a known Colorado ID number directly (the ID is
+    the page's masterFileId), skipping the name search.
+    """
+    id_number = str(search_args.get("state_filing_number") or "").strip()
+    if not id_number:
+        return {"error": "ID number is required for Colorado lookup by ID."}
+
+    async with async_playwright() as p:
+        browser = await launch_chromium(p, "co", headless=True)
+        page = await browser.new_page()
+        try:
+            await page.goto(CO_DETAIL_BY_ID_URL.format(id_number), wait_until="domcontentloaded", timeout=budget_ms(60000))
+            with span("co", "parse"):
+                scraped_data = await extract_co_detail(page)
+            if not scraped_data["business_identification_number"]:
+                return {"error": f"No entity found for Colorado ID number '{id_number}'."}
+            return [scraped_data]
+        except Exception as e:
+            return {"error": "An unexpected error occurred in CO lookup by ID.", "details": str(e)}
+        finally:
+            await browser.close()
 
 async def search_co(search_args):
     """
@@ -12,11 +71,11 @@ async def search_co(search_args):
         return {"error": "Entity name is required for Colorado search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "co", headless=True)
         page = await browser.new_page()
 
         try:
-            await page.goto("https://www.coloradosos.gov/biz/BusinessEntityCriteria.do", wait_until="load", timeout=60000)
+            await page.goto("https://www.coloradosos.gov/biz/BusinessEntityCriteria.do", wait_until="load", timeout=budget_ms(60000))
             await page.fill("#searchCriteria", entity_name)
             
             async with page.expect_navigation(wait_until="domcontentloaded"):
@@ -36,33 +95,8 @@ async def search_co(search_args):
             full_url = f"https://www.coloradosos.gov/biz/{href}"
             await page.goto(full_url, wait_until="domcontentloaded")
 
-            show_entity_selector = 'a:has-text("Show entity"):not(.leftnav)'
-            if await page.locator(show_entity_selector).count() > 0:
-                async with page.expect_navigation(wait_until="domcontentloaded"):
-                    await page.locator(show_entity_selector).click()
-                await page.wait_for_selector("th.entity_conf_column_header_medium", state="visible")
-
-            async def get_text_by_header(header_texts):
-                for text in header_texts:
-                    header = page.locator(f'//th[normalize-space(.)="{text}"]').first
-                    if await header.count() > 0:
-                        value = header.locator("xpath=./following-sibling::td[1]")
-                        if await value.count() > 0:
-                            return await value.inner_text()
-                return ""
-
-            entity_status = await get_text_by_header(["Status"])
-            scraped_data = {
-                "entity_name": (await get_text_by_header(["Name", "Entity name", "Trade name"])).split(',')[0].strip(),
-                "entity_status": entity_status,
-                "registration_date": await get_text_by_header(["Formation date"]),
-                "business_identification_number": await get_text_by_header(["ID number"]),
-                "entity_type": await get_text_by_header(["Form"]),
-                "address": await get_text_by_header(["Principal office street address"]),
-            }
-            scraped_data["statusActive"] = "good standing" in scraped_data.get("entity_status", "").lower()
-            
-            return [scraped_data]
+            with span("co", "parse"):
+                return [await extract_co_detail(page)]
 
         except Exception as e:
             error_dir = os.path.join(os.path.dirname(__file__), "errors")
@@ -74,4 +108,4 @@ async def search_co(search_args):
 
         finally:
             if browser:
-                await browser.close()
\ No newline at end of file
+                await browser.close()
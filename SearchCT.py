@@ -2,6 +2,11 @@ import requests
 import re
 import json
 from urllib.parse import urljoin
+from locator_index import report_locator
+from deadline import budget_s
+from telemetry import instrument_session, span
+from portal_urls import override_session
+from traffic_capture import capture_session
 
 CT_SEARCH_URL = "https://service.ct.gov/business/s/onlinebusinesssearch"
 CT_AURA_URL = "https://service.ct.gov/business/s/sfsites/aura"
@@ -88,7 +93,7 @@ def extract_from_html_or_scripts(session, base_url, html):
             continue
         full = src if src.startswith("http") else urljoin(base_url, src)
         try:
-            r = session.get(full, timeout=20)
+            r = session.get(full, timeout=budget_s(20))
             if r.status_code == 200 and r.text:
                 if not fwuid:
                     fwuid = try_extract_fwuid(r.text)
@@ -101,51 +106,8 @@ def extract_from_html_or_scripts(session, base_url, html):
 
     raise ValueError("Could not extract fwuid or app markup from initial HTML or scripts.")
 
-def search_ct(search_args):
-    """
-    Search Connecticut business registry by ALEI (state_filing_number) or entity name.
-    Returns a single, normalized details record.
-    """
-    alei = (search_args or {}).get("state_filing_number")
-    entity_name = (search_args or {}).get("entity_name")
-
-    if not alei and not entity_name:
-        return {"error": "Either ALEI or entity name required for Connecticut search."}
-
-    if alei:
-        search_string = alei.strip()
-        search_exact = False
-    else:
-        search_string = entity_name.strip()
-        search_exact = True
-
-    session = requests.Session()
-    session.headers.update({
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Connection": "keep-alive",
-    })
-
-    # Initial GET to retrieve fwuid/app markup
-    initial_resp = session.get(CT_SEARCH_URL, timeout=30)
-    if initial_resp.status_code != 200 or not initial_resp.text:
-        return {"error": f"Failed initial GET ({initial_resp.status_code})."}
-
-    try:
-        fwuid, app_markup = extract_from_html_or_scripts(session, "https://service.ct.gov", initial_resp.text)
-    except Exception as e:
-        return {"error": f"Failed to extract fwuid/app markup: {e}"}
-
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-        "Referer": CT_SEARCH_URL,
-        "Origin": "https://service.ct.gov",
-        "Accept": "*/*",
-        "User-Agent": session.headers["User-Agent"],
-    }
-
-    # Step 1: Search
+def search_ct_account(session, headers, fwuid, app_markup, search_string, search_exact, entity_name):
+    """Step 1: runs the registry search and returns the chosen result row (or an error dict)."""
     search_payload = {
         "message": json.dumps({
             "actions": [{
@@ -178,7 +140,7 @@ def search_ct(search_args):
         "aura.token": "null"
     }
 
-    r1 = session.post(f"{CT_AURA_URL}?r=12&aura.ApexAction.execute=1", headers=headers, data=search_payload, timeout=30)
+    r1 = session.post(f"{CT_AURA_URL}?r=12&aura.ApexAction.execute=1", headers=headers, data=search_payload, timeout=budget_s(30))
 
     try:
         data = r1.json()
@@ -218,9 +180,64 @@ def search_ct(search_args):
     if not result:
         return {"error": "Could not identify a primary result from the search list."}
 
-    account_id = result.get("accountId")
-    if not account_id:
-        return {"entity_name": result.get("businessName"), "error": "Missing accountId for details."}
+    return result
+
+def search_ct(search_args):
+    """
+    Search Connecticut business registry by ALEI (state_filing_number) or entity name.
+    Returns a single, normalized details record.
+    """
+    alei = (search_args or {}).get("state_filing_number")
+    entity_name = (search_args or {}).get("entity_name")
+
+    if not alei and not entity_name:
+        return {"error": "Either ALEI or entity name required for Connecticut search."}
+
+    if alei:
+        search_string = alei.strip()
+        search_exact = False
+    else:
+        search_string = entity_name.strip()
+        search_exact = True
+
+    session = capture_session("ct", instrument_session("ct", override_session(requests.Session())))
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0",
+        "Accept": "*/*",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Connection": "keep-alive",
+    })
+
+    # Initial GET to retrieve fwuid/app markup
+    initial_resp = session.get(CT_SEARCH_URL, timeout=budget_s(30))
+    if initial_resp.status_code != 200 or not initial_resp.text:
+        return {"error": f"Failed initial GET ({initial_resp.status_code})."}
+
+    try:
+        fwuid, app_markup = extract_from_html_or_scripts(session, "https://service.ct.gov", initial_resp.text)
+    except Exception as e:
+        return {"error": f"Failed to extract fwuid/app markup: {e}"}
+
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
+        "Referer": CT_SEARCH_URL,
+        "Origin": "https://service.ct.gov",
+        "Accept": "*/*",
+        "User-Agent": session.headers["User-Agent"],
+    }
+
+    # accountId remembered from an earlier search for this name skips step 1
+    account_id = None if alei else search_args.get("detail_locator")
+    if account_id:
+        result = {"businessName": entity_name, "accountId": account_id}
+    else:
+        result = search_ct_account(session, headers, fwuid, app_markup, search_string, search_exact, entity_name)
+        if "error" in result:
+            return result
+        account_id = result.get("accountId")
+        if not account_id:
+            return {"entity_name": result.get("businessName"), "error": "Missing accountId for details."}
+        report_locator(search_args, account_id)
 
     # Step 2: Fetch details for the selected account
     details_payload = {
@@ -250,7 +267,7 @@ def search_ct(search_args):
         "aura.token": "null"
     }
 
-    r2 = session.post(f"{CT_AURA_URL}?r=14&aura.ApexAction.execute=1", headers=headers, data=details_payload, timeout=30)
+    r2 = session.post(f"{CT_AURA_URL}?r=14&aura.ApexAction.execute=1", headers=headers, data=details_payload, timeout=budget_s(30))
 
     try:
         details = r2.json()
@@ -263,7 +280,8 @@ def search_ct(search_args):
 
     try:
         rv = details["actions"][0]["returnValue"]["returnValue"]
-        return parse_ct_business_details(rv, fallback_name=result.get("businessName"), html=r2.text)
+        with span("ct", "parse"):
+            return parse_ct_business_details(rv, fallback_name=result.get("businessName"), html=r2.text)
     except Exception as e:
         return parse_ct_business_details({}, fallback_name=result.get("businessName"), html=r2.text) | {
             "error": f"Error parsing business details: {e}",
@@ -1,4 +1,6 @@
 from playwright.sync_api import sync_playwright
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 def get_text_or_na(locator):
     """Return inner text if present, else 'N/A'."""
@@ -17,13 +19,13 @@ def search_de(search_args, headless=True):
         return {"error": "Entity ID or entity name is required for Delaware search."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
+        browser = launch_chromium(p, "de", headless=headless)
         page = browser.new_page()
 
         try:
             page.goto(
                 "https://icis.corp.delaware.gov/Ecorp/EntitySearch/NameSearch.aspx",
-                timeout=60000
+                timeout=budget_ms(60000)
             )
 
             # Fill search form
@@ -33,7 +35,7 @@ def search_de(search_args, headless=True):
                 page.fill('input[name="ctl00$ContentPlaceHolder1$frmEntityName"]', entity_name)
 
             page.click('input#ctl00_ContentPlaceHolder1_btnSubmit')
-            page.wait_for_selector("table#tblResults", timeout=30000)
+            page.wait_for_selector("table#tblResults", timeout=budget_ms(30000))
 
             rows = page.query_selector_all("table#tblResults tbody tr")
 
@@ -62,7 +64,7 @@ def search_de(search_args, headless=True):
                 return {"error": "Entity registration link not found in the selected result row."}
 
             entity_link.click()
-            page.wait_for_selector('span#ctl00_ContentPlaceHolder1_lblEntityName', timeout=15000)
+            page.wait_for_selector('span#ctl00_ContentPlaceHolder1_lblEntityName', timeout=budget_ms(15000))
 
             # Modular extraction
             def extract_field(selector):
@@ -1,4 +1,6 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from browser_cache import launch_chromium
+from locator_index import report_locator
 
 FL_FEI_SEARCH_URL = "https://search.sunbiz.org/Inquiry/CorporationSearch/ByFeiNumber"
 FL_NAME_SEARCH_URL = "https://search.sunbiz.org/Inquiry/CorporationSearch/ByName"
@@ -71,10 +73,20 @@ def search_fl(search_args, headless=True):
         return {"error": "Entity name or FEI/EIN is required for Florida search."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
+        browser = launch_chromium(p, "fl", headless=headless)
         page = browser.new_page()
 
         try:
+            # Detail page remembered from an earlier search for this name
+            detail_locator = search_args.get("detail_locator")
+            if detail_locator and not fei:
+                page.goto(detail_locator)
+                page.wait_for_load_state("networkidle")
+                detail_data = extract_detail_fields(page)
+                if detail_data["entity_name"] == "N/A":
+                    return {"error": f"No entity found at remembered detail page for '{entity_name}'."}
+                return detail_data
+
             # Determine which search to use
             if fei:
                 page.goto(FL_FEI_SEARCH_URL)
@@ -117,6 +129,8 @@ def search_fl(search_args, headless=True):
             if not target_result or not target_result.get("detail_url"):
                 return {"error": "Could not identify a result to scrape."}
 
+            report_locator(search_args, target_result["detail_url"])
+
             # Navigate to the chosen result's detail page and extract data.
             if page.url != target_result["detail_url"]:
                 page.goto(target_result["detail_url"])
@@ -6,6 +6,8 @@ from selenium.common.exceptions import TimeoutException
 import time
 import os
 import json
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 def search_ga(search_args):
     """
@@ -20,9 +22,9 @@ def search_ga(search_args):
     try:
         options = uc.ChromeOptions()
         options.page_load_strategy = 'eager'
-        driver = uc.Chrome(version_main=139, options=options)
+        driver = launch_uc_chrome(uc.Chrome, "ga", version_main=139, options=options)
         
-        wait = WebDriverWait(driver, 60)
+        wait = WebDriverWait(driver, budget_s(60))
 
         driver.get('https://ecorp.sos.ga.gov/businesssearch')
 
@@ -1,6 +1,11 @@
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+from locator_index import report_locator
+from deadline import budget_s
+from telemetry import span
+from portal_urls import portal_url
+from traffic_capture import capture_hooks
 
 # --- Constants ---
 DETAIL_URLS = {
@@ -60,10 +65,14 @@ def fetch_details(file_number):
         return None
     for detail_url in DETAIL_URLS.values():
         try:
-            resp = requests.get(f"{detail_url}?fileNumber={file_number}", timeout=15)
+            with span("hi", "detail") as current:
+                resp = requests.get(portal_url(f"{detail_url}?fileNumber={file_number}"), timeout=budget_s(15),
+                                    hooks=capture_hooks("hi"))
+                current.bytes = len(resp.content)
             if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, "html.parser")
-                details = extract_detail_data(soup)
+                with span("hi", "parse"):
+                    soup = BeautifulSoup(resp.text, "html.parser")
+                    details = extract_detail_data(soup)
                 # Ensure we got valid data before returning
                 if details and details.get("business_identification_number") != "N/A":
                     return details
@@ -71,6 +80,17 @@ def fetch_details(file_number):
             continue
     return None
 
+def lookup_hi_by_id(search_args):
+    """Fetches the detail page for a known file number, skipping the search API."""
+    file_number = str(search_args.get("state_filing_number") or "").strip()
+    if not file_number:
+        return {"error": "File number required for Hawaii lookup by ID."}
+
+    details = fetch_details(file_number)
+    if details:
+        return details
+    return {"error": f"No entity found for file number '{file_number}'."}
+
 # Main search function
 def search_hi(search_args):
     """Search Hawaii registry by filing number or entity name."""
@@ -80,12 +100,23 @@ def search_hi(search_args):
     if not filing_num and not entity_name:
         return {"error": "Filing number or entity name required for Hawaii search."}
 
+    # File number remembered from an earlier search for this name
+    detail_locator = search_args.get("detail_locator")
+    if detail_locator and not filing_num:
+        details = fetch_details(detail_locator)
+        if details:
+            return details
+        return {"error": f"No entity found for file number '{detail_locator}'."}
+
     search_term = filing_num or entity_name
     payload = {"search": search_term, "page": 1, "limit": 20}
     headers = {"Content-Type": "application/json"}
 
     try:
-        resp = requests.post(SEARCH_API, json=payload, headers=headers, timeout=15)
+        with span("hi", "search") as current:
+            resp = requests.post(portal_url(SEARCH_API), json=payload, headers=headers, timeout=budget_s(15),
+                                 hooks=capture_hooks("hi"))
+            current.bytes = len(resp.content)
         resp.raise_for_status()
         data = resp.json()
     except requests.RequestException as e:
@@ -104,6 +135,7 @@ def search_hi(search_args):
 
     if not file_number:
         return {"error": "Could not extract a file number from the top search result."}
+    report_locator(search_args, file_number)
     
     details = fetch_details(file_number)
     
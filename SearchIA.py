@@ -1,6 +1,7 @@
 import subprocess
 import json
 import os
+from node_runner import run_node_script
 
 def search_ia(search_args):
     """
@@ -18,10 +19,7 @@ def search_ia(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=180, shell=True
-        )
+        run_node_script("ia", command, timeout=180)
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -1,12 +1,15 @@
 import re
 import time
 from playwright.sync_api import sync_playwright
+from response_capture import ResponseCapture, search_rows, drawer_details
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 IDAHO_SEARCH_URL = "https://sosbiz.idaho.gov/search/business"
 
-def extract_details_from_drawer(page):
+def build_id_details(full_title, pairs):
     """
-    Extracts all entity details from the details drawer.
+    Builds the entity record from the drawer title and its (label, value) rows.
     This version includes the corrected address selection logic.
     """
     data = {
@@ -21,9 +24,8 @@ def extract_details_from_drawer(page):
         "agent_info": "N/A",
     }
 
-    title_element = page.query_selector("div.title-box h4")
-    if title_element:
-        full_title = title_element.inner_text().strip()
+    if full_title:
+        full_title = full_title.strip()
         match = re.search(r"^(.*?)\s*\(([A-Za-z0-9]+)\)$", full_title)
         if match:
             data["entity_name"] = match.group(1).strip()
@@ -32,14 +34,9 @@ def extract_details_from_drawer(page):
             data["entity_name"] = full_title
 
     principal_address, mailing_address, registrant_text = None, None, None
-    for row in page.query_selector_all("table.details-list tbody tr"):
-        label_el = row.query_selector("td.label")
-        value_el = row.query_selector("td.value")
-        if not label_el or not value_el:
-            continue
-        
-        label = label_el.inner_text().strip().upper()
-        value = value_el.inner_text().strip()
+    for label, value in pairs:
+        label = label.strip().upper()
+        value = value.strip()
 
         if label == "INITIAL FILING DATE":
             data["registration_date"] = value
@@ -81,24 +78,87 @@ def extract_details_from_drawer(page):
 
     return final_data
 
+def extract_details_from_drawer(page):
+    """Extracts all entity details from the rendered details drawer."""
+    title_element = page.query_selector("div.title-box h4")
+    pairs = []
+    for row in page.query_selector_all("table.details-list tbody tr"):
+        label_el = row.query_selector("td.label")
+        value_el = row.query_selector("td.value")
+        if not label_el or not value_el:
+            continue
+        pairs.append((label_el.inner_text(), value_el.inner_text()))
+    return build_id_details(title_element.inner_text() if title_element else None, pairs)
+
+def pick_target_index(names, search_term):
+    """
+    Returns the index of the row to open: the only row, an exact name match, or
+    the shortest name starting with the search term. None if nothing fits.
+    """
+    if len(names) == 1:
+        return 0
+
+    search_term_lower = search_term.lower()
+    potential_matches = []
+    for index, name in enumerate(names):
+        entity_name_lower = name.lower()
+        if entity_name_lower == search_term_lower:
+            return index
+        if entity_name_lower.startswith(search_term_lower):
+            potential_matches.append((name, index))
+
+    if potential_matches:
+        return min(potential_matches, key=lambda item: len(item[0]))[1]
+    return None
+
 def parse_entity_row_for_multiple_results(row):
     name_cell = row.query_selector("td:nth-child(1) > div > span.cell")
     full_text = name_cell.inner_text().strip() if name_cell else ""
     match = re.search(r"^(.*?)\s*\(([A-Za-z0-9]+)\)$", full_text)
     return {"entity_name": match.group(1).strip(), "file_number": match.group(2).strip()} if match else {"entity_name": full_text, "file_number": "N/A"}
 
+def search_id_via_capture(page, capture, search_term):
+    """
+    Reads the results and the chosen entity from the SPA's JSON responses.
+    Returns None if the JSON did not arrive so the caller can read the DOM.
+    """
+    rows = search_rows(capture.wait_for("search", timeout=budget_ms(15000)))
+    if not rows:
+        return None
+
+    index = pick_target_index([row["entity_name"] for row in rows], search_term)
+    if index is None:
+        return {
+            "error": f"Multiple results found for '{search_term}', but no suitable match was identified.",
+            "top_results": [{"entity_name": row["entity_name"], "file_number": row["file_number"]} for row in rows[:5]]
+        }
+
+    capture.clear("detail")
+    page.locator("div.table-wrapper table tbody tr").nth(index).locator("td div[role='button']").click()
+    details = drawer_details(capture.wait_for("detail", timeout=budget_ms(10000)))
+    if not details:
+        return None
+    target = rows[index]
+    return build_id_details(f"{target['entity_name']} ({target['file_number']})", details.items())
+
 def search_id(search_args):
+    """
+    Idaho search. By default the search and detail JSON the SPA fetches is
+    captured off the network and used directly; if it does not arrive (or
+    capture=False is passed in search_args) the rendered tables are read instead.
+    """
     entity_name = search_args.get("entity_name")
     if not entity_name:
         return {"error": "Entity name required for Idaho search."}
     search_term = entity_name
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = launch_chromium(p, "id", headless=True)
         context = browser.new_context(
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
         )
         page = context.new_page()
+        capture = ResponseCapture(page) if search_args.get("capture", True) else None
 
         try:
             page.goto(IDAHO_SEARCH_URL, wait_until="domcontentloaded")
@@ -109,8 +169,13 @@ def search_id(search_args):
 
             page.wait_for_function('document.querySelector("button.search-button")?.getAttribute("aria-disabled") === "false"')
             page.click("button.search-button")
-            
-            page.wait_for_selector("div.table-wrapper, div.empty-placeholder-wrapper", timeout=15000)
+
+            if capture:
+                captured = search_id_via_capture(page, capture, search_term)
+                if captured is not None:
+                    return captured
+
+            page.wait_for_selector("div.table-wrapper, div.empty-placeholder-wrapper", timeout=budget_ms(15000))
 
             if page.query_selector("div.empty-placeholder-wrapper"):
                 return {"error": f"No results found for '{search_term}'."}
@@ -119,38 +184,16 @@ def search_id(search_args):
             if not rows:
                 return {"error": f"No results found for '{search_term}'."}
 
-            target_row = None
-            if len(rows) == 1:
-                target_row = rows[0]
-            else:
-                search_term_lower = search_term.lower()
-                exact_match = None
-                potential_matches = []
-
-                for row in rows:
-                    parsed_data = parse_entity_row_for_multiple_results(row)
-                    entity_name_lower = parsed_data["entity_name"].lower()
-
-                    if entity_name_lower == search_term_lower:
-                        exact_match = row
-                        break
-                    
-                    if entity_name_lower.startswith(search_term_lower):
-                        potential_matches.append((parsed_data, row))
-
-                if exact_match:
-                    target_row = exact_match
-                elif potential_matches:
-                    best_match = min(potential_matches, key=lambda item: len(item[0]["entity_name"]))
-                    target_row = best_match[1]
+            index = pick_target_index([parse_entity_row_for_multiple_results(row)["entity_name"] for row in rows], search_term)
+            target_row = rows[index] if index is not None else None
 
             if target_row:
-                clickable = target_row.query_selector("td div[role='button']")
-                if not clickable:
-                    return {"error": "Business registration link not found in the target result row."}
-                
-                clickable.click()
-                page.wait_for_selector("div.drawer.show table.details-list tr.detail", timeout=10000)
+                if not page.query_selector("div.drawer.show table.details-list tr.detail"):
+                    clickable = target_row.query_selector("td div[role='button']")
+                    if not clickable:
+                        return {"error": "Business registration link not found in the target result row."}
+                    clickable.click()
+                page.wait_for_selector("div.drawer.show table.details-list tr.detail", timeout=budget_ms(10000))
                 
                 return extract_details_from_drawer(page)
             else:
@@ -162,4 +205,4 @@ def search_id(search_args):
         except Exception as e:
             return {"error": f"Idaho search error: {str(e)}"}
         finally:
-            browser.close()
\ No newline at end of file
+            browser.close()
@@ -11,6 +11,8 @@ import subprocess
 import vosk
 import requests
 import shutil
+from browser_cache import launch_uc_chrome
+from latency_stats import step_budget_s, timed_step
 
 # --- Configuration (Unchanged) ---
 VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
@@ -52,18 +54,20 @@ def search_il(search_args):
         options.page_load_strategy = 'eager'
         
         # Pass the new options to the driver
-        driver = uc.Chrome(version_main=139, options=options)
+        driver = launch_uc_chrome(uc.Chrome, "il", version_main=139, options=options)
         # --- END: OPTIMIZATION ---
 
-        wait = WebDriverWait(driver, 60)
+        def wait_for(step, condition):
+            with timed_step("il", step):
+                return WebDriverWait(driver, step_budget_s("il", step, 60)).until(condition)
 
         driver.get('https://apps.ilsos.gov/businessentitysearch/')
         
         # The script now relies on these specific waits, not the full page load
-        wait.until(EC.element_to_be_clickable((By.ID, 'partialWord'))).click()
+        wait_for("search", EC.element_to_be_clickable((By.ID, 'partialWord'))).click()
         
         search_input_selector = (By.ID, 'searchValue')
-        wait.until(EC.visibility_of_element_located(search_input_selector))
+        wait_for("search", EC.visibility_of_element_located(search_input_selector))
         search_input = driver.find_element(*search_input_selector)
         humanlike_type(search_input, entity_name_to_search)
         
@@ -72,7 +76,7 @@ def search_il(search_args):
 
         results_selector_str = 'table.table.table-striped'
         captcha_selector_str = 'iframe[title="reCAPTCHA"]'
-        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, f"{results_selector_str}, {captcha_selector_str}")))
+        wait_for("results", EC.presence_of_element_located((By.CSS_SELECTOR, f"{results_selector_str}, {captcha_selector_str}")))
 
         try:
             if driver.find_element(By.CSS_SELECTOR, captcha_selector_str).is_displayed():
@@ -80,11 +84,11 @@ def search_il(search_args):
         except:
              pass
 
-        first_result_link = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, f"{results_selector_str} > tbody > tr:nth-child(1) a")))
+        first_result_link = wait_for("results", EC.element_to_be_clickable((By.CSS_SELECTOR, f"{results_selector_str} > tbody > tr:nth-child(1) a")))
         first_result_link.click()
 
         details_page_selector = (By.XPATH, "//h4[contains(text(), 'Entity Information')]")
-        wait.until(EC.visibility_of_element_located(details_page_selector))
+        wait_for("detail", EC.visibility_of_element_located(details_page_selector))
 
         js_get_value_by_label = """
             const label = arguments[0];
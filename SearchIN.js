@@ -7,6 +7,7 @@ const path = require('path');
 const { exec } = require('child_process');
 const vosk = require('vosk');
 const axios = require('axios');
+const { instrumentPage } = require('./telemetry');
 
 // --- Configuration ---
 const VOSK_MODEL_PATH = path.join(__dirname, 'vosk-model-small-en-us-0.15');
@@ -34,12 +35,13 @@ const scrapeIndiana = async (searchTerm, outputFilename) => {
     let browser;
     try {
         browser = await puppeteer.launch({
+            userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
             headless: 'new',
             args: ['--no-sandbox', '--disable-setuid-sandbox', '--disable-blink-features=AutomationControlled', '--start-maximized'],
             ignoreDefaultArgs: ['--enable-automation']
         });
 
-        const page = await browser.newPage();
+        const page = instrumentPage(await browser.newPage());
         page.setDefaultTimeout(60000);
         await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36');
         await page.setViewport({ width: 1920, height: 1080 });
@@ -7,6 +7,7 @@ const path = require('path');
 const { exec } = require('child_process');
 const vosk = require('vosk');
 const axios = require('axios');
+const { instrumentPage } = require('./telemetry');
 
 // --- Configuration ---
 const VOSK_MODEL_PATH = path.join(__dirname, 'vosk-model-small-en-us-0.15');
@@ -30,11 +31,12 @@ const scrapeKansas = async (searchTerm, outputFilename) => {
     if (!fs.existsSync(ERROR_PATH)) fs.mkdirSync(ERROR_PATH);
 
     const browser = await puppeteer.launch({
+        userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
         headless: false,
         defaultViewport: null,
         args: ['--start-maximized', '--no-sandbox', '--disable-setuid-sandbox']
     });
-    const page = await browser.newPage();
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(60000);
 
     try {
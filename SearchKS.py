@@ -2,6 +2,7 @@ import subprocess
 import json
 import os
 import shutil
+from node_runner import run_node_script
 
 def check_kansas_dependencies():
     """Checks for dependencies required by the Kansas scraper (ffmpeg, Vosk model)."""
@@ -44,10 +45,7 @@ def search_ks(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=240, shell=True # 4-minute timeout for this complex task
-        )
+        run_node_script("ks", command, timeout=240) # 4-minute timeout for this complex task
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -1,11 +1,17 @@
 from playwright.sync_api import sync_playwright, TimeoutError
 from urllib.parse import urljoin
+from webforms import WebFormsClient, WebFormsError
+from browser_cache import launch_chromium
+from cancellation import ScrapeCancelled
+from deadline import budget_ms, budget_s
+from telemetry import instrument_session
+from traffic_capture import capture_session
 
 SEARCH_URL = "https://sosbes.sos.ky.gov/BusSearchNProfile/search.aspx"
 
 def do_search(page, search_text):
     """Navigates and performs the initial search."""
-    page.goto(SEARCH_URL, timeout=30000)
+    page.goto(SEARCH_URL, timeout=budget_ms(30000))
     page.wait_for_selector("#MainContent_txtSearch")
     page.select_option("#MainContent_ddlSearchBy", "Business Name or Organization Number")
     page.fill("#MainContent_txtSearch", str(search_text))
@@ -14,83 +20,82 @@ def do_search(page, search_text):
 def check_no_results(page):
     """Checks for the 'No results found' message."""
     try:
-        no_result_div = page.wait_for_selector("#MainContent_pNOSearchresults", timeout=3000)
+        no_result_div = page.wait_for_selector("#MainContent_pNOSearchresults", timeout=budget_ms(3000))
         return "No matching organizations were found" in no_result_div.inner_text()
     except TimeoutError:
         return False
 
-def parse_results(page, search_args):
+def select_best_match(candidates, search_term):
     """
-    Parses the search results table, implementing 'best guess' logic for multiple results.
+    Picks the target entity from (name, organization_id, href) rows using the
+    'best guess' rules: a single row wins outright, then an exact name match,
+    then the shortest name that starts with the search term.
     """
-    search_term = search_args.get("entity_name") or search_args.get("state_filing_number")
-
-    try:
-        page.wait_for_selector("#MainContent_gvSearchResults", timeout=5000)
-    except TimeoutError:
-        return {"error": "Results table not found."}
-
-    rows = page.query_selector_all("#MainContent_gvSearchResults tbody tr")
-    data_rows = [r for r in rows if "Headerbg" not in (r.get_attribute("class") or "")]
+    if len(candidates) == 1:
+        return {"single": True, "detail_href": candidates[0][2]}
 
-    if not data_rows:
-        return {"error": "No data rows found in results table."}
-
-    # If only one result, it's our target
-    if len(data_rows) == 1:
-        tds = data_rows[0].query_selector_all("td")
-        href = tds[0].query_selector("a").get_attribute("href")
-        return {"single": True, "detail_href": href}
-
-    # If multiple results, find the best match
     search_term_lower = search_term.lower()
-    exact_match_row = None
+    exact_match = None
     potential_matches = []
 
-    for row in data_rows:
-        tds = row.query_selector_all("td")
-        if not tds: continue
-        name = tds[0].inner_text().strip()
-        
+    for candidate in candidates:
+        name = candidate[0]
         if name.lower() == search_term_lower:
-            exact_match_row = row
+            exact_match = candidate
             break
-        
+
         if name.lower().startswith(search_term_lower):
-            potential_matches.append((name, row))
+            potential_matches.append(candidate)
 
-    target_row = None
-    if exact_match_row:
-        target_row = exact_match_row
+    target = None
+    if exact_match:
+        target = exact_match
     elif potential_matches:
         # Pick the shortest name from the potential matches
-        best_match = min(potential_matches, key=lambda item: len(item[0]))
-        target_row = best_match[1]
+        target = min(potential_matches, key=lambda item: len(item[0]))
 
-    if target_row:
-        href = target_row.query_selector("td:first-child a").get_attribute("href")
-        return {"single": True, "detail_href": href}
+    if target:
+        return {"single": True, "detail_href": target[2]}
 
     # If no suitable match is found, return the top 5 for user to refine search
-    top_results = [{"entity_name": r.query_selector_all("td")[0].inner_text().strip(),
-                    "organization_id": r.query_selector_all("td")[1].inner_text().strip()}
-                   for r in data_rows[:5]]
+    top_results = [{"entity_name": name, "organization_id": org_id}
+                   for name, org_id, _ in candidates[:5]]
     return {
         "error": f"Multiple results found for '{search_term}', but no suitable match was identified.",
         "top_results": top_results
     }
 
-
-def parse_single_result_detail(page, detail_href=None):
+def parse_results(page, search_args):
     """
-    Navigates to the detail page (if needed) and scrapes all available information.
+    Parses the search results table, implementing 'best guess' logic for multiple results.
     """
-    if detail_href:
-        detail_url = urljoin(SEARCH_URL, detail_href)
-        page.goto(detail_url, timeout=30000)
-    
-    page.wait_for_selector("div.company-info-container")
+    search_term = search_args.get("entity_name") or search_args.get("state_filing_number")
+
+    try:
+        page.wait_for_selector("#MainContent_gvSearchResults", timeout=budget_ms(5000))
+    except TimeoutError:
+        return {"error": "Results table not found."}
+
+    rows = page.query_selector_all("#MainContent_gvSearchResults tbody tr")
+    data_rows = [r for r in rows if "Headerbg" not in (r.get_attribute("class") or "")]
 
+    if not data_rows:
+        return {"error": "No data rows found in results table."}
+
+    candidates = []
+    for row in data_rows:
+        tds = row.query_selector_all("td")
+        if not tds: continue
+        link = tds[0].query_selector("a")
+        candidates.append((tds[0].inner_text().strip(),
+                           tds[1].inner_text().strip() if len(tds) > 1 else "N/A",
+                           link.get_attribute("href") if link else None))
+
+    return select_best_match(candidates, search_term)
+
+
+def build_detail_record(pairs):
+    """Maps the (label, value) pairs of the company-info grid onto the normalized record."""
     data = {
         "entity_name": "N/A",
         "business_identification_number": "N/A",
@@ -101,15 +106,9 @@ def parse_single_result_detail(page, detail_href=None):
         "address": "N/A",
     }
 
-    for r in page.query_selector_all("div.company-info-container div.grid-row"):
-        label_el = r.query_selector("div.grid-label")
-        value_el = r.query_selector("div.grid-value")
-        if not label_el or not value_el:
-            continue
-        
-        label = label_el.inner_text().strip().lower()
-        # Use inner_html to preserve <br> tags for easy replacement
-        value = value_el.inner_html().replace('<br>', '\n').strip()
+    for label, value in pairs:
+        label = label.strip().lower()
+        value = value.strip()
 
         if label == "organization number":
             data["business_identification_number"] = value
@@ -126,19 +125,115 @@ def parse_single_result_detail(page, detail_href=None):
         elif label == "principal office":
             data["address"] = value.replace("\n", ", ").strip()
 
-
     return data
 
+def parse_single_result_detail(page, detail_href=None):
+    """
+    Navigates to the detail page (if needed) and scrapes all available information.
+    """
+    if detail_href:
+        detail_url = urljoin(SEARCH_URL, detail_href)
+        page.goto(detail_url, timeout=budget_ms(30000))
+    
+    page.wait_for_selector("div.company-info-container")
+
+    pairs = []
+    for r in page.query_selector_all("div.company-info-container div.grid-row"):
+        label_el = r.query_selector("div.grid-label")
+        value_el = r.query_selector("div.grid-value")
+        if not label_el or not value_el:
+            continue
+        # Use inner_html to preserve <br> tags for easy replacement
+        pairs.append((label_el.inner_text(), value_el.inner_html().replace('<br>', '\n')))
+
+    return build_detail_record(pairs)
+
+# ----- HTTP engine (WebForms postback, no browser) ---------------------------
+def parse_detail_soup(soup):
+    """Same as parse_single_result_detail, but for a detail page fetched over HTTP."""
+    container = soup.select_one("div.company-info-container")
+    if container is None:
+        raise WebFormsError("Kentucky detail page did not contain the company info grid.")
+
+    pairs = []
+    for r in container.select("div.grid-row"):
+        label_el = r.select_one("div.grid-label")
+        value_el = r.select_one("div.grid-value")
+        if not label_el or not value_el:
+            continue
+        pairs.append((label_el.get_text(), value_el.get_text("\n", strip=True)))
+
+    return build_detail_record(pairs)
+
+def search_ky_http(search_args):
+    """
+    Runs the Kentucky search as plain WebForms postbacks. Raises WebFormsError
+    if the portal no longer looks the way this adapter expects.
+    """
+    search_text = search_args.get("entity_name") or search_args.get("state_filing_number")
+
+    client = WebFormsClient(timeout=budget_s(30))
+    instrument_session("ky", client.session)
+    capture_session("ky", client.session)
+    client.get(SEARCH_URL)
+    soup = client.submit({
+        "ctl00$MainContent$ddlSearchBy": client.option_value("ctl00$MainContent$ddlSearchBy", "Business Name or Organization Number"),
+        "ctl00$MainContent$txtSearch": str(search_text),
+    }, button="ctl00$MainContent$BSearch")
+
+    no_results = soup.select_one("#MainContent_pNOSearchresults")
+    if no_results and "No matching organizations were found" in no_results.get_text():
+        return {"error": f"No matching organizations were found for '{search_text}'."}
+
+    # Search by number can land directly on the detail page
+    if soup.select_one("div.company-info-container"):
+        return parse_detail_soup(soup)
+
+    table = soup.select_one("#MainContent_gvSearchResults")
+    if table is None:
+        raise WebFormsError("Kentucky results grid not found.")
+
+    candidates = []
+    for row in table.find_all("tr"):
+        if "Headerbg" in (row.get("class") or []):
+            continue
+        tds = row.find_all("td")
+        if not tds: continue
+        link = tds[0].find("a")
+        candidates.append((tds[0].get_text(strip=True),
+                           tds[1].get_text(strip=True) if len(tds) > 1 else "N/A",
+                           link.get("href") if link else None))
+
+    if not candidates:
+        return {"error": "No data rows found in results table."}
+
+    parsed = select_best_match(candidates, search_text)
+    if not parsed.get("single"):
+        return parsed
+    return parse_detail_soup(client.follow(parsed["detail_href"]))
+
 def search_ky(search_args):
+    """
+    Kentucky search. Uses the HTTP (WebForms postback) engine by default and
+    falls back to Chromium if the portal rejects it; pass engine="browser" in
+    search_args to go straight to the browser.
+    """
     search_text = search_args.get("entity_name") or search_args.get("state_filing_number")
     if not search_text:
         return {"error": "Organization number or entity name required for Kentucky search."}
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    if search_args.get("engine", "http") != "browser":
+        try:
+            return search_ky_http(search_args)
+        except ScrapeCancelled:
+            raise  # Cancelled or out of time: the browser would be no better
+        except Exception:
+            pass  # Rejected postback, network or parse failure: fall through to the browser flow below
 
+    with sync_playwright() as p:
+        browser = launch_chromium(p, "ky", headless=True)
         try:
+            page = browser.new_page()
             do_search(page, search_text)
 
             if check_no_results(page):
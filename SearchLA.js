@@ -2,6 +2,7 @@ const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 puppeteer.use(StealthPlugin());
 const fs = require('fs');
+const { instrumentPage } = require('./telemetry');
 
 // --- Main function to handle the scraping logic ---
 const scrapeLouisiana = async (searchTerm, outputFilename) => {
@@ -11,6 +12,7 @@ const scrapeLouisiana = async (searchTerm, outputFilename) => {
     }
 
     const browser = await puppeteer.launch({
+        userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
         headless: false,
         args: [
             '--no-sandbox', '--disable-setuid-sandbox', '--disable-infobars',
@@ -19,7 +21,7 @@ const scrapeLouisiana = async (searchTerm, outputFilename) => {
         ],
         defaultViewport: null,
     });
-    const page = await browser.newPage();
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(60000);
 
     try {
@@ -84,8 +86,8 @@ const scrapeLouisiana = async (searchTerm, outputFilename) => {
 
     } catch (err) {
         console.error("An error occurred during LA automation:", err);
-        // On error, write an empty array to the output file so Python doesn't fail
-        fs.writeFileSync(outputFilename, JSON.stringify([], null, 2)); 
+        // On error, write an error dict so Python can tell a failed run from an empty result
+        fs.writeFileSync(outputFilename, JSON.stringify({ error: `An error occurred during LA automation: ${err.message}` }, null, 2));
     } finally {
         await browser.close();
     }
@@ -11,6 +11,8 @@ import subprocess
 import vosk
 import requests
 import shutil
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 # --- Configuration (kept for warm-up routine) ---
 VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
@@ -84,8 +86,8 @@ def search_la(search_args):
     driver = None
     
     try:
-        driver = uc.Chrome(version_main=139)
-        wait = WebDriverWait(driver, 60)
+        driver = launch_uc_chrome(uc.Chrome, "la", version_main=139)
+        wait = WebDriverWait(driver, budget_s(60))
         driver.maximize_window()
 
         driver.get("https://www.google.com")
@@ -1,6 +1,8 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from datetime import datetime
 import time
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 MA_SEARCH_URL = "https://corp.sec.state.ma.us/CorpWeb/CorpSearch/CorpSearch.aspx"
 
@@ -14,7 +16,7 @@ def search_ma(search_args):
         return {"error": "ID number must be exactly 9 digits."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=[
+        browser = launch_chromium(p, "ma", headless=True, args=[
             "--disable-blink-features=AutomationControlled",
             "--no-sandbox", "--disable-infobars",
         ])
@@ -48,7 +50,7 @@ def search_ma(search_args):
 
             # Submit search
             try:
-                with page.expect_navigation(wait_until="networkidle", timeout=6000):
+                with page.expect_navigation(wait_until="networkidle", timeout=budget_ms(6000)):
                     page.locator("#MainContent_btnSearch").click()
             except PlaywrightTimeoutError:
                 page.locator("#MainContent_btnSearch").click()
@@ -74,7 +76,7 @@ def search_ma(search_args):
             # If multiple results are found, click the first one and extract the details.
             if row_count > 0:
                 entity_link = rows.first.locator("th a, td a").first
-                with page.expect_navigation(wait_until="networkidle", timeout=10000):
+                with page.expect_navigation(wait_until="networkidle", timeout=budget_ms(10000)):
                     entity_link.click()
                 return extract_ma_detail(page)
 
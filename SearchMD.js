@@ -8,6 +8,7 @@ const path = require('path');
 const { exec } = require('child_process');
 const vosk = require('vosk');
 const axios = require('axios');
+const { instrumentPage } = require('./telemetry');
 
 // --- Configuration ---
 const VOSK_MODEL_PATH = 'vosk-model-small-en-us-0.15'; 
@@ -56,6 +57,7 @@ const scrapeMaryland = async (searchTerm, outputFilename) => {
     let page;
     try {
         browser = await puppeteer.launch({
+            userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
             headless: false,
             args: [
                 '--no-sandbox', '--disable-setuid-sandbox', '--disable-infobars', '--disable-dev-shm-usage',
@@ -64,7 +66,7 @@ const scrapeMaryland = async (searchTerm, outputFilename) => {
             ignoreDefaultArgs: ['--enable-automation']
         });
 
-        page = await browser.newPage();
+        page = instrumentPage(await browser.newPage());
         page.setDefaultTimeout(60000);
         await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36');
         await page.setViewport({ width: 1920, height: 1080 });
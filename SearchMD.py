@@ -12,6 +12,8 @@ import subprocess
 import vosk
 import requests
 import shutil
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 # --- Configuration (kept for CAPTCHA routine) ---
 VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
@@ -90,10 +92,10 @@ def search_md(search_args):
 
         # --- THIS IS THE FIX ---
         # We now explicitly provide the path to the Chrome browser.
-        driver = uc.Chrome(browser_executable_path=chrome_path)
+        driver = launch_uc_chrome(uc.Chrome, "md", browser_executable_path=chrome_path)
         # --- END OF FIX ---
         
-        wait = WebDriverWait(driver, 45)
+        wait = WebDriverWait(driver, budget_s(45))
 
         driver.get('https://egov.maryland.gov/BusinessExpress/EntitySearch')
 
@@ -102,12 +104,12 @@ def search_md(search_args):
 
         results_table_selector = (By.ID, 'newTblBusSearch')
         try:
-            WebDriverWait(driver, 15).until(EC.visibility_of_element_located(results_table_selector))
+            WebDriverWait(driver, budget_s(15)).until(EC.visibility_of_element_located(results_table_selector))
         except TimeoutException:
             try:
                 # ... (rest of the CAPTCHA logic remains the same) ...
                 try:
-                    short_wait = WebDriverWait(driver, 5)
+                    short_wait = WebDriverWait(driver, budget_s(5))
                     anchor_frame = short_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'iframe[src*="api2/anchor"]')))
                     driver.switch_to.frame(anchor_frame)
                     wait.until(EC.element_to_be_clickable((By.ID, 'recaptcha-anchor'))).click()
@@ -1,4 +1,5 @@
 const puppeteer = require('puppeteer'); // v23.0.0 or later
+const { instrumentPage } = require('./telemetry');
 
 // Get the entity name from the command-line arguments
 // process.argv[2] is the first argument passed to the script
@@ -10,8 +11,8 @@ if (!entityNameToSearch) {
 }
 
 (async () => {
-    const browser = await puppeteer.launch();
-    const page = await browser.newPage();
+    const browser = await puppeteer.launch({ userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined });
+    const page = instrumentPage(await browser.newPage());
     const timeout = 30000;
     page.setDefaultTimeout(timeout);
 
@@ -2,6 +2,7 @@ import subprocess
 import json
 import os
 from typing import Dict, Any
+from node_runner import run_node_script
 
 def search_me(search_args: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -25,13 +26,7 @@ def search_me(search_args: Dict[str, Any]) -> Dict[str, Any]:
         # - capture_output=True: captures stdout and stderr
         # - text=True: decodes stdout and stderr as text
         # - timeout: sets a timeout in seconds
-        result = subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=180 
-        )
+        result = run_node_script("me", command, timeout=180, shell=False)
         
         # The Node.js script's console.log output is in result.stdout
         # We parse this JSON string into a Python dictionary
@@ -6,6 +6,8 @@ from selenium.common.exceptions import TimeoutException
 import time
 import os
 import json
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 def search_mi(search_args):
     """
@@ -20,12 +22,12 @@ def search_mi(search_args):
     try:
         # --- USING YOUR ORIGINAL, WORKING INITIALIZATION ---
         # This forces chromedriver to use a version compatible with Chrome 139
-        driver = uc.Chrome(version_main=139)
+        driver = launch_uc_chrome(uc.Chrome, "mi", version_main=139)
         # --- END OF ORIGINAL INITIALIZATION ---
 
         driver.get("https://mibusinessregistry.lara.state.mi.us/search/business")
 
-        wait = WebDriverWait(driver, 90)
+        wait = WebDriverWait(driver, budget_s(90))
         search_input_selector = 'input[placeholder="Search by name or file number"]'
         
         wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, search_input_selector)))
@@ -1,6 +1,9 @@
 from playwright.sync_api import sync_playwright, TimeoutError
 import re
 import html
+from browser_cache import launch_chromium
+from locator_index import report_locator
+from deadline import budget_ms
  
 def format_date(text):
     if not text:
@@ -34,7 +37,7 @@ def clean_address(raw_html):
 def parse_details(page):
     """Extract all required fields from the detail page."""
     try:
-        page.locator("#filingSummary").wait_for(timeout=3000)
+        page.locator("#filingSummary").wait_for(timeout=budget_ms(3000))
 
         def get_text(label):
             sel = f"#filingSummary dl dt:text('{label}') + dd"
@@ -83,13 +86,15 @@ def get_row_data(row):
     except:
         return None
 
+MN_BASE_URL = "https://mblsportal.sos.state.mn.us"
+
 def search_mn(search_args):
     file_number = search_args.get("state_filing_number")
     entity_name = search_args.get("entity_name")
     base_url = "https://mblsportal.sos.state.mn.us/Business/Search"
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = launch_chromium(p, "mn", headless=True)
         context = browser.new_context(
             user_agent=(
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -101,6 +106,24 @@ def search_mn(search_args):
         )
         context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => false});")
         page = context.new_page()
+
+        # Details link remembered from an earlier search for this name
+        detail_locator = search_args.get("detail_locator")
+        if detail_locator and not file_number:
+            try:
+                page.goto(MN_BASE_URL + detail_locator)
+                page.wait_for_selector("#filingSummary", timeout=budget_ms(5000))
+            except TimeoutError:
+                browser.close()
+                return {"error": "Could not load the business details page."}
+            name_el = page.locator("#filingSummary dl dt:text('Business Name') + dd")
+            found_name = name_el.inner_text().strip() if name_el.count() > 0 else entity_name
+            details = parse_details(page)
+            browser.close()
+            if not details:
+                return {"error": "Failed to parse details from the business page."}
+            return {"entity_name": found_name, **details}
+
         page.goto(base_url, wait_until="load")
 
         # --- Search by file number ---
@@ -118,7 +141,7 @@ def search_mn(search_args):
             return {"error": "File number or business name required for Minnesota search."}
 
         try:
-            page.wait_for_selector("table.table tbody tr", timeout=5000)
+            page.wait_for_selector("table.table tbody tr", timeout=budget_ms(5000))
         except TimeoutError:
             browser.close()
             search_term = file_number or entity_name
@@ -141,10 +164,11 @@ def search_mn(search_args):
             browser.close()
             return {"error": "Could not find a details link for the top search result."}
         
-        page.goto("https://mblsportal.sos.state.mn.us" + details_href)
+        report_locator(search_args, details_href)
+        page.goto(MN_BASE_URL + details_href)
         
         try:
-            page.wait_for_selector("#filingSummary", timeout=5000)
+            page.wait_for_selector("#filingSummary", timeout=budget_ms(5000))
         except TimeoutError:
             browser.close()
             return {"error": "Could not load the business details page."}
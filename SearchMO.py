@@ -1,5 +1,8 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 import html, re
+from browser_cache import launch_chromium
+from locator_index import report_locator
+from deadline import budget_ms
 
 MO_SEARCH_URL = "https://bsd.sos.mo.gov/BusinessEntity/BESearch.aspx?SearchType=0"
 BASE_URL = "https://bsd.sos.mo.gov"
@@ -77,7 +80,7 @@ def search_mo(search_args, headless=True):
 
     with sync_playwright() as p:
         # --- Launch browser ---
-        browser = p.chromium.launch(headless=headless)
+        browser = launch_chromium(p, "mo", headless=headless)
         context = browser.new_context(
             user_agent=(
                 "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -91,6 +94,14 @@ def search_mo(search_args, headless=True):
         page = context.new_page()
 
         try:
+            # -----------------------------------------------------------------
+            # Detail page remembered from an earlier search for this name
+            # -----------------------------------------------------------------
+            detail_locator = search_args.get("detail_locator")
+            if detail_locator and not charter_number:
+                page.goto(detail_locator, wait_until="domcontentloaded")
+                return parse_mo_detail(page)
+
             # -----------------------------------------------------------------
             # Fill in search fields
             # -----------------------------------------------------------------
@@ -125,7 +136,7 @@ def search_mo(search_args, headless=True):
             # -----------------------------------------------------------------
             page.wait_for_selector(
                 'table#ctl00_ctl00_ContentPlaceHolderMain_ContentPlaceHolderMainSingle_ppBESearch_bsPanel_SearchResultGrid_ctl00, div:has-text("No records to display.")',
-                timeout=10000
+                timeout=budget_ms(10000)
             )
 
             # -----------------------------------------------------------------
@@ -161,6 +172,7 @@ def search_mo(search_args, headless=True):
             
             # --- Whether single or multiple results, navigate to the first one's detail page ---
             top_result = entities[0]
+            report_locator(search_args, top_result["detail_url"])
             page.goto(top_result["detail_url"], wait_until="domcontentloaded")
             data = parse_mo_detail(page)
             return data
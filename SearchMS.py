@@ -1,4 +1,6 @@
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 MS_SOS_URL = "https://corp.sos.ms.gov/corp/portal/c/page/corpbusinessidsearch/portal.aspx#"
 
@@ -7,21 +9,21 @@ MS_SOS_URL = "https://corp.sos.ms.gov/corp/portal/c/page/corpbusinessidsearch/po
 def launch_browser(headless=True):
     """Launch a Playwright Chromium browser and return page object."""
     p = sync_playwright().start()
-    browser = p.chromium.launch(headless=headless)
+    browser = launch_chromium(p, "ms", headless=headless)
     page = browser.new_page()
     return p, browser, page
 
 
 def navigate_to_search(page):
     """Go to the Mississippi SOS search page."""
-    page.goto(MS_SOS_URL, timeout=60000)
+    page.goto(MS_SOS_URL, timeout=budget_ms(60000))
 
 
 def fill_search(page, entity_name="", business_id=""):
     """Fill in the search form for either business ID or entity name."""
     if business_id:
         page.locator("li[role='tab'] >> text=Business ID").click()
-        page.wait_for_selector("#businessIdTextBox", state="visible", timeout=5000)
+        page.wait_for_selector("#businessIdTextBox", state="visible", timeout=budget_ms(5000))
         page.fill("#businessIdTextBox", business_id)
         page.keyboard.press("Enter")
     else:
@@ -52,7 +54,7 @@ def extract_detail_page_data(page):
         try:
             # **FIX:** Target the .first element to avoid strict mode violations
             locator = page.locator(selector).first
-            locator.wait_for(state="visible", timeout=2000) # Wait for the first element to be visible
+            locator.wait_for(state="visible", timeout=budget_ms(2000)) # Wait for the first element to be visible
             val = locator.inner_text().strip()
             
             if not val or val.upper() in (p.upper() for p in placeholder_values):
@@ -142,7 +144,7 @@ def search_ms(search_args):
             if first_row.count() > 0:
                 # Click the details link in the first row
                 first_row.locator("a:has-text('Details')").click()
-                page.wait_for_selector("div#printDiv2", state="visible", timeout=10000)
+                page.wait_for_selector("div#printDiv2", state="visible", timeout=budget_ms(10000))
                 return extract_detail_page_data(page)
 
         # If neither a details page nor a results table with rows is found
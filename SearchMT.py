@@ -11,6 +11,8 @@ import subprocess
 import vosk
 import requests
 import shutil
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 # --- Configuration ---
 VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
@@ -88,8 +90,8 @@ def search_mt(search_args):
     driver = None
     
     try:
-        driver = uc.Chrome(version_main=139)
-        wait = WebDriverWait(driver, 60)
+        driver = launch_uc_chrome(uc.Chrome, "mt", version_main=139)
+        wait = WebDriverWait(driver, budget_s(60))
 
         # Warm-up routine
         driver.get("https://www.google.com")
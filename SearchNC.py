@@ -1,11 +1,13 @@
 import re
 import time
 from playwright.sync_api import sync_playwright, Page, Browser, TimeoutError
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 def launch_browser(headless=True) -> (Browser, Page):
     # Start Playwright and launch Chromium browser with stealth settings to reduce detection
     p = sync_playwright().start()
-    browser = p.chromium.launch(headless=headless)
+    browser = launch_chromium(p, "nc", headless=headless)
     context = browser.new_context(
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/115.0.0.0 Safari/537.36",
         viewport={"width": 1920, "height": 1080}
@@ -58,7 +60,7 @@ def get_search_result_headings(page: Page) -> list:
 def extract_details_from_result(page: Page, heading) -> dict:
     # Click the result accordion heading to expand it
     heading.click()
-    page.wait_for_selector("div.searchAccordion__content", timeout=10000)
+    page.wait_for_selector("div.searchAccordion__content", timeout=budget_ms(10000))
     content = page.query_selector("div.searchAccordion__content")
 
     # Default values
@@ -94,7 +96,7 @@ def extract_details_from_result(page: Page, heading) -> dict:
     more_info_link = content.query_selector("a.searchResultsLink[href*='Business_Registration_profile']")
     if more_info_link:
         more_info_link.click()
-        page.wait_for_selector("section.usa-section--singleEntry", timeout=10000)
+        page.wait_for_selector("section.usa-section--singleEntry", timeout=budget_ms(10000))
         detail_section = page.query_selector("section.usa-section--singleEntry")
         if detail_section:
             for addr_block in detail_section.query_selector_all("div.para-small"):
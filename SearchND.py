@@ -1,6 +1,9 @@
 import re
 import asyncio
 from playwright.async_api import async_playwright
+from response_capture import AsyncResponseCapture, search_rows, drawer_details
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 async def extract_detail_table_async(page):
     details = {}
@@ -17,14 +20,32 @@ async def extract_detail_table_async(page):
 def normalize_address(addr: str) -> str:
     return re.sub(r'\s*\n\s*', ', ', addr).strip() if addr else "N/A"
 
+def build_nd_record(entity_name, file_number, details):
+    entity_status = details.get("Status", "N/A")
+    return {
+        "entity_name": entity_name,
+        "registration_date": details.get("Initial Filing Date", "N/A"),
+        "entity_type": details.get("Filing Type", "N/A"),
+        "business_identification_number": file_number,
+        "entity_status": entity_status,
+        "statusActive": "active" in entity_status.lower(),
+        "address": normalize_address(details.get("Principal Address", "N/A"))
+    }
+
 async def search_nd(search_args: dict) -> dict:
+    """
+    North Dakota search. By default the search and detail JSON the SPA fetches
+    is captured off the network and used directly; if it does not arrive (or
+    capture=False is passed in search_args) the rendered tables are read instead.
+    """
     entity_name_input = search_args.get("entity_name")
     if not entity_name_input:
         return {"error": "Entity name required for North Dakota search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "nd", headless=True)
         page = await browser.new_page()
+        capture = AsyncResponseCapture(page) if search_args.get("capture", True) else None
 
         try:
             await page.goto("https://firststop.sos.nd.gov/search/business", wait_until="domcontentloaded")
@@ -34,7 +55,16 @@ async def search_nd(search_args: dict) -> dict:
             await page.wait_for_function('document.querySelector("button.search-button")?.getAttribute("aria-disabled") === "false"')
             await page.click("button.search-button")
 
-            await page.wait_for_selector("div.table-wrapper, .alert-danger", timeout=15000)
+            if capture:
+                rows = search_rows(await capture.wait_for("search", timeout=budget_ms(15000)))
+                if rows:
+                    capture.clear("detail")
+                    await page.locator("div.table-wrapper table tbody tr").first.locator("td div[role='button']").click()
+                    details = drawer_details(await capture.wait_for("detail", timeout=budget_ms(10000)))
+                    if details:
+                        return [build_nd_record(rows[0]["entity_name"], rows[0]["file_number"], details)]
+
+            await page.wait_for_selector("div.table-wrapper, .alert-danger", timeout=budget_ms(15000))
             if await page.locator(".alert-danger").count() > 0:
                 return {"error": await page.locator(".alert-danger").inner_text()}
 
@@ -42,22 +72,17 @@ async def search_nd(search_args: dict) -> dict:
             if await first_row.count() == 0:
                 return []
 
-            await first_row.locator("td div[role='button']").click()
-            await page.wait_for_selector("table.details-list", timeout=10000)
+            if await page.locator("table.details-list").count() == 0:
+                await first_row.locator("td div[role='button']").click()
+            await page.wait_for_selector("table.details-list", timeout=budget_ms(10000))
 
             details = await extract_detail_table_async(page)
-            entity_status = details.get("Status", "N/A")
-            
-            return [{
-                "entity_name": await first_row.locator("td:nth-child(1) > div > span.cell").inner_text(),
-                "registration_date": details.get("Initial Filing Date", "N/A"),
-                "entity_type": details.get("Filing Type", "N/A"),
-                "business_identification_number": await first_row.locator("td:nth-child(2) > span.cell").inner_text(),
-                "entity_status": entity_status,
-                "statusActive": "active" in entity_status.lower(),
-                "address": normalize_address(details.get("Principal Address", "N/A"))
-            }]
+            return [build_nd_record(
+                await first_row.locator("td:nth-child(1) > div > span.cell").inner_text(),
+                await first_row.locator("td:nth-child(2) > span.cell").inner_text(),
+                details,
+            )]
         except Exception as e:
             return {"error": f"An unexpected error occurred in ND scraper: {e}"}
         finally:
-            await browser.close()
\ No newline at end of file
+            await browser.close()
@@ -7,6 +7,7 @@ const path = require('path');
 const { exec } = require('child_process');
 const vosk = require('vosk');
 const axios =require('axios');
+const { instrumentPage } = require('./telemetry');
 
 // --- Configuration ---
 const VOSK_MODEL_PATH = 'vosk-model-small-en-us-0.15';
@@ -104,11 +105,12 @@ const scrapeNebraska = async (searchTerm, outputFilename) => {
     }
 
     const browser = await puppeteer.launch({
+        userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
         headless: false, // Set to 'new' for integration, false for debugging
         defaultViewport: null,
         args: ['--start-maximized', '--no-sandbox', '--disable-setuid-sandbox']
     });
-    const page = await browser.newPage();
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(60000);
     await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36');
 
@@ -229,7 +231,8 @@ const scrapeNebraska = async (searchTerm, outputFilename) => {
 
     } catch (err) {
         console.error("An error occurred during NE automation:", err.message);
-        fs.writeFileSync(outputFilename, JSON.stringify([], null, 2)); // Write empty array on error
+        // An error dict, so Python can tell a failed run from an empty result
+        fs.writeFileSync(outputFilename, JSON.stringify({ error: `An error occurred during NE automation: ${err.message}` }, null, 2));
     } finally {
         if (browser) {
             await browser.close();
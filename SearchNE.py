@@ -2,6 +2,7 @@ import subprocess
 import json
 import os
 import shutil # Used to check for ffmpeg
+from node_runner import run_node_script
 
 def check_nebraska_dependencies():
     """Checks for dependencies required by the Nebraska scraper."""
@@ -47,10 +48,7 @@ def search_ne(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=240, shell=True # 4-minute timeout for this complex task
-        )
+        run_node_script("ne", command, timeout=240) # 4-minute timeout for this complex task
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
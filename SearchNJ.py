@@ -1,5 +1,7 @@
 import re
 from playwright.sync_api import sync_playwright
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 def search_nj(search_args):
     """
@@ -17,20 +19,20 @@ def search_nj(search_args):
         return {"error": "Entity ID must be exactly 10 digits for New Jersey search."}
 
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
+        browser = launch_chromium(p, "nj", headless=True)
         page = browser.new_page()
         try:
             if entity_id:
-                page.goto("https://www.njportal.com/DOR/BusinessNameSearch/Search/EntityId", timeout=30000)
-                page.wait_for_selector("#EntityId", timeout=10000)
+                page.goto("https://www.njportal.com/DOR/BusinessNameSearch/Search/EntityId", timeout=budget_ms(30000))
+                page.wait_for_selector("#EntityId", timeout=budget_ms(10000))
                 page.fill("#EntityId", entity_id)
             else:
-                page.goto("https://www.njportal.com/DOR/BusinessNameSearch/Search/BusinessName", timeout=30000)
-                page.wait_for_selector("#BusinessName", timeout=10000)
+                page.goto("https://www.njportal.com/DOR/BusinessNameSearch/Search/BusinessName", timeout=budget_ms(30000))
+                page.wait_for_selector("#BusinessName", timeout=budget_ms(10000))
                 page.fill("#BusinessName", entity_name)
 
             page.click('input[type=submit].btn-success')
-            page.wait_for_load_state('domcontentloaded', timeout=15000)
+            page.wait_for_load_state('domcontentloaded', timeout=budget_ms(15000))
 
             error_alert = page.query_selector(".alert-danger")
             if error_alert and "no records were found" not in error_alert.inner_text().lower():
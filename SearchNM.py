@@ -1,11 +1,14 @@
 import re
 import time
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from response_capture import ResponseCapture, search_rows, drawer_details
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 def launch_browser():
     """Launches a Chromium browser with stealth settings and returns context and page."""
     p = sync_playwright().start()
-    browser = p.chromium.launch(headless=True)
+    browser = launch_chromium(p, "nm", headless=True)
     context = browser.new_context(
         user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
         viewport={"width": 1920, "height": 1080},
@@ -16,14 +19,14 @@ def launch_browser():
 
 def fill_search_form(page, search_term):
     """Fills the search input and submits the form."""
-    search_input = page.wait_for_selector('input.search-input', state="visible", timeout=15000)
+    search_input = page.wait_for_selector('input.search-input', state="visible", timeout=budget_ms(15000))
     search_input.click()
     search_input.fill(search_term)
     time.sleep(1)
 
     page.wait_for_function(
         'document.querySelector("button.search-button")?.getAttribute("aria-disabled") === "false"',
-        timeout=5000
+        timeout=budget_ms(5000)
     )
     page.click("button.search-button")
 
@@ -35,30 +38,8 @@ def check_for_errors(page):
             return error_div.inner_text().strip()
     return None
 
-def parse_and_extract_details(page, result_row):
-    """
-    From a result row, clicks to the details page and extracts all required fields, including the agent's address.
-    """
-    entity_name_cell = result_row.query_selector("td:nth-child(1) > div > span.cell")
-    entity_name = entity_name_cell.inner_text().strip() if entity_name_cell else "N/A"
-
-    clickable_element = result_row.query_selector("td div[role='button']")
-    if not clickable_element:
-        return {"error": "Could not find a clickable link to the business details page."}
-
-    clickable_element.click()
-    page.wait_for_selector("table.details-list", timeout=10000)
-
-    def safe_get(label):
-        """Helper to safely extract text value next to a label."""
-        row_selector = f"table.details-list tbody tr:has(td.label:has-text('{label}'))"
-        value_selector = f"{row_selector} >> td.value"
-        
-        if page.locator(value_selector).count() > 0:
-            value = page.locator(value_selector).inner_text().strip()
-            return value if value else "N/A"
-        return "N/A"
-
+def build_nm_record(entity_name, safe_get):
+    """Builds the entity record; safe_get(label) returns the value next to a label or 'N/A'."""
     # --- Standard Details Extraction ---
     registration_date = safe_get("Initial Filing Date")
     entity_type = safe_get("Entity Type")
@@ -68,12 +49,9 @@ def parse_and_extract_details(page, result_row):
 
     # --- Agent Address Extraction ---
     agent_address = "N/A"
-    agent_info_selector = "table.details-list tbody tr:has(td.label:has-text('Agent Name')) >> td.value"
-    agent_info_element = page.locator(agent_info_selector)
-
-    if agent_info_element.count() > 0:
-        # inner_text() preserves line breaks, which we use to separate address lines
-        full_agent_text = agent_info_element.inner_text().strip()
+    full_agent_text = safe_get("Agent Name")
+    if full_agent_text != "N/A":
+        # Line breaks separate the address lines
         lines = [line.strip() for line in full_agent_text.split('\n') if line.strip()]
         
         # The agent's name is the first line. The address is all subsequent lines.
@@ -90,10 +68,66 @@ def parse_and_extract_details(page, result_row):
         "address": agent_address  # This is the Registered Agent's address
     }
 
+def parse_and_extract_details(page, result_row):
+    """
+    From a result row, clicks to the details page and extracts all required fields, including the agent's address.
+    """
+    entity_name_cell = result_row.query_selector("td:nth-child(1) > div > span.cell")
+    entity_name = entity_name_cell.inner_text().strip() if entity_name_cell else "N/A"
+
+    if page.locator("table.details-list").count() == 0:
+        clickable_element = result_row.query_selector("td div[role='button']")
+        if not clickable_element:
+            return {"error": "Could not find a clickable link to the business details page."}
+
+        clickable_element.click()
+    page.wait_for_selector("table.details-list", timeout=budget_ms(10000))
+
+    def safe_get(label):
+        """Helper to safely extract text value next to a label."""
+        row_selector = f"table.details-list tbody tr:has(td.label:has-text('{label}'))"
+        value_selector = f"{row_selector} >> td.value"
+        
+        if page.locator(value_selector).count() > 0:
+            # inner_text() preserves line breaks
+            value = page.locator(value_selector).inner_text().strip()
+            return value if value else "N/A"
+        return "N/A"
+
+    return build_nm_record(entity_name, safe_get)
+
+def extract_details_via_capture(page, capture):
+    """
+    Reads the first result straight from the SPA's search and detail JSON.
+    Returns None if the JSON did not arrive so the caller can read the DOM.
+    """
+    rows = search_rows(capture.wait_for("search", timeout=budget_ms(15000)))
+    if not rows:
+        return None
+
+    capture.clear("detail")
+    page.locator("div.table-wrapper table tbody tr").first.locator("td div[role='button']").click()
+    details = drawer_details(capture.wait_for("detail", timeout=budget_ms(10000)))
+    if not details:
+        return None
+
+    def safe_get(label):
+        # Same matching as the :has-text() selector: case-insensitive substring
+        for key, value in details.items():
+            if label.lower() in key.lower():
+                return value or "N/A"
+        return "N/A"
+
+    title = rows[0]["raw"].get("TITLE")
+    entity_name = (title[0] if isinstance(title, list) and title else title or rows[0]["entity_name"]).strip()
+    return build_nm_record(entity_name, safe_get)
+
 def search_nm(search_args):
     """
     Searches for a business in New Mexico's SOS database.
     If any results are found, it returns the full details of the first one.
+    The SPA's search and detail JSON is captured off the network and used
+    directly unless capture=False is passed; the rendered DOM is the fallback.
     """
     file_number = search_args.get("state_filing_number")
     entity_name_input = search_args.get("entity_name")
@@ -109,14 +143,20 @@ def search_nm(search_args):
     p, browser, context, page = None, None, None, None
     try:
         p, browser, context, page = launch_browser()
+        capture = ResponseCapture(page) if search_args.get("capture", True) else None
 
         page.goto("https://enterprise.sos.nm.gov/search/business", wait_until="domcontentloaded")
         page.wait_for_timeout(2000)
 
         fill_search_form(page, search_term)
 
+        if capture:
+            captured = extract_details_via_capture(page, capture)
+            if captured is not None:
+                return captured
+
         try:
-            page.wait_for_selector("div.table-wrapper, .alert-danger, .search-error", timeout=15000)
+            page.wait_for_selector("div.table-wrapper, .alert-danger, .search-error", timeout=budget_ms(15000))
         except PlaywrightTimeoutError:
             return {"error": "Search timed out or the results page did not load."}
 
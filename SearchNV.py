@@ -7,6 +7,8 @@ import time
 import random
 import os
 import json
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 # --- Helper Functions (Unchanged) ---
 def random_delay(min_s=0.8, max_s=1.6):
@@ -29,8 +31,8 @@ def search_nv(search_args):
 
     driver = None
     try:
-        driver = uc.Chrome(version_main=139)
-        wait = WebDriverWait(driver, 60)
+        driver = launch_uc_chrome(uc.Chrome, "nv", version_main=139)
+        wait = WebDriverWait(driver, budget_s(60))
 
         driver.get("https://www.google.com")
         random_delay()
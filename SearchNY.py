@@ -1,5 +1,22 @@
 import requests
 from datetime import datetime
+from locator_index import report_locator
+from deadline import budget_s
+from telemetry import span
+from portal_urls import portal_url
+from traffic_capture import capture_hooks
+
+
+def format_date(raw):
+    """Helper to format dates into a consistent mm/dd/yyyy format."""
+    if not raw: return "N/A"
+    try:
+        dt = datetime.fromisoformat(raw); return f"{dt.month:02d}/{dt.day:02d}/{dt.year}"
+    except (ValueError, TypeError):
+        try:
+            dt = datetime.strptime(raw, "%m/%d/%Y"); return f"{dt.month:02d}/{dt.day:02d}/{dt.year}"
+        except (ValueError, TypeError):
+            return raw or "N/A"
 
 def search_ny(search_args):
     """
@@ -19,17 +36,6 @@ def search_ny(search_args):
         "User-Agent": "Mozilla/5.0"
     }
 
-    def format_date(raw):
-        """Helper to format dates into a consistent mm/dd/yyyy format."""
-        if not raw: return "N/A"
-        try:
-            dt = datetime.fromisoformat(raw); return f"{dt.month:02d}/{dt.day:02d}/{dt.year}"
-        except (ValueError, TypeError):
-            try:
-                dt = datetime.strptime(raw, "%m/%d/%Y"); return f"{dt.month:02d}/{dt.day:02d}/{dt.year}"
-            except (ValueError, TypeError):
-                return raw or "N/A"
-
     def build_final_dict(name="N/A", reg_date="N/A", entity_type="N/A", dos_num="N/A", status="N/A", address="N/A"):
         """A simple helper to assemble the final dictionary, as per the original script's structure."""
         is_active = status and status.upper() == "ACTIVE"
@@ -51,7 +57,10 @@ def search_ny(search_args):
             padded_id = dos_id.zfill(length)
             payload = {"AssumedNameFlag": "false", "SearchID": padded_id}
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=20)
+                with span("ny", "detail") as current:
+                    response = requests.post(portal_url(url), json=payload, headers=headers, timeout=budget_s(20),
+                                             hooks=capture_hooks("ny"))
+                    current.bytes = len(response.content)
                 response.raise_for_status()
                 data = response.json()
                 
@@ -81,6 +90,10 @@ def search_ny(search_args):
                 return {"error": f"Request failed while fetching details by ID: {e}"}
         return {"error": f"No entity found for DOS ID '{dos_id}'."}
 
+    elif search_args.get("detail_locator"):
+        # --- DOS ID remembered from an earlier search for this name ---
+        return search_ny({"state_filing_number": search_args["detail_locator"]})
+
     elif entity_name:
         # --- Search by name, then use the ID of the top result ---
         entity_name = entity_name.strip()
@@ -91,7 +104,10 @@ def search_ny(search_args):
             "listPaginationInfo": {"listStartRecord": 1, "listEndRecord": 50}
         }
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=20)
+            with span("ny", "search") as current:
+                response = requests.post(portal_url(url), json=payload, headers=headers, timeout=budget_s(20),
+                                         hooks=capture_hooks("ny"))
+                current.bytes = len(response.content)
             response.raise_for_status()
             data = response.json()
             results = data.get("entitySearchResultList", [])
@@ -103,8 +119,16 @@ def search_ny(search_args):
             top_dos_id = top_result.get("dosID")
             if not top_dos_id:
                 return {"error": "Top search result was missing a DOS ID needed for detail lookup."}
+            report_locator(search_args, top_dos_id)
 
             return search_ny({"state_filing_number": top_dos_id})
 
         except requests.RequestException as e:
-            return {"error": f"Request failed during name search: {e}"}
\ No newline at end of file
+            return {"error": f"Request failed during name search: {e}"}
+
+def lookup_ny_by_id(search_args):
+    """Fetches the entity record for a known DOS ID straight from GetEntityRecordByID."""
+    dos_id = str(search_args.get("state_filing_number") or "").strip()
+    if not dos_id:
+        return {"error": "DOS ID required for New York lookup by ID."}
+    return search_ny({"state_filing_number": dos_id})
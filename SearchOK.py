@@ -8,6 +8,8 @@ import time
 import random
 import os
 import json
+from browser_cache import launch_uc_chrome
+from latency_stats import step_budget_s, timed_step
 
 # --- Helper Functions ---
 def random_delay(min_s=0.8, max_s=1.5):
@@ -30,8 +32,10 @@ def search_ok(search_args):
 
     driver = None
     try:
-        driver = uc.Chrome(version_main=139)
-        wait = WebDriverWait(driver, 60)
+        driver = launch_uc_chrome(uc.Chrome, "ok", version_main=139)
+        def wait_for(step, condition):
+            with timed_step("ok", step):
+                return WebDriverWait(driver, step_budget_s("ok", step, 60)).until(condition)
         driver.maximize_window()
         
         fake = Faker()
@@ -39,7 +43,7 @@ def search_ok(search_args):
         driver.get('https://www.sos.ok.gov/corp/corpInquiryFind.aspx')
 
         search_input_selector = (By.ID, 'ctl00_DefaultContent_CorpNameSearch1__singlename')
-        wait.until(EC.visibility_of_element_located(search_input_selector))
+        wait_for("search", EC.visibility_of_element_located(search_input_selector))
         
         search_input = driver.find_element(*search_input_selector)
         humanlike_type(search_input, entity_name_to_search)
@@ -50,10 +54,10 @@ def search_ok(search_args):
         driver.find_element(*search_button_selector).click()
 
         first_result_selector = (By.CSS_SELECTOR, '#ctl00_DefaultContent_CorpNameSearch1_EntityGridView > div > table > tbody > tr:nth-child(1) > td:nth-child(1) > a')
-        wait.until(EC.element_to_be_clickable(first_result_selector)).click()
+        wait_for("results", EC.element_to_be_clickable(first_result_selector)).click()
 
         name_input_selector = (By.ID, 'ctl00_DefaultContent_txtName')
-        wait.until(EC.visibility_of_element_located(name_input_selector))
+        wait_for("visitor_form", EC.visibility_of_element_located(name_input_selector))
         
         name_input = driver.find_element(*name_input_selector)
         email_input = driver.find_element(By.ID, 'ctl00_DefaultContent_txtUserName')
@@ -67,7 +71,7 @@ def search_ok(search_args):
         driver.find_element(*continue_button_selector).click()
 
         details_page_selector = (By.ID, 'printDiv') 
-        wait.until(EC.visibility_of_element_located(details_page_selector))
+        wait_for("detail", EC.visibility_of_element_located(details_page_selector))
         
         def get_detail_by_label(label_text):
             try:
@@ -2,6 +2,7 @@ const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 const fs = require('fs');
 const path = require('path');
+const { instrumentPage } = require('./telemetry');
 
 puppeteer.use(StealthPlugin());
 
@@ -13,11 +14,12 @@ const scrapeOregon = async (searchTerm, outputFilename) => {
     }
 
     const browser = await puppeteer.launch({
+        userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
         headless: false,
         defaultViewport: null, // Set to 'new' for system integration
         args: ['--no-sandbox', '--disable-setuid-sandbox']
     });
-    const page = await browser.newPage();
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(60000);
     await page.setViewport({ width: 1200, height: 800 });
 
@@ -1,6 +1,9 @@
 import re
 import asyncio
 from playwright.async_api import async_playwright
+from response_capture import AsyncResponseCapture, search_rows, drawer_details
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 def parse_entity_name(full_text: str) -> tuple[str, str]:
     state_id_match = re.search(r"\((\d+)\)$", full_text)
@@ -8,15 +11,11 @@ def parse_entity_name(full_text: str) -> tuple[str, str]:
     entity_name_clean = re.sub(r"\s*\(\d+\)$", "", full_text).strip()
     return entity_name_clean, state_id
 
-async def extract_pa_details_async(page) -> dict:
+def build_pa_details(pairs) -> dict:
     details = {"registration_date": "N/A", "entity_type": "N/A", "entity_status": "N/A", "statusActive": False, "address": "N/A"}
-    rows = await page.query_selector_all("table.details-list tbody tr.detail")
-    for row in rows:
-        label_td = await row.query_selector("td.label")
-        value_td = await row.query_selector("td.value")
-        if not label_td or not value_td: continue
-        label = (await label_td.inner_text()).strip().upper()
-        value = re.sub(r'\s+', ' ', await value_td.inner_text()).strip()
+    for label, value in pairs:
+        label = label.strip().upper()
+        value = re.sub(r'\s+', ' ', value).strip()
         if label == "INITIAL FILING DATE": details["registration_date"] = value
         elif label == "STATUS":
             details["entity_status"] = value
@@ -26,14 +25,30 @@ async def extract_pa_details_async(page) -> dict:
              details["address"] = value
     return details
 
+async def extract_pa_details_async(page) -> dict:
+    pairs = []
+    rows = await page.query_selector_all("table.details-list tbody tr.detail")
+    for row in rows:
+        label_td = await row.query_selector("td.label")
+        value_td = await row.query_selector("td.value")
+        if not label_td or not value_td: continue
+        pairs.append((await label_td.inner_text(), await value_td.inner_text()))
+    return build_pa_details(pairs)
+
 async def search_pa(search_args: dict) -> dict:
+    """
+    Pennsylvania search. By default the search and detail JSON the SPA fetches
+    is captured off the network and used directly; if it does not arrive (or
+    capture=False is passed in search_args) the rendered tables are read instead.
+    """
     entity_name_input = search_args.get("entity_name")
     if not entity_name_input:
         return {"error": "Entity name required for Pennsylvania search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "pa", headless=True)
         page = await browser.new_page()
+        capture = AsyncResponseCapture(page) if search_args.get("capture", True) else None
 
         try:
             await page.goto("https://file.dos.pa.gov/search/business", wait_until="domcontentloaded")
@@ -43,7 +58,19 @@ async def search_pa(search_args: dict) -> dict:
             await page.wait_for_function('document.querySelector("button.search-button")?.getAttribute("aria-disabled") === "false"')
             await page.click("button.search-button")
 
-            await page.wait_for_selector("div.table-wrapper, .alert-danger", timeout=15000)
+            if capture:
+                rows = search_rows(await capture.wait_for("search", timeout=budget_ms(15000)))
+                if rows:
+                    capture.clear("detail")
+                    await page.locator("div.table-wrapper table tbody tr").first.locator("td div[role='button']").click()
+                    detail_map = drawer_details(await capture.wait_for("detail", timeout=budget_ms(10000)))
+                    if detail_map:
+                        details = build_pa_details(detail_map.items())
+                        details["entity_name"] = rows[0]["entity_name"]
+                        details["business_identification_number"] = rows[0]["file_number"]
+                        return [details]
+
+            await page.wait_for_selector("div.table-wrapper, .alert-danger", timeout=budget_ms(15000))
             if await page.locator(".alert-danger").count() > 0:
                 return {"error": await page.locator(".alert-danger").inner_text()}
 
@@ -54,8 +81,9 @@ async def search_pa(search_args: dict) -> dict:
             full_entity_text = await first_row.locator("td:nth-child(1) > div > span.cell").inner_text()
             entity_name_clean, state_id = parse_entity_name(full_entity_text)
             
-            await first_row.locator("td div[role='button']").click()
-            await page.wait_for_selector("table.details-list", timeout=10000)
+            if await page.locator("table.details-list").count() == 0:
+                await first_row.locator("td div[role='button']").click()
+            await page.wait_for_selector("table.details-list", timeout=budget_ms(10000))
 
             details = await extract_pa_details_async(page)
             details["entity_name"] = entity_name_clean
@@ -64,4 +92,4 @@ async def search_pa(search_args: dict) -> dict:
         except Exception as e:
             return {"error": f"An unexpected error occurred in PA scraper: {e}"}
         finally:
-            await browser.close()
\ No newline at end of file
+            await browser.close()
@@ -1,6 +1,7 @@
 import asyncio
 from datetime import datetime
 from playwright.async_api import async_playwright
+from browser_cache import launch_chromium
 
 def format_date_mmddyyyy(date_str: str) -> str:
     try:
@@ -38,7 +39,7 @@ async def search_ri(search_args: dict) -> dict:
         return {"error": "Entity name is required for Rhode Island search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "ri", headless=True)
         page = await browser.new_page()
         try:
             await page.goto("https://business.sos.ri.gov/CorpWeb/CorpSearch/CorpSearch.aspx", wait_until="load")
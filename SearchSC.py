@@ -2,12 +2,17 @@ import re
 import asyncio
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
+from page_pool import register_search_form
+from browser_cache import launch_chromium
+from deadline import budget_ms
 
 SC_SEARCH_URL = "https://businessfilings.sc.gov/BusinessFiling/Entity/Search"
 SC_BASE_URL = "https://businessfilings.sc.gov"
 
+register_search_form("sc", SC_SEARCH_URL, "input#SearchTextBox")
+
 async def parse_detail_page_async(page) -> dict:
-    await page.wait_for_selector("fieldset.entityProfile legend", timeout=10000)
+    await page.wait_for_selector("fieldset.entityProfile legend", timeout=budget_ms(10000))
     
     async def get_text(selector):
         element = page.locator(selector)
@@ -33,33 +38,47 @@ async def parse_detail_page_async(page) -> dict:
         "address": address
     }
 
+async def search_on_page(page, entity_name):
+    """Runs the search from a page that is already on the search form."""
+    await page.fill("input#SearchTextBox", entity_name)
+    await page.select_option("select#EntitySearchTypeEnumId", value="3")
+
+    async with page.expect_navigation():
+        await page.click("button#EntitySearchButton")
+
+    if await page.is_visible("p.alert.noResults"):
+        return []
+
+    first_row_link = page.locator("table#EntitySearchResultsTable tbody tr a").first
+    href = await first_row_link.get_attribute("href")
+
+    await page.goto(SC_BASE_URL + href, wait_until="domcontentloaded")
+
+    record = await parse_detail_page_async(page)
+    return [record]
+
 async def search_sc(search_args: dict) -> dict:
     entity_name = search_args.get("entity_name", "").strip()
     if not entity_name:
         return {"error": "Entity name is required for South Carolina search."}
 
+    pool = search_args.get("page_pool")
+    if pool and pool.supports("sc"):
+        page = await pool.acquire("sc")
+        try:
+            return await search_on_page(page, entity_name)
+        except Exception as e:
+            return {"error": f"An unexpected error occurred in SC scraper: {e}"}
+        finally:
+            await pool.release(page)
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "sc", headless=True)
         page = await browser.new_page()
         try:
             await page.goto(SC_SEARCH_URL, wait_until="domcontentloaded")
-            await page.fill("input#SearchTextBox", entity_name)
-            await page.select_option("select#EntitySearchTypeEnumId", value="3")
-            
-            async with page.expect_navigation():
-                await page.click("button#EntitySearchButton")
-
-            if await page.is_visible("p.alert.noResults"):
-                return []
-
-            first_row_link = page.locator("table#EntitySearchResultsTable tbody tr a").first
-            href = await first_row_link.get_attribute("href")
-            
-            await page.goto(SC_BASE_URL + href, wait_until="domcontentloaded")
-            
-            record = await parse_detail_page_async(page)
-            return [record]
+            return await search_on_page(page, entity_name)
         except Exception as e:
             return {"error": f"An unexpected error occurred in SC scraper: {e}"}
         finally:
-            await browser.close()
\ No newline at end of file
+            await browser.close()
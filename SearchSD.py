@@ -2,6 +2,7 @@ import subprocess
 import json
 import os
 import shutil
+from node_runner import run_node_script
 
 def check_south_dakota_dependencies():
     """Checks for dependencies required by the South Dakota scraper (ffmpeg, Vosk model)."""
@@ -44,10 +45,7 @@ def search_sd(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=300, shell=True # 5-minute timeout for this very complex task
-        )
+        run_node_script("sd", command, timeout=300) # 5-minute timeout for this very complex task
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -11,6 +11,8 @@ import subprocess
 import vosk
 import requests
 import shutil
+from browser_cache import launch_uc_chrome
+from deadline import budget_s
 
 # --- Configuration ---
 VOSK_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'vosk-model-small-en-us-0.15')
@@ -53,15 +55,15 @@ def search_tn(search_args):
     driver = None
     
     try:
-        driver = uc.Chrome(version_main=139)
-        wait = WebDriverWait(driver, 60)
+        driver = launch_uc_chrome(uc.Chrome, "tn", version_main=139)
+        wait = WebDriverWait(driver, budget_s(60))
         driver.maximize_window()
 
         driver.get('https://tncab.tnsos.gov/business-entity-search')
 
         iframe_selector = (By.ID, 'search-iframe')
         try:
-            WebDriverWait(driver, 7).until(EC.frame_to_be_available_and_switch_to_it(iframe_selector))
+            WebDriverWait(driver, budget_s(7)).until(EC.frame_to_be_available_and_switch_to_it(iframe_selector))
         except TimeoutException:
             pass # No iframe detected, proceed on main page.
 
@@ -1,6 +1,9 @@
 from playwright.async_api import async_playwright
 import asyncio
 import re
+from browser_cache import launch_chromium
+from latency_stats import step_budget_ms, timed_step
+from telemetry import span
 
 async def extract_registration_details_async(page):
     details = {"entity_name": "N/A", "registration_date": "N/A", "entity_type": "N/A", "business_identification_number": "N/A", "entity_status": "N/A", "statusActive": False, "address": "N/A"}
@@ -27,10 +30,11 @@ async def search_tx(search_args):
         return {"error": "Entity name is required for Texas search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "tx", headless=True)
         page = await browser.new_page()
         try:
-            await page.goto("https://comptroller.texas.gov/taxes/franchise/account-status/", timeout=30000)
+            with timed_step("tx", "search"):
+                await page.goto("https://comptroller.texas.gov/taxes/franchise/account-status/", timeout=step_budget_ms("tx", "search", 30000))
             await page.fill("#name", entity_name)
             
             async with page.expect_navigation():
@@ -39,10 +43,12 @@ async def search_tx(search_args):
             details_page_selector = "#content h2.uppercase"
             results_table_selector = "#resultTable"
             
-            await page.wait_for_selector(f"{details_page_selector}, {results_table_selector}", timeout=20000)
+            with timed_step("tx", "results"):
+                await page.wait_for_selector(f"{details_page_selector}, {results_table_selector}", timeout=step_budget_ms("tx", "results", 20000))
 
             if await page.locator(details_page_selector).count() > 0:
-                return [await extract_registration_details_async(page)]
+                with span("tx", "parse"):
+                    return [await extract_registration_details_async(page)]
 
             first_result_link = page.locator(f"{results_table_selector} tbody tr a").first
             if await first_result_link.count() == 0: return []
@@ -50,8 +56,10 @@ async def search_tx(search_args):
             async with page.expect_navigation(wait_until="load"):
                 await first_result_link.click()
             
-            await page.wait_for_selector(details_page_selector, timeout=20000)
-            return [await extract_registration_details_async(page)]
+            with timed_step("tx", "detail"):
+                await page.wait_for_selector(details_page_selector, timeout=step_budget_ms("tx", "detail", 20000))
+            with span("tx", "parse"):
+                return [await extract_registration_details_async(page)]
         except Exception as e:
             return {"error": f"An unexpected error occurred in TX scraper: {e}"}
         finally:
@@ -1,46 +1,68 @@
 from playwright.async_api import async_playwright
 import asyncio
+from page_pool import register_search_form
+from browser_cache import launch_chromium
+from deadline import budget_ms
+
+UT_SEARCH_URL = "https://secure.utah.gov/bes/"
+UT_SEARCH_INPUT = 'input[name="name"]'
+
+register_search_form("ut", UT_SEARCH_URL, UT_SEARCH_INPUT)
+
+async def search_on_page(page, entity_name):
+    """Runs the search from a page that is already on the search form."""
+    await page.fill(UT_SEARCH_INPUT, entity_name)
+
+    async with page.expect_navigation():
+        await page.click('button:has-text("Search")')
+
+    first_result_link = page.locator("table#entities > tbody > tr:first-child > td > a")
+    if await first_result_link.count() == 0:
+        return []
+
+    async with page.expect_navigation():
+        await first_result_link.click()
+
+    await page.wait_for_selector("div#entity-details")
+
+    async def get_detail(label):
+        element = page.locator(f"//dt[normalize-space()='{label}']/following-sibling::dd[1]")
+        return await element.inner_text() if await element.count() > 0 else None
+
+    entity_status = await get_detail("Status:")
+    scraped_data = {
+        "entity_name": await page.locator("h2.title").inner_text(),
+        "business_identification_number": await get_detail("Entity Number:"),
+        "entity_type": await get_detail("Type:"),
+        "address": await get_detail("Address:"),
+        "registration_date": await get_detail("Registration Date:"),
+        "entity_status": entity_status,
+        "statusActive": "active" in entity_status.lower() if entity_status else False,
+    }
+    return [scraped_data]
 
 async def search_ut(search_args):
     entity_name = search_args.get("entity_name")
     if not entity_name:
         return {"error": "Entity name is required for Utah search."}
 
+    pool = search_args.get("page_pool")
+    if pool and pool.supports("ut"):
+        page = await pool.acquire("ut")
+        try:
+            return await search_on_page(page, entity_name)
+        except Exception as e:
+            return {"error": f"An unexpected error occurred in UT scraper: {e}"}
+        finally:
+            await pool.release(page)
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "ut", headless=True)
         page = await browser.new_page()
         try:
-            await page.goto("https://secure.utah.gov/bes/", timeout=60000)
-            await page.fill('input[name="name"]', entity_name)
-            
-            async with page.expect_navigation():
-                await page.click('button:has-text("Search")')
-
-            first_result_link = page.locator("table#entities > tbody > tr:first-child > td > a")
-            if await first_result_link.count() == 0:
-                return []
-
-            async with page.expect_navigation():
-                await first_result_link.click()
-
-            await page.wait_for_selector("div#entity-details")
-
-            async def get_detail(label):
-                element = page.locator(f"//dt[normalize-space()='{label}']/following-sibling::dd[1]")
-                return await element.inner_text() if await element.count() > 0 else None
-
-            entity_status = await get_detail("Status:")
-            scraped_data = {
-                "entity_name": await page.locator("h2.title").inner_text(),
-                "business_identification_number": await get_detail("Entity Number:"),
-                "entity_type": await get_detail("Type:"),
-                "address": await get_detail("Address:"),
-                "registration_date": await get_detail("Registration Date:"),
-                "entity_status": entity_status,
-                "statusActive": "active" in entity_status.lower() if entity_status else False,
-            }
-            return [scraped_data]
+            await page.goto(UT_SEARCH_URL, timeout=budget_ms(60000))
+            return await search_on_page(page, entity_name)
         except Exception as e:
             return {"error": f"An unexpected error occurred in UT scraper: {e}"}
         finally:
-            await browser.close()
\ No newline at end of file
+            await browser.close()
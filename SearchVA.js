@@ -1,5 +1,6 @@
 const puppeteer = require('puppeteer-core');
 const fs = require('fs');
+const { instrumentPage } = require('./telemetry');
 
 // --- START: ADVANCED ANTI-BOT SPOOFING ---
 // This complex function helps the scraper appear more like a real browser.
@@ -64,12 +65,13 @@ const scrapeVirginia = async (searchTerm, outputFilename, executablePath) => {
     let browser;
     try {
         browser = await puppeteer.launch({
+            userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
             executablePath,
             headless: false, // Use 'new' for integration, set to false for debugging
             args: ['--no-sandbox', '--disable-setuid-sandbox', '--disable-blink-features=AutomationControlled', '--window-size=1920,1080']
         });
 
-        const page = await browser.newPage();
+        const page = instrumentPage(await browser.newPage());
         await page.evaluateOnNewDocument(antiBotSpoofing);
         await page.setViewport({ width: 1920, height: 1080 });
         page.setDefaultTimeout(60000);
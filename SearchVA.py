@@ -2,6 +2,7 @@ import subprocess
 import json
 import os
 import sys
+from node_runner import run_node_script
 
 def get_chrome_executable_path():
     """Tries to find the default path for Google Chrome on the current OS."""
@@ -42,10 +43,7 @@ def search_va(search_args):
     command = f'node "{script_path}" "{entity_name}" "{output_filename}" "{chrome_path}"'
 
     try:
-        subprocess.run(
-            command, check=True, capture_output=True, text=True,
-            timeout=180, shell=True
-        )
+        run_node_script("va", command, timeout=180)
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
                 return json.load(f)
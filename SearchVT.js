@@ -7,6 +7,7 @@ const path = require('path');
 const { exec } = require('child_process');
 const vosk = require('vosk');
 const axios = require('axios');
+const { instrumentPage } = require('./telemetry');
 
 // --- Configuration ---
 const VOSK_MODEL_PATH = path.join(__dirname, 'vosk-model-small-en-us-0.15');
@@ -49,8 +50,8 @@ const scrapeVermont = async (searchTerm, outputFilename) => {
     if (!fs.existsSync(DOWNLOAD_PATH)) fs.mkdirSync(DOWNLOAD_PATH);
     if (!fs.existsSync(ERROR_PATH)) fs.mkdirSync(ERROR_PATH);
 
-    const browser = await puppeteer.launch({ headless: false, defaultViewport: null, args: ['--start-maximized', '--no-sandbox'] });
-    const page = await browser.newPage();
+    const browser = await puppeteer.launch({ userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined, headless: false, defaultViewport: null, args: ['--start-maximized', '--no-sandbox'] });
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(90000);
     await page.setViewport({ width: 1920, height: 1080 });
     await page.setUserAgent('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36');
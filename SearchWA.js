@@ -1,6 +1,7 @@
 const puppeteer = require('puppeteer'); // Use standard Puppeteer
 const fs = require('fs');
 const path = require('path');
+const { instrumentPage } = require('./telemetry');
 
 const search_wa = async (searchTerm, outputFilename) => {
     if (!searchTerm || !outputFilename) {
@@ -15,10 +16,11 @@ const search_wa = async (searchTerm, outputFilename) => {
     let browser;
     try {
         browser = await puppeteer.launch({
+            userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
             headless: 'new',
             args: ['--no-sandbox', '--disable-setuid-sandbox']
         });
-        const page = await browser.newPage();
+        const page = instrumentPage(await browser.newPage());
         page.setDefaultTimeout(60000);
         await page.setViewport({ width: 1905, height: 919 });
 
@@ -1,15 +1,22 @@
 from playwright.async_api import async_playwright
 import asyncio
+from webforms import WebFormsClient, WebFormsError
+from page_pool import register_search_form
+from browser_cache import launch_chromium
+from cancellation import ScrapeCancelled
+from deadline import budget_ms, budget_s
+from telemetry import instrument_session
+from traffic_capture import capture_session
 
 WI_SEARCH_URL = "https://apps.dfi.wi.gov/apps/corpsearch/Search.aspx?"
 WI_BASE = "https://apps.dfi.wi.gov/apps/corpsearch/"
+WI_SEARCH_INPUT = 'input[name="ctl00$cpContent$txtSearchString"]'
 
-async def extract_detail_data_async(page) -> dict:
-    async def get_table_value(label_text: str) -> str:
-        row = page.locator(f"tr:has(td.label:has-text('{label_text}')) td.data").first
-        return await row.inner_text() if await row.count() > 0 else "N/A"
-    
-    raw_status = await get_table_value("Status")
+register_search_form("wi", WI_SEARCH_URL, WI_SEARCH_INPUT)
+
+def build_wi_record(entity_name, get_table_value) -> dict:
+    """Normalizes the detail-table values; get_table_value(label) returns the raw text or 'N/A'."""
+    raw_status = get_table_value("Status")
     status_keywords = ["Incorporated", "Qualified", "Registered", "Organized", "Restored"]
     entity_status = "N/A"
     statusActive = False
@@ -18,41 +25,117 @@ async def extract_detail_data_async(page) -> dict:
         statusActive = any(keyword.lower() in raw_status.lower() for keyword in status_keywords)
 
     return {
-        "entity_name": await page.locator("#entityName").inner_text(),
-        "registration_date": await get_table_value("Registered Effective Date"),
-        "entity_type": await get_table_value("Entity Type"),
-        "business_identification_number": await get_table_value("Entity ID"),
+        "entity_name": entity_name,
+        "registration_date": get_table_value("Registered Effective Date"),
+        "entity_type": get_table_value("Entity Type"),
+        "business_identification_number": get_table_value("Entity ID"),
         "entity_status": entity_status,
         "statusActive": statusActive,
-        "address": (await get_table_value("Principal Office")).replace('\n', ', '),
+        "address": get_table_value("Principal Office").replace('\n', ', '),
     }
 
+async def extract_detail_data_async(page) -> dict:
+    labels = ["Status", "Registered Effective Date", "Entity Type", "Entity ID", "Principal Office"]
+    values = {}
+    for label_text in labels:
+        row = page.locator(f"tr:has(td.label:has-text('{label_text}')) td.data").first
+        values[label_text] = await row.inner_text() if await row.count() > 0 else "N/A"
+
+    return build_wi_record(await page.locator("#entityName").inner_text(), values.get)
+
+# ----- HTTP engine (WebForms postback, no browser) ---------------------------
+def extract_detail_data_soup(soup) -> dict:
+    name_el = soup.select_one("#entityName")
+    if name_el is None:
+        raise WebFormsError("Wisconsin detail page did not contain #entityName.")
+
+    def get_table_value(label_text: str) -> str:
+        for label_td in soup.select("tr td.label"):
+            if label_text.lower() in label_td.get_text().lower():
+                data_td = label_td.find_parent("tr").select_one("td.data")
+                if data_td is not None:
+                    return data_td.get_text("\n", strip=True)
+        return "N/A"
+
+    return build_wi_record(name_el.get_text(strip=True), get_table_value)
+
+def search_wi_http(entity_name: str):
+    """
+    Runs the Wisconsin search as a WebForms postback. Raises WebFormsError if
+    the portal no longer looks the way this adapter expects.
+    """
+    client = WebFormsClient(timeout=budget_s(20))
+    instrument_session("wi", client.session)
+    capture_session("wi", client.session)
+    client.get(WI_SEARCH_URL)
+    soup = client.submit({"ctl00$cpContent$txtSearchString": entity_name},
+                         button="ctl00$cpContent$btnSearch")
+
+    if "No matches found." in soup.get_text():
+        return []
+
+    if soup.select_one("#results") is None:
+        raise WebFormsError("Wisconsin results table not found.")
+
+    first_row_link = soup.select_one("#results tbody tr td.nameAndTypeDescription span.name a")
+    if first_row_link is None or not first_row_link.get("href"): return []
+
+    detail = client.get(WI_BASE + first_row_link["href"].lstrip('/'))
+    return [extract_detail_data_soup(detail)]
+
+async def search_on_page(page, entity_name):
+    """Runs the browser search from a page that is already on the search form."""
+    await page.fill(WI_SEARCH_INPUT, entity_name)
+
+    async with page.expect_navigation():
+        await page.click('input[name="ctl00$cpContent$btnSearch"]')
+
+    if await page.locator("text='No matches found.'").count() > 0:
+        return []
+
+    first_row_link = page.locator("#results tbody tr td.nameAndTypeDescription span.name a").first
+    if await first_row_link.count() == 0: return []
+
+    href = await first_row_link.get_attribute("href")
+    await page.goto(WI_BASE + href.lstrip('/'))
+
+    return [await extract_detail_data_async(page)]
+
 async def search_wi(search_args: dict) -> dict:
+    """
+    Wisconsin search. Uses the HTTP (WebForms postback) engine by default and
+    falls back to Chromium if the portal rejects it; pass engine="browser" in
+    search_args to go straight to the browser.
+    """
     entity_name = search_args.get("entity_name")
     if not entity_name:
         return {"error": "Entity name required for Wisconsin search."}
-    
+
+    if search_args.get("engine", "http") != "browser":
+        try:
+            return await asyncio.to_thread(search_wi_http, entity_name)
+        except ScrapeCancelled:
+            raise  # Cancelled or out of time: the browser would be no better
+        except Exception:
+            pass  # Rejected postback, network or parse failure: fall through to the browser flow below
+
+    pool = search_args.get("page_pool")
+    if pool and pool.supports("wi"):
+        page = await pool.acquire("wi")
+        try:
+            return await search_on_page(page, entity_name)
+        except Exception as e:
+            return {"error": f"An unexpected error occurred in WI scraper: {e}"}
+        finally:
+            await pool.release(page)
+
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+        browser = await launch_chromium(p, "wi", headless=True)
         try:
-            await page.goto(WI_SEARCH_URL, timeout=20000)
-            await page.fill('input[name="ctl00$cpContent$txtSearchString"]', entity_name)
-            
-            async with page.expect_navigation():
-                await page.click('input[name="ctl00$cpContent$btnSearch"]')
-            
-            if await page.locator("text='No matches found.'").count() > 0:
-                return []
-
-            first_row_link = page.locator("#results tbody tr td.nameAndTypeDescription span.name a").first
-            if await first_row_link.count() == 0: return []
-            
-            href = await first_row_link.get_attribute("href")
-            await page.goto(WI_BASE + href.lstrip('/'))
-            
-            return [await extract_detail_data_async(page)]
+            page = await browser.new_page()
+            await page.goto(WI_SEARCH_URL, timeout=budget_ms(20000))
+            return await search_on_page(page, entity_name)
         except Exception as e:
             return {"error": f"An unexpected error occurred in WI scraper: {e}"}
         finally:
-            await browser.close()
\ No newline at end of file
+            await browser.close()
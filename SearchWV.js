@@ -1,6 +1,7 @@
 const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 const fs = require('fs');
+const { instrumentPage } = require('./telemetry');
 
 puppeteer.use(StealthPlugin());
 
@@ -13,13 +14,14 @@ const scrapeWestVirginia = async (searchTerm, outputFilename) => {
 
     // --- TEMPORARY CHANGE FOR DEBUGGING ---
     const browser = await puppeteer.launch({
+        userDataDir: process.env.SOS_BROWSER_PROFILE_DIR || undefined,
         headless: false, // Set to false to watch the browser in action
         slowMo: 50, // Slows down puppeteer operations by 50ms to make it easier to see
         args: ['--no-sandbox', '--disable-setuid-sandbox', '--start-maximized']
     });
     // --- END OF CHANGE ---
 
-    const page = await browser.newPage();
+    const page = instrumentPage(await browser.newPage());
     page.setDefaultTimeout(90000);
     await page.setViewport({ width: 1920, height: 1080 });
 
@@ -1,6 +1,7 @@
 import subprocess
 import json
 import os
+from node_runner import run_node_script
 
 def search_wv(search_args):
     """
@@ -21,14 +22,7 @@ def search_wv(search_args):
 
     try:
         # Execute the Node.js script within a system shell
-        subprocess.run(
-            command,
-            check=True,
-            capture_output=True,
-            text=True,
-            timeout=180,
-            shell=True  # <-- THIS IS THE FIX
-        )
+        run_node_script("wv", command, timeout=180)
 
         if os.path.exists(output_filename):
             with open(output_filename, 'r', encoding='utf-8') as f:
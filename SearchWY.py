@@ -1,6 +1,7 @@
 from playwright.async_api import async_playwright
 import asyncio
 import html, re 
+from browser_cache import launch_chromium
 
 WY_SEARCH_URL = "https://wyobiz.wyo.gov/Business/FilingSearch.aspx"
 WY_BASE_URL = "https://wyobiz.wyo.gov/Business/"
@@ -37,7 +38,7 @@ async def search_wy(search_args):
         return {"error": "Filing Name required for Wyoming search."}
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
+        browser = await launch_chromium(p, "wy", headless=True)
         page = await browser.new_page()
         try:
             await page.goto(WY_SEARCH_URL, wait_until="domcontentloaded")
@@ -0,0 +1,223 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_portal import FIXTURE_DIR, response_body, load_exchanges
+
+# Micro-benchmarks for the parsing and normalization helpers every record
+# goes through. Each helper runs over the inputs in
+# fixtures/parser_inputs.json (HI detail pages come from the recorded
+# exchanges in --fixtures, so a traffic_capture.py directory re-profiles it
+# against real payloads) and reports calls per second plus the peak and
+# retained memory of one call, from tracemalloc.
+#
+#   python benchmarks/bench_parsers.py                     # run and print
+#   python benchmarks/bench_parsers.py --save-baseline     # store as the baseline
+#   python benchmarks/bench_parsers.py --check             # exit 1 on regression
+#
+# BeautifulSoup helpers run once per installed parser backend
+# ("hi.extract_detail_data[lxml]"), and --alternative NAME=module:function
+# times another implementation of a helper on the same inputs, to compare
+# candidates before swapping one in. Baselines are machine-specific; store
+# and check them on the same host.
+INPUTS_PATH = os.path.join(FIXTURE_DIR, "parser_inputs.json")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "parsers.json")
+SOUP_BACKENDS = ("html.parser", "lxml", "html5lib")
+DEFAULT_TOLERANCE = 0.3   # timings on a busy host vary by ~20%
+MIN_TIME = 0.2   # seconds each timing repeat runs for
+REPEATS = 5
+
+# name -> (module, function); inputs are positional argument lists
+HELPERS = {
+    "ct.parse_ct_business_details": ("SearchCT", "parse_ct_business_details"),
+    "hi.normalize_date": ("SearchHI", "normalize_date"),
+    "mn.format_date": ("SearchMN", "format_date"),
+    "mn.clean_address": ("SearchMN", "clean_address"),
+    "wy.format_address": ("SearchWY", "format_address"),
+    "al.format_al_detail": ("SearchAL", "format_al_detail"),
+    "ny.format_date": ("SearchNY", "format_date"),
+}
+# name -> (module, function taking a BeautifulSoup document); inputs are HTML pages
+SOUP_HELPERS = {
+    "hi.extract_detail_data": ("SearchHI", "extract_detail_data"),
+}
+
+
+def load_function(spec):
+    module, _, function = spec.partition(":")
+    return getattr(importlib.import_module(module), function)
+
+def soup_backends():
+    from bs4 import BeautifulSoup
+    available = []
+    for backend in SOUP_BACKENDS:
+        try:
+            BeautifulSoup("<p></p>", backend)
+        except Exception:
+            continue
+        available.append(backend)
+    return available
+
+def detail_pages(fixture_dir, state):
+    """HTML bodies of the state's recorded detail-page responses."""
+    return [response_body(e).decode("utf-8", "replace") for e in load_exchanges(fixture_dir, [state])
+            if "html" in str(e.get("headers")).lower() and e.get("status", 200) == 200]
+
+
+def build_cases(fixture_dir, alternatives):
+    """name -> (callable running every input once, number of calls), or the reason it was skipped."""
+    with open(INPUTS_PATH, encoding="utf-8") as f:
+        inputs = json.load(f)
+    cases = {}
+
+    def add(name, function, arg_lists):
+        cases[name] = (lambda: [function(*args) for args in arg_lists], len(arg_lists))
+
+    for name, (module, function) in HELPERS.items():
+        try:
+            add(name, load_function(f"{module}:{function}"), inputs[name])
+        except ImportError as e:
+            cases[name] = f"skipped ({e})"
+    for name, (module, function) in SOUP_HELPERS.items():
+        pages = detail_pages(fixture_dir, name.split(".")[0])
+        try:
+            extract = load_function(f"{module}:{function}")
+        except ImportError as e:
+            cases[name] = f"skipped ({e})"
+            continue
+        from bs4 import BeautifulSoup
+        for backend in soup_backends():
+            add(f"{name}[{backend}]", lambda page, backend=backend: extract(BeautifulSoup(page, backend)),
+                [[page] for page in pages])
+    for name, spec in alternatives.items():
+        add(f"{name}<{spec}>", load_function(spec), inputs[name])
+    return cases
+
+
+# ----- Measurement -----------------------------------------------------------
+def time_case(run, calls):
+    """Best-of-REPEATS calls per second."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_TIME:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(MIN_TIME / elapsed * 1.2))
+    best = elapsed
+    for _ in range(REPEATS - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, time.perf_counter() - started)
+    return loops * calls / best
+
+def memory_case(run, calls):
+    """Peak and retained bytes of one call (averaged over the inputs)."""
+    run()   # warm caches (regexes, strptime) so they don't count
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = run()
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / calls, max(0, current - before) / calls
+
+def measure(cases):
+    results = {}
+    for name, case in sorted(cases.items()):
+        if isinstance(case, str):
+            results[name] = {"skipped": case}
+            continue
+        run, calls = case
+        if not calls:
+            results[name] = {"skipped": "no inputs"}
+            continue
+        peak, retained = memory_case(run, calls)
+        results[name] = {"ops_per_sec": time_case(run, calls), "peak_bytes": peak,
+                         "retained_bytes": retained, "inputs": calls}
+    return results
+
+
+# ----- Baseline --------------------------------------------------------------
+def regressions(baseline, results, tolerance):
+    """Helpers that got slower, or allocate more, than the baseline by more than tolerance."""
+    found = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before or "skipped" in now or "skipped" in before:
+            continue
+        if now["ops_per_sec"] < before["ops_per_sec"] * (1 - tolerance):
+            found.append(f"{name}: {before['ops_per_sec']:.0f} -> {now['ops_per_sec']:.0f} calls/s")
+        if now["peak_bytes"] > before["peak_bytes"] * (1 + tolerance) + 64:
+            found.append(f"{name}: peak {before['peak_bytes']:.0f} -> {now['peak_bytes']:.0f} bytes")
+    return found
+
+def print_results(results, baseline=None):
+    print(f"{'helper':<48}{'calls/s':>12}{'peak B':>10}{'kept B':>9}{'vs base':>10}")
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<48}  {r['skipped']}")
+            continue
+        before = (baseline or {}).get(name) or {}
+        change = (f"{(r['ops_per_sec'] / before['ops_per_sec'] - 1) * 100:+.1f}%"
+                  if before.get("ops_per_sec") else "-")
+        print(f"{name:<48}{r['ops_per_sec']:>12.0f}{r['peak_bytes']:>10.0f}{r['retained_bytes']:>9.0f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark the parsing and normalization helpers.")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="recorded exchanges to take HTML pages from")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on a regression against the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--alternative", action="append", default=[], metavar="NAME=MODULE:FUNCTION",
+                        help="also time another implementation of helper NAME on its inputs")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    alternatives = dict(spec.split("=", 1) for spec in args.alternative)
+    for name in alternatives:
+        if name not in HELPERS:
+            parser.error(f"--alternative takes one of: {', '.join(HELPERS)}")
+    results = measure(build_cases(args.fixtures, alternatives))
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    if args.check:
+        if baseline is None:
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+            sys.exit(1)
+        found = regressions(baseline, results, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
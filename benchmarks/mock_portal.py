@@ -0,0 +1,191 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from portal_urls import original_url
+
+# Local stand-in for the state portals. Serves recorded responses from
+# fixture files, one NDJSON file per state (benchmarks/fixtures/<state>.ndjson),
+# each line an exchange:
+#   {"method": "POST", "url": "https://host/path?query", "request_body": "...",
+#    "status": 200, "headers": {"Content-Type": "..."}, "body": "..."}
+# ("body_base64" instead of "body" for binary payloads; "request_body" is
+# optional). Playwright HARs named <state>-<anything>.har are read as well, so
+# a traffic_capture.py recording directory can be served as it is. Point the scrapers at it with SOS_PORTAL_BASE_URL (portal_urls.py);
+# a request for <base>/host/path?query is answered with the exchange for
+# https://host/path?query, matched on method, URL and request body, then on
+# method and URL, then on method, host and path. Anything else is a 404.
+#
+#   python benchmarks/mock_portal.py --port 8900 --latency 0.2 --jitter 0.05
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _digest(body):
+    return hashlib.sha1(body or b"").hexdigest()
+
+def _path_key(method, url):
+    parts = urlsplit(unquote(url))
+    return method, parts.netloc, parts.path
+
+
+def har_exchanges(path, state):
+    """The entries of a HAR file, as fixture exchanges."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f).get("log", {}).get("entries", [])
+    exchanges = []
+    for entry in entries:
+        request, response = entry["request"], entry["response"]
+        content = response.get("content") or {}
+        exchange = {
+            "state": state, "method": request["method"], "url": request["url"], "status": response["status"],
+            "headers": {h["name"]: h["value"] for h in response.get("headers", []) if not h["name"].startswith(":")},
+        }
+        if (request.get("postData") or {}).get("text") is not None:
+            exchange["request_body"] = request["postData"]["text"]
+        if content.get("encoding") == "base64":
+            exchange["body_base64"] = content.get("text") or ""
+        else:
+            exchange["body"] = content.get("text") or ""
+        exchanges.append(exchange)
+    return exchanges
+
+def load_exchanges(fixture_dir=FIXTURE_DIR, states=None):
+    """Exchanges from every <state>.ndjson and <state>-*.har in fixture_dir (or only the given states)."""
+    exchanges = []
+    for name in sorted(os.listdir(fixture_dir)) if os.path.isdir(fixture_dir) else []:
+        stem, ext = os.path.splitext(name)
+        state = stem.split("-", 1)[0]
+        if ext not in (".ndjson", ".har") or (states and state not in states):
+            continue
+        path = os.path.join(fixture_dir, name)
+        if ext == ".har":
+            exchanges.extend(har_exchanges(path, state))
+            continue
+        with open(path, encoding="utf-8") as f:
+            exchanges.extend(json.loads(line) for line in f if line.strip())
+    return exchanges
+
+
+class FixtureIndex:
+    """Recorded exchanges, looked up by request. Later entries win over earlier ones."""
+
+    def __init__(self, exchanges):
+        self.by_body, self.by_url, self.by_path = {}, {}, {}
+        for exchange in exchanges:
+            method, url = exchange.get("method", "GET").upper(), unquote(exchange["url"])
+            body = exchange.get("request_body")
+            if body is not None:
+                self.by_body[(method, url, _digest(body.encode("utf-8")))] = exchange
+            self.by_url[(method, url)] = exchange
+            self.by_path[_path_key(method, url)] = exchange
+
+    def __len__(self):
+        return len(self.by_url)
+
+    def match(self, method, url, body):
+        url = unquote(url)
+        return (self.by_body.get((method, url, _digest(body)))
+                or self.by_url.get((method, url))
+                or self.by_path.get(_path_key(method, url)))
+
+
+def response_body(exchange):
+    if "body_base64" in exchange:
+        return base64.b64decode(exchange["body_base64"])
+    return (exchange.get("body") or "").encode("utf-8")
+
+
+class MockPortalHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Hop-by-hop and encoding headers of the recording; the body is served as stored
+    SKIPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection"}
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        url = original_url(self.path)
+        server = self.server
+        exchange = server.index.match(self.command, url, body)
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        with server.lock:
+            server.requests += 1
+            if exchange is None:
+                server.misses.append(f"{self.command} {url}")
+        if exchange is None:
+            payload = json.dumps({"error": f"No fixture for {self.command} {url}"}).encode("utf-8")
+            status, headers = 404, {"Content-Type": "application/json"}
+        else:
+            payload = response_body(exchange)
+            status, headers = exchange.get("status", 200), exchange.get("headers") or {}
+        self.send_response(status)
+        for name, value in headers.items():
+            if name.lower() not in self.SKIPPED_HEADERS:
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_HEAD = _serve
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockPortal(ThreadingHTTPServer):
+    """
+    The mock portal server. latency (seconds, plus or minus up to jitter) is
+    added to every response, to stand in for the real portals' round trips.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, exchanges, host="127.0.0.1", port=0, latency=0.0, jitter=0.0):
+        super().__init__((host, port), MockPortalHandler)
+        self.index = FixtureIndex(exchanges)
+        self.latency, self.jitter = latency, jitter
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.misses = []
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="mock-portal", daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded portal responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds on top of --latency")
+    args = parser.parse_args()
+
+    server = MockPortal(load_exchanges(args.fixtures), args.host, args.port, args.latency, args.jitter)
+    print(f"Serving {len(server.index)} recorded responses at {server.base_url}")
+    print(f"Point the scrapers at it with SOS_PORTAL_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:   # Windows: no CPU figures
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_portal import FIXTURE_DIR, MockPortal, load_exchanges
+from memory_profile import MEMORY_PROFILE_ENV, RssSampler, get_memory_profiler, state_engine
+from memory_profile import print_report as print_memory_report
+
+# Offline benchmark: runs the scrapers against the mock portal
+# (mock_portal.py) instead of the live sites, so timings only move when the
+# code does. For every state with a fixture file it reports throughput,
+# p50/p95 lookup latency, CPU seconds and peak RSS of the process tree
+# (Python plus any browsers, drivers and Node processes), per state, per
+# engine and overall. Results go to benchmarks/results/<commit>.json;
+# --compare prints the change against an earlier results file, and --memory
+# adds per-lookup footprints and lookups per GB (memory_profile.py).
+#
+#   python benchmarks/run_benchmarks.py --iterations 20 --latency 0.1
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+#
+# The fixtures cover at least one state per engine: HI and NY (requests),
+# KY (WebForms postbacks), UT (Playwright), IL (Selenium) and CA (Node). The
+# browser and Node ones are hand-written stand-ins for the portal pages that
+# keep the selectors and API calls the scrapers rely on; record the live
+# portals with traffic_capture.py for real payload sizes. The Selenium
+# fixture's links are relative, since only driver.get() is redirected.
+#
+# Caches, stores, retries and the circuit breaker are turned off so every
+# iteration does the full scrape; per-state timeout histograms are too, so
+# runs don't feed each other.
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+BENCHMARK_ENV = {
+    "SOS_SEARCH_CACHE": "off",
+    "SOS_LOCATOR_INDEX": "off",
+    "SOS_STATE_STATS": "off",
+    "SOS_LATENCY_STATS": "off",
+    "SOS_BREAKER_THRESHOLD": "off",
+    "SOS_RETRY_ATTEMPTS": "1",
+    "SOS_SPAN_FILE": "",
+}
+
+
+# ----- Measurement -----------------------------------------------------------
+def cpu_seconds():
+    if resource is None:
+        return None
+    own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def summarize(latencies, wall, cpu, peak_rss):
+    return {
+        "lookups": len(latencies),
+        "throughput": len(latencies) / wall if wall else None,   # lookups per second
+        "p50": percentile(latencies, 0.5) if latencies else None,
+        "p95": percentile(latencies, 0.95) if latencies else None,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "peak_rss_mb": peak_rss / 2**20 if peak_rss else None,
+    }
+
+
+def bench_state(state_code, search_args, iterations, concurrency, sampler, portal):
+    from Main import search_business_by_state, search_outcome
+
+    def one(_):
+        started = time.perf_counter()
+        result = search_business_by_state(state_code, dict(search_args))
+        return time.perf_counter() - started, search_outcome(state_code, result)
+
+    misses_before = len(portal.misses)
+    sampler.reset()
+    cpu_before, started = cpu_seconds(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        runs = list(executor.map(one, range(iterations)))
+    wall = time.perf_counter() - started
+    cpu = cpu_seconds() - cpu_before if cpu_before is not None else None
+
+    latencies = [elapsed for elapsed, _ in runs]
+    outcomes = {}
+    for _, outcome in runs:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    summary = summarize(latencies, wall, cpu, sampler.peak)
+    summary.update(engine=state_engine(state_code), outcomes=outcomes, latencies=latencies,
+                   fixture_misses=sorted(set(portal.misses[misses_before:])))
+    return summary
+
+
+def combine(results):
+    latencies = [value for r in results for value in r["latencies"]]
+    wall = sum(r["wall_s"] for r in results)
+    cpus = [r["cpu_s"] for r in results if r["cpu_s"] is not None]
+    peak = max((r["peak_rss_mb"] or 0 for r in results), default=0) * 2**20
+    summary = summarize(latencies, wall, sum(cpus) if cpus else None, peak)
+    summary["states"] = len(results)
+    return summary
+
+
+# ----- Reporting -------------------------------------------------------------
+def git_revision():
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    try:
+        return git("rev-parse", "--short", "HEAD") or "unknown", bool(git("status", "--porcelain", "--untracked-files=no"))
+    except OSError:
+        return "unknown", False
+
+def _fmt(value, pattern="{:.3f}"):
+    return "-" if value is None else pattern.format(value)
+
+def print_report(report):
+    print(f"\n{'state':<8}{'engine':<12}{'lookups':>8}{'ops/s':>9}{'p50 s':>9}{'p95 s':>9}{'cpu s':>9}{'rss MB':>9}")
+    rows = [(s.upper(), r) for s, r in sorted(report["states"].items())]
+    rows += [(f"[{e}]", r) for e, r in sorted(report["engines"].items())]
+    rows.append(("ALL", report["aggregate"]))
+    for name, r in rows:
+        print(f"{name:<8}{r.get('engine', ''):<12}{r['lookups']:>8}{_fmt(r['throughput'], '{:.2f}'):>9}"
+              f"{_fmt(r['p50']):>9}{_fmt(r['p95']):>9}{_fmt(r['cpu_s'], '{:.2f}'):>9}{_fmt(r['peak_rss_mb'], '{:.0f}'):>9}")
+    for state, r in sorted(report["states"].items()):
+        if r["fixture_misses"]:
+            print(f"{state.upper()}: no fixture for {', '.join(r['fixture_misses'])}")
+
+def _change(old, new):
+    if old is None or new is None or not old:
+        return "-"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+def print_comparison(previous, report):
+    print(f"\nAgainst {previous['commit']} ({previous['started']}):")
+    print(f"{'':<8}{'ops/s':>10}{'p50':>10}{'p95':>10}{'cpu':>10}{'rss':>10}")
+    pairs = [(s.upper(), previous["states"].get(s), r) for s, r in sorted(report["states"].items())]
+    pairs += [(f"[{e}]", previous["engines"].get(e), r) for e, r in sorted(report["engines"].items())]
+    pairs.append(("ALL", previous["aggregate"], report["aggregate"]))
+    for name, old, new in pairs:
+        if not old:
+            continue
+        print(f"{name:<8}" + "".join(f"{_change(old.get(k), new.get(k)):>10}"
+                                     for k in ("throughput", "p50", "p95", "cpu_s", "peak_rss_mb")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the local mock portal.")
+    parser.add_argument("states", nargs="*", help="state codes (default: every state with a fixture file)")
+    parser.add_argument("--entity", default="Google")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds the mock adds to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--memory", action="store_true", help="profile each lookup's memory (slower)")
+    args = parser.parse_args()
+
+    states = [s.lower() for s in args.states] or sorted({
+        os.path.splitext(name)[0].split("-", 1)[0]
+        for name in os.listdir(args.fixtures) if name.endswith((".ndjson", ".har"))})
+    portal = MockPortal(load_exchanges(args.fixtures, states), latency=args.latency, jitter=args.jitter).start()
+    os.environ.update(BENCHMARK_ENV)
+    os.environ["SOS_PORTAL_BASE_URL"] = portal.base_url
+    if args.memory:
+        os.environ[MEMORY_PROFILE_ENV] = "1"
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit, "dirty": dirty, "started": datetime.now().isoformat(timespec="seconds"),
+        "config": {"entity": args.entity, "iterations": args.iterations, "concurrency": args.concurrency,
+                   "latency": args.latency, "jitter": args.jitter},
+        "states": {}, "engines": {}, "aggregate": None,
+    }
+    sampler = RssSampler().start()
+    search_args = {"entity_name": args.entity}
+    for state in states:
+        print(f"Benchmarking {state.upper()}...")
+        report["states"][state] = bench_state(state, search_args, args.iterations, args.concurrency, sampler, portal)
+    sampler.stop()
+    portal.shutdown()
+
+    by_engine = {}
+    for r in report["states"].values():
+        by_engine.setdefault(r["engine"], []).append(r)
+    report["engines"] = {engine: combine(results) for engine, results in by_engine.items()}
+    report["aggregate"] = combine(list(report["states"].values()))
+    profiler = get_memory_profiler()
+    if profiler:
+        report["memory"] = profiler.report()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    if report.get("memory"):
+        print()
+        print_memory_report(report["memory"])
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+    print(f"\nResults saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
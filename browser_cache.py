@@ -0,0 +1,394 @@
+import inspect
+import os
+import shutil
+from cancellation import ScrapeCancelled, current_scope, kill_process, register_cleanup
+from telemetry import instrument_driver, instrument_page, span
+from metrics import engine_started, engine_stopped
+from portal_urls import override_driver, route_target
+from traffic_capture import har_options
+from memory_profile import get_memory_profiler, track_process
+
+# Opt-in: point SOS_BROWSER_CACHE_DIR at a directory and every Chromium launch
+# (Playwright, undetected-chromedriver and the Node scripts) runs against a
+# persistent per-state profile there, so JS bundles, CSS and fonts are served
+# from disk on repeat lookups instead of being downloaded again.
+CACHE_ROOT_ENV = "SOS_BROWSER_CACHE_DIR"
+CACHE_SIZE_ENV = "SOS_BROWSER_CACHE_MB"   # per-state cap, default 256 MB
+PROFILE_DIR_ENV = "SOS_BROWSER_PROFILE_DIR"  # what the Node scripts read
+
+MAX_SLOTS_PER_STATE = 8
+# Only these profile sub-directories are ever pruned; cookies/preferences stay.
+CACHE_SUBDIRS = ("Cache", "Code Cache", "GPUCache", "CacheStorage", "ScriptCache")
+
+
+def cache_root():
+    return os.environ.get(CACHE_ROOT_ENV) or None
+
+def cache_cap_bytes():
+    return int(os.environ.get(CACHE_SIZE_ENV, "256")) * 1024 * 1024
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class ProfileSlot:
+    """
+    One browser profile directory, <root>/<state>/slot-N. Chromium refuses to
+    share a profile between running instances, so concurrent lookups for the
+    same state each take their own slot; a .lock file holding our pid marks it
+    as in use (and is reclaimed if that process has died).
+    """
+
+    def __init__(self, path, lock_path):
+        self.path = path
+        self.lock_path = lock_path
+
+    def release(self):
+        if self.lock_path and os.path.exists(self.lock_path):
+            os.remove(self.lock_path)
+        self.lock_path = None
+
+
+def _try_lock(lock_path):
+    try:
+        fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            with open(lock_path) as f:
+                owner = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            owner = 0
+        if owner and _pid_alive(owner):
+            return False
+        os.remove(lock_path)  # stale lock from a crashed run
+        return _try_lock(lock_path)
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    return True
+
+
+def prune_profile(path, max_bytes):
+    """Deletes the least recently used cache files until the profile is back under ~80% of max_bytes."""
+    files, total = [], 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            total += st.st_size
+            if any(part in CACHE_SUBDIRS for part in dirpath[len(path):].split(os.sep)):
+                files.append((st.st_mtime, st.st_size, full))
+    if total <= max_bytes:
+        return
+    for _, size, full in sorted(files):
+        try:
+            os.remove(full)
+        except OSError:
+            continue
+        total -= size
+        if total <= max_bytes * 0.8:
+            break
+
+
+def acquire_profile(state_code):
+    """Returns a locked ProfileSlot for the state, or None if caching is off or all slots are busy."""
+    root = cache_root()
+    if not root:
+        return None
+    state_dir = os.path.join(root, state_code.lower())
+    os.makedirs(state_dir, exist_ok=True)
+    for n in range(MAX_SLOTS_PER_STATE):
+        path = os.path.join(state_dir, f"slot-{n}")
+        lock_path = path + ".lock"
+        if _try_lock(lock_path):
+            os.makedirs(path, exist_ok=True)
+            prune_profile(path, cache_cap_bytes())
+            return ProfileSlot(path, lock_path)
+    return None
+
+
+def clear_cache(state_code=None):
+    """Removes the cached profiles for one state, or for all of them."""
+    root = cache_root()
+    if root:
+        shutil.rmtree(os.path.join(root, state_code.lower()) if state_code else root, ignore_errors=True)
+
+
+# ----- Playwright ------------------------------------------------------------
+def _persistent_kwargs(launch_kwargs):
+    kwargs = dict(launch_kwargs)
+    kwargs["args"] = list(kwargs.get("args") or []) + [f"--disk-cache-size={cache_cap_bytes()}"]
+    return kwargs
+
+
+class PersistentBrowser:
+    """
+    Stands in for a sync Playwright Browser. The first new_context()/new_page()
+    launches a persistent context on the profile slot (context options such as
+    user_agent are applied at that point); close() closes it and frees the slot.
+    A launch that fails frees the slot at once, since scrapers often open their
+    first page outside the try that closes the browser.
+    """
+
+    def __init__(self, chromium, slot, launch_kwargs, state_code=""):
+        self._chromium = chromium
+        self._state_code = state_code
+        self._slot = slot
+        self._launch_kwargs = _persistent_kwargs(launch_kwargs)
+        self._context = None
+        self._first_page_used = False
+
+    def new_context(self, **context_options):
+        if self._context is None:
+            try:
+                with span(self._state_code, "launch", persistent=True):
+                    self._context = self._chromium.launch_persistent_context(
+                        self._slot.path, **self._launch_kwargs, **context_options)
+            finally:
+                if self._context is None:
+                    self._slot.release()
+            engine_started("browser")
+            self._track_process()
+        return self._context
+
+    def _track_process(self):
+        if _wants_pid():
+            pid = _profile_pid(self._slot.path)
+            track_process(pid)
+            _kill_on_cancel(self._context, pid, "close")
+
+    def new_page(self, **context_options):
+        context = self.new_context(**context_options)
+        if not self._first_page_used and context.pages:
+            self._first_page_used = True
+            return context.pages[0]
+        return context.new_page()
+
+    def close(self):
+        try:
+            if self._context is not None:
+                self._context.close()
+                engine_stopped("browser")
+        finally:
+            self._slot.release()
+
+
+class AsyncPersistentBrowser(PersistentBrowser):
+    """Async-Playwright version of PersistentBrowser."""
+
+    async def new_context(self, **context_options):
+        if self._context is None:
+            try:
+                with span(self._state_code, "launch", persistent=True):
+                    self._context = await self._chromium.launch_persistent_context(
+                        self._slot.path, **self._launch_kwargs, **context_options)
+            finally:
+                if self._context is None:
+                    self._slot.release()
+            engine_started("browser")
+            self._track_process()
+        return self._context
+
+    async def new_page(self, **context_options):
+        context = await self.new_context(**context_options)
+        if not self._first_page_used and context.pages:
+            self._first_page_used = True
+            return context.pages[0]
+        return await context.new_page()
+
+    async def close(self):
+        try:
+            if self._context is not None:
+                await self._context.close()
+                engine_stopped("browser")
+        finally:
+            self._slot.release()
+
+
+def _browser_pid(browser):
+    """The pid of a sync Playwright browser's main process, or None."""
+    try:
+        session = browser.new_browser_cdp_session()
+        info = session.send("SystemInfo.getProcessInfo")
+        session.detach()
+        return next(proc["id"] for proc in info["processInfo"] if proc["type"] == "browser")
+    except Exception:
+        return None
+
+
+def _profile_pid(profile_path):
+    """The pid of the Chromium main process running on a profile directory, from /proc, or None."""
+    if not os.path.isdir("/proc"):
+        return None
+    flag = f"--user-data-dir={os.path.abspath(profile_path)}".encode()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        if flag in args and not any(arg.startswith(b"--type=") for arg in args):
+            return int(entry)
+    return None
+
+
+def _wants_pid():
+    """Finding a browser's pid costs a round trip; only a cancel scope or the memory profiler needs it."""
+    return current_scope() is not None or get_memory_profiler() is not None
+
+
+def _kill_on_cancel(browser, pid, closed_event="disconnected"):
+    """
+    Lets a cancelled scrape (see cancellation.py) kill this sync browser from
+    another thread; Playwright objects can't be closed off their own thread,
+    so the browser process is killed by pid instead.
+    """
+    if pid is None:
+        return
+    scope, token = register_cleanup(lambda: kill_process(pid))
+    if scope is not None:
+        browser.on(closed_event, lambda _browser: scope.unregister(token))
+
+
+def _count_browser(browser):
+    """Counts a launched browser as active (metrics.py) until it disconnects."""
+    engine_started("browser")
+    browser.on("disconnected", lambda _browser: engine_stopped("browser"))
+
+
+def _instrument_browser(state_code, browser):
+    """
+    Makes pages opened from browser report "navigate" spans (see telemetry.py),
+    record a HAR when capturing traffic (traffic_capture.py) and, with
+    SOS_PORTAL_BASE_URL set, load from the portal override (portal_urls.py).
+    """
+    new_page, new_context = browser.new_page, browser.new_context
+    if inspect.iscoroutinefunction(new_page):
+        async def instrumented_page(**options):
+            return await _open_page(new_page, state_code, options)
+
+        async def instrumented_context(**options):
+            context = await new_context(**{**har_options(state_code), **options})
+            routed = route_target(context)
+            if routed:
+                await routed
+            context.on("page", lambda page: instrument_page(state_code, page))
+            return context
+    else:
+        def instrumented_page(**options):
+            page = new_page(**{**har_options(state_code), **options})
+            route_target(page)
+            return instrument_page(state_code, page)
+
+        def instrumented_context(**options):
+            context = new_context(**{**har_options(state_code), **options})
+            route_target(context)
+            context.on("page", lambda page: instrument_page(state_code, page))
+            return context
+    browser.new_page = instrumented_page
+    browser.new_context = instrumented_context
+    return browser
+
+
+async def _open_page(new_page, state_code, options):
+    page = await new_page(**{**har_options(state_code), **options})
+    routed = route_target(page)
+    if routed:
+        await routed
+    return instrument_page(state_code, page)
+
+
+async def open_state_page(browser, state_code, **options):
+    """
+    Opens a page for state_code on an async Playwright browser shared between
+    states (the warm page pool's), with the same HAR capture, portal override
+    and navigate spans as pages from launch_chromium's browsers.
+    """
+    return await _open_page(browser.new_page, state_code, options)
+
+
+def launch_chromium(p, state_code, **launch_kwargs):
+    """
+    Drop-in for p.chromium.launch(**launch_kwargs) that works with both the sync
+    and async Playwright APIs (await the result with the async one). With
+    SOS_BROWSER_CACHE_DIR unset it launches exactly like p.chromium.launch.
+    The launch and every page navigation are recorded as telemetry spans.
+    """
+    slot = acquire_profile(state_code)
+    if slot is None:
+        if inspect.iscoroutinefunction(p.chromium.launch):
+            async def _launch():
+                with span(state_code, "launch"):
+                    browser = await p.chromium.launch(**launch_kwargs)
+                _count_browser(browser)
+                return _instrument_browser(state_code, browser)
+            return _launch()
+        with span(state_code, "launch"):
+            browser = p.chromium.launch(**launch_kwargs)
+        _count_browser(browser)
+        if _wants_pid():
+            pid = _browser_pid(browser)
+            track_process(pid)
+            _kill_on_cancel(browser, pid)
+        return _instrument_browser(state_code, browser)
+    if inspect.iscoroutinefunction(p.chromium.launch_persistent_context):
+        async def _launch():
+            return _instrument_browser(state_code, AsyncPersistentBrowser(p.chromium, slot, launch_kwargs, state_code))
+        return _launch()
+    return _instrument_browser(state_code, PersistentBrowser(p.chromium, slot, launch_kwargs, state_code))
+
+
+# ----- undetected-chromedriver ---------------------------------------------
+def launch_uc_chrome(chrome_cls, state_code, **kwargs):
+    """
+    Drop-in for uc.Chrome(**kwargs) that runs on the state's persistent profile
+    when caching is on; driver.quit() also frees the slot. A cancelled scrape
+    quits the driver.
+    """
+    slot = acquire_profile(state_code)
+    try:
+        with span(state_code, "launch"):
+            driver = chrome_cls(user_data_dir=slot.path, **kwargs) if slot else chrome_cls(**kwargs)
+    except Exception:
+        if slot:
+            slot.release()
+        raise
+
+    engine_started("driver")
+    service_process = getattr(getattr(driver, "service", None), "process", None)
+    track_process(getattr(service_process, "pid", None))
+    track_process(getattr(driver, "browser_pid", None))
+    running = [True]
+    original_quit = driver.quit
+    registration = [None, None]
+    def quit():
+        scope, token = registration
+        if scope is not None:
+            scope.unregister(token)
+        try:
+            original_quit()
+        finally:
+            if running[0]:
+                running[0] = False
+                engine_stopped("driver")
+            if slot:
+                slot.release()
+    driver.quit = quit
+    try:
+        registration[:] = register_cleanup(original_quit)
+    except ScrapeCancelled:
+        # The scope was cancelled while the driver started
+        quit()
+        raise
+    return instrument_driver(state_code, override_driver(driver))
@@ -0,0 +1,101 @@
+import contextlib
+import contextvars
+import os
+import signal
+import threading
+
+# Cooperative cancellation for scrapes running in worker threads. The
+# orchestrator runs each scrape inside a CancelScope; the launch helpers
+# (browser_cache.launch_chromium / launch_uc_chrome, node_runner) register a
+# way to tear down what they started, and CancelScope.cancel() runs those
+# closers from any thread so the blocked scraper fails fast and its browser,
+# driver or Node process is gone.
+
+
+class ScrapeCancelled(Exception):
+    """Raised inside a scrape whose scope has been cancelled."""
+
+
+class CancelScope:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._closers = {}
+        self._next_token = 0
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def wait(self, timeout):
+        """Sleeps up to timeout seconds; returns True early if the scope is cancelled."""
+        return self._event.wait(timeout)
+
+    def register(self, closer):
+        """Adds a teardown callable; returns a token for unregister(). Runs it at once if already cancelled."""
+        with self._lock:
+            if not self._event.is_set():
+                self._next_token += 1
+                self._closers[self._next_token] = closer
+                return self._next_token
+        _run_closer(closer)
+        raise ScrapeCancelled()
+
+    def unregister(self, token):
+        with self._lock:
+            self._closers.pop(token, None)
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            closers = list(self._closers.values())
+            self._closers.clear()
+        for closer in closers:
+            _run_closer(closer)
+
+
+def _run_closer(closer):
+    try:
+        closer()
+    except Exception:
+        pass
+
+
+_current_scope = contextvars.ContextVar("cancel_scope", default=None)
+
+def current_scope():
+    return _current_scope.get()
+
+@contextlib.contextmanager
+def scope_context(scope):
+    """Makes scope the current one for code running in this thread/context."""
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+def check_cancelled():
+    scope = current_scope()
+    if scope is not None and scope.cancelled:
+        raise ScrapeCancelled()
+
+def register_cleanup(closer):
+    """Registers closer with the current scope; returns (scope, token) or (None, None)."""
+    scope = current_scope()
+    if scope is None:
+        return None, None
+    return scope, scope.register(closer)
+
+
+def kill_process(pid, group=False):
+    """SIGKILLs a process (or its whole process group), ignoring ones already gone."""
+    try:
+        if group and hasattr(os, "killpg"):
+            os.killpg(pid, signal.SIGKILL)
+        else:
+            os.kill(pid, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
@@ -0,0 +1,41 @@
+// Node side of traffic_capture.py: with SOS_CAPTURE=record, node_runner.py
+// sets SOS_CAPTURE_STATE and SOS_CAPTURE_DIR, and every response a page
+// receives is appended to <dir>/<state>.ndjson in the mock portal's fixture
+// format. Works with Puppeteer and Playwright pages.
+const fs = require('fs');
+const path = require('path');
+
+const STATE = process.env.SOS_CAPTURE === 'record' ? process.env.SOS_CAPTURE_STATE : null;
+const TEXT_TYPES = ['text/', 'json', 'javascript', 'xml', 'x-www-form-urlencoded'];
+const DROPPED_HEADERS = new Set(['content-encoding', 'content-length', 'transfer-encoding', 'connection']);
+
+const record = async (response) => {
+    const url = response.url();
+    if (!/^https?:\/\//.test(url)) return;
+    const request = response.request();
+    let body;
+    try {
+        body = await (typeof response.buffer === 'function' ? response.buffer() : response.body());
+    } catch (e) {
+        body = Buffer.alloc(0);   // redirects and aborted loads have no body
+    }
+    const headers = {};
+    for (const [name, value] of Object.entries(response.headers())) {
+        if (!DROPPED_HEADERS.has(name.toLowerCase())) headers[name] = value;
+    }
+    const entry = { state: STATE, method: request.method(), url, status: response.status(), headers };
+    const postData = request.postData();
+    if (postData) entry.request_body = postData;
+    const contentType = headers['content-type'] || '';
+    if (TEXT_TYPES.some((kind) => contentType.includes(kind))) entry.body = body.toString('utf8');
+    else entry.body_base64 = body.toString('base64');
+    fs.mkdirSync(process.env.SOS_CAPTURE_DIR, { recursive: true });
+    fs.appendFileSync(path.join(process.env.SOS_CAPTURE_DIR, `${STATE}.ndjson`), JSON.stringify(entry) + '\n');
+};
+
+const recordPage = (page) => {
+    if (STATE) page.on('response', (response) => record(response).catch(() => {}));
+    return page;
+};
+
+module.exports = { recordPage };
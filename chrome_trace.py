@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import time
+
+from telemetry import get_span_recorder, record_span
+
+# Chrome trace-event export of telemetry spans, for looking at a multi-state
+# run as a timeline in chrome://tracing or https://ui.perfetto.dev. The file
+# has two processes:
+#   "states"   one track per state with its lookups and their phase spans
+#   "workers"  one track per thread with the lookups it ran, so idle executor
+#              threads show up as gaps, plus "event loop blocked" slices
+#              from monitor_event_loop()
+# Spans that overlap on one track (e.g. async lookups sharing the event loop
+# thread) are spread over extra lanes such as "MainThread #2".
+# The runners write one when SOS_TRACE_FILE is set.
+TRACE_FILE_ENV = "SOS_TRACE_FILE"
+
+STATES_PID, WORKERS_PID = 1, 2
+NESTING_SLACK = 0.001   # seconds; Node and Python clocks are rounded differently
+LOOP_TRACK = "event_loop"
+
+
+def _end(span):
+    return span["start"] + (span["duration"] or 0.0)
+
+def _pack(spans):
+    """Lane index per span, so that spans within a lane are either nested or disjoint."""
+    lanes = []   # per lane, the end times of the spans still open at the current point
+    assignment = {}
+    for index, span in sorted(enumerate(spans), key=lambda item: (item[1]["start"], -(item[1]["duration"] or 0))):
+        start, end = span["start"], _end(span)
+        for lane, open_ends in enumerate(lanes):
+            while open_ends and open_ends[-1] <= start + NESTING_SLACK:
+                open_ends.pop()
+            if not open_ends or end <= open_ends[-1] + NESTING_SLACK:
+                open_ends.append(end)
+                assignment[index] = lane
+                break
+        else:
+            lanes.append([end])
+            assignment[index] = len(lanes) - 1
+    return [assignment[i] for i in range(len(spans))]
+
+
+def chrome_trace(spans):
+    """Trace-event JSON (as a dict) for a list of span dicts from SpanRecorder.query()."""
+    spans = [s for s in spans if s.get("duration") is not None]
+    origin = min((s["start"] for s in spans), default=0.0)
+    events = [
+        {"ph": "M", "pid": STATES_PID, "name": "process_name", "args": {"name": "states"}},
+        {"ph": "M", "pid": WORKERS_PID, "name": "process_name", "args": {"name": "workers"}},
+    ]
+    tids = {}
+
+    def tid(pid, track, lane):
+        key = (pid, track, lane)
+        if key not in tids:
+            tids[key] = len(tids) + 1
+            label = track.upper() if pid == STATES_PID and track != LOOP_TRACK else track
+            events.append({"ph": "M", "pid": pid, "tid": tids[key], "name": "thread_name",
+                           "args": {"name": label if lane == 0 else f"{label} #{lane + 1}"}})
+            events.append({"ph": "M", "pid": pid, "tid": tids[key], "name": "thread_sort_index",
+                           "args": {"sort_index": tids[key]}})
+        return tids[key]
+
+    def add(pid, track, group):
+        for span, lane in zip(group, _pack(group)):
+            args = {k: v for k, v in span.items() if k not in ("start", "duration", "phase", "state") and v is not None}
+            name = span["phase"] if span["phase"] != "lookup" else f"{span['state'].upper()} lookup"
+            events.append({
+                "ph": "X", "pid": pid, "tid": tid(pid, track, lane), "name": name,
+                "cat": span["outcome"] if span["outcome"] else "ok",
+                "ts": (span["start"] - origin) * 1e6, "dur": (span["duration"] or 0.0) * 1e6,
+                "args": args,
+            })
+
+    by_state, by_thread = {}, {}
+    for span in spans:
+        if span["state"] == LOOP_TRACK:
+            by_thread.setdefault(span["thread"], []).append(span)
+            continue
+        by_state.setdefault(span["state"], []).append(span)
+        if span["phase"] == "lookup":
+            by_thread.setdefault(span["thread"], []).append(span)
+    for state in sorted(by_state):
+        add(STATES_PID, state, by_state[state])
+    for thread in sorted(by_thread):
+        add(WORKERS_PID, thread, by_thread[thread])
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path, since=None):
+    """Writes the recorded spans (optionally only those started after since) as a trace file."""
+    recorder = get_span_recorder()
+    spans = recorder.query(since=since) if recorder else []
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(spans), f)
+    return len(spans)
+
+
+def trace_path():
+    return os.environ.get(TRACE_FILE_ENV) or None
+
+
+async def monitor_event_loop(interval=0.05, threshold=0.1):
+    """
+    Runs until cancelled, recording an "event loop blocked" span whenever the
+    loop wakes up more than threshold seconds late, e.g. while a sync
+    Playwright call or a blocking request holds the loop thread.
+    """
+    while True:
+        expected = time.monotonic() + interval
+        await asyncio.sleep(interval)
+        lag = time.monotonic() - expected
+        if lag > threshold:
+            record_span(LOOP_TRACK, "event loop blocked", time.time() - lag, lag)
@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+
+# Per-state circuit breakers for the dispatch layer. After a run of failed
+# searches a state's circuit opens and searches return an "unavailable"
+# result immediately instead of running the portal flow to its longest
+# timeout. Once the cool-down has passed, one probe search is let through
+# (half-open); if it succeeds the circuit closes, otherwise it re-opens with
+# a longer cool-down. SOS_BREAKER_THRESHOLD and SOS_BREAKER_COOL_DOWN override
+# the defaults; SOS_BREAKER_THRESHOLD=off disables the breakers.
+THRESHOLD_ENV = "SOS_BREAKER_THRESHOLD"
+COOL_DOWN_ENV = "SOS_BREAKER_COOL_DOWN"
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+FAILURE_THRESHOLD = 5       # consecutive failures that open the circuit
+BASE_COOL_DOWN = 60.0       # seconds open before the first probe
+MAX_COOL_DOWN = 15 * 60.0   # cap for the doubling cool-down
+RECENT_ERRORS = 20          # error kinds kept per state for health reports
+
+
+class CircuitBreaker:
+    def __init__(self, state_code, failure_threshold=FAILURE_THRESHOLD,
+                 base_cool_down=BASE_COOL_DOWN, max_cool_down=MAX_COOL_DOWN):
+        self.state_code = state_code
+        self.failure_threshold = failure_threshold
+        self.base_cool_down = base_cool_down
+        self.max_cool_down = max_cool_down
+        self.status = CLOSED
+        self.consecutive_failures = 0
+        self.cool_down = base_cool_down
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.recent_errors = deque(maxlen=RECENT_ERRORS)
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a search may run now. In half-open state only one probe runs at a time."""
+        with self._lock:
+            if self.status == CLOSED:
+                return True
+            if self.status == OPEN and time.monotonic() - self.opened_at >= self.cool_down:
+                self.status = HALF_OPEN
+            if self.status == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            return False
+
+    def retry_after(self):
+        with self._lock:
+            if self.status != OPEN:
+                return 0.0
+            return max(0.0, self.cool_down - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+            self.status = CLOSED
+            self.cool_down = self.base_cool_down
+
+    def record_failure(self, kind="error"):
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.recent_errors.append(kind)
+            if self.status == HALF_OPEN:
+                # failed probe: back off for longer
+                self.cool_down = min(self.cool_down * 2, self.max_cool_down)
+                self._open()
+            elif self.status == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self.probe_in_flight = False
+
+    def release_probe(self):
+        """Ends a probe that neither succeeded nor failed (e.g. caller's deadline ran out)."""
+        with self._lock:
+            self.probe_in_flight = False
+
+    def _open(self):
+        self.status = OPEN
+        self.opened_at = time.monotonic()
+
+    def health(self):
+        with self._lock:
+            return {
+                "status": self.status,
+                "consecutive_failures": self.consecutive_failures,
+                "successes": self.successes,
+                "failures": self.failures,
+                "recent_errors": dict(Counter(self.recent_errors)),
+                "cool_down": self.cool_down,
+            }
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per state, created on first use."""
+
+    def __init__(self, **breaker_kwargs):
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, state_code):
+        state_code = state_code.lower()
+        with self._lock:
+            breaker = self._breakers.get(state_code)
+            if breaker is None:
+                breaker = self._breakers[state_code] = CircuitBreaker(state_code, **self._breaker_kwargs)
+            return breaker
+
+    def health(self):
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {code: breaker.health() for code, breaker in sorted(breakers.items())}
+
+
+_breakers = None
+_breakers_lock = threading.Lock()
+
+def get_circuit_breakers():
+    """Returns the process-wide breakers, or None if they have been disabled."""
+    global _breakers
+    threshold = os.environ.get(THRESHOLD_ENV) or str(FAILURE_THRESHOLD)
+    if threshold.lower() == "off":
+        return None
+    with _breakers_lock:
+        if _breakers is None:
+            cool_down = float(os.environ.get(COOL_DOWN_ENV) or BASE_COOL_DOWN)
+            _breakers = CircuitBreakers(
+                failure_threshold=int(threshold), base_cool_down=cool_down,
+                max_cool_down=max(cool_down, MAX_COOL_DOWN),
+            )
+        return _breakers
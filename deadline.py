@@ -0,0 +1,74 @@
+import contextlib
+import contextvars
+import time
+
+from cancellation import ScrapeCancelled
+
+# Per-request time budget. Callers put one in search_args["deadline"] (a
+# Deadline, or a number of seconds); the dispatch layer makes it current while
+# the engine runs, and the engines size their waits with budget_ms()/budget_s()
+# so nothing waits past the caller's budget. When it runs out the dispatch
+# layer cancels the scrape (see cancellation.py).
+
+MIN_WAIT_SECONDS = 1.0  # never hand an engine a zero/negative wait
+
+
+class DeadlineExceeded(ScrapeCancelled):
+    """Raised when a search runs out of its time budget."""
+
+
+class Deadline:
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+        self.expires_at = time.monotonic() + self.seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.seconds:g}s exceeded.")
+
+    def __repr__(self):
+        return f"Deadline({self.seconds:g}s, {self.remaining():.1f}s left)"
+
+
+def as_deadline(value):
+    """Accepts a Deadline, a number of seconds, or None."""
+    if value is None or isinstance(value, Deadline):
+        return value
+    return Deadline(value)
+
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+def current_deadline():
+    return _current_deadline.get()
+
+@contextlib.contextmanager
+def deadline_context(deadline):
+    """Makes deadline the one engines see for code running in this context."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def budget_s(default_seconds):
+    """default_seconds, capped at what is left of the current deadline."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default_seconds
+    return max(MIN_WAIT_SECONDS, min(default_seconds, deadline.remaining()))
+
+def budget_ms(default_ms):
+    """Playwright-style milliseconds version of budget_s()."""
+    deadline = current_deadline()
+    if deadline is None:
+        return default_ms
+    return int(max(MIN_WAIT_SECONDS, min(default_ms / 1000.0, deadline.remaining())) * 1000)
@@ -0,0 +1,269 @@
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Durable job store for batch runs. A job is a named set of tasks (for the
+# runners: one per state), each pending, running, done or failed. Workers
+# claim tasks under a time-limited lease and write each result as soon as it
+# is in, so a killed run loses only the tasks it was running: starting the
+# same run again resumes the unfinished job, skipping finished tasks and
+# re-running those whose lease ran out, or whose worker was a process on
+# this host that no longer exists. Several worker processes can share one
+# job file; claims are atomic, and each task runs once unless its worker
+# dies or it ends in a transient error (retry), up to MAX_ATTEMPTS claims.
+#   SOS_JOB_STORE  job file (default job_store.sqlite3 here); "off" keeps jobs
+#                  in memory only, with no resume
+#   SOS_JOB_LEASE  seconds a claim lasts without renewal (default 600)
+JOB_STORE_ENV = "SOS_JOB_STORE"
+JOB_LEASE_ENV = "SOS_JOB_LEASE"
+DEFAULT_JOB_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_store.sqlite3")
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+DEFAULT_LEASE = 600.0
+MAX_ATTEMPTS = 3       # claims of one task before a lost lease or a retried error fails it for good
+BUSY_TIMEOUT = 30.0    # seconds to wait for another process's write
+
+
+def worker_id():
+    """Identifies this process's claims in the job file."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def lease_seconds():
+    return float(os.environ.get(JOB_LEASE_ENV) or DEFAULT_LEASE)
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+def _is_dead_worker(owner):
+    """True if owner is a worker_id() of a process on this host that has exited."""
+    host, _, pid = (owner or "").rpartition(":")
+    return host == socket.gethostname() and pid.isdigit() and not _pid_alive(int(pid))
+
+
+class JobStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY, name TEXT NOT NULL, meta TEXT,"
+                " created_at REAL NOT NULL, finished_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " job_id TEXT NOT NULL, task_key TEXT NOT NULL, position INTEGER NOT NULL,"
+                " payload TEXT, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " lease_owner TEXT, lease_expires REAL, result TEXT, error TEXT, updated_at REAL NOT NULL,"
+                " PRIMARY KEY (job_id, task_key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (job_id, state, position)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT under the thread lock: takes the file's write lock up front."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # --- jobs ---
+    def open_job(self, name, tasks, meta=None):
+        """
+        Resumes the unfinished job called name, or creates it. tasks is an
+        ordered {task_key: payload}; keys a resumed job lacks are added.
+        Returns the job id.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE name = ? AND finished_at IS NULL ORDER BY created_at DESC LIMIT 1", (name,)
+            ).fetchone()
+            job_id = row[0] if row else uuid.uuid4().hex[:12]
+            if not row:
+                conn.execute("INSERT INTO jobs (id, name, meta, created_at) VALUES (?, ?, ?, ?)",
+                             (job_id, name, json.dumps(meta, default=str), now))
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (job_id, task_key, position, payload, state, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, key, position, json.dumps(payload, default=str), PENDING, now)
+                 for position, (key, payload) in enumerate(tasks.items())],
+            )
+        return job_id
+
+    def progress(self, job_id):
+        """{state: task count} for the job."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY state", (job_id,)
+            ).fetchall()
+        return {state: count for state, count in rows}
+
+    def finished(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT finished_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def results(self, job_id):
+        """{task_key: result} for every finished task; failed ones as their last error result or {"error": ...}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_key, state, result, error FROM tasks WHERE job_id = ? AND state IN (?, ?)"
+                " ORDER BY position", (job_id, DONE, FAILED)
+            ).fetchall()
+        return {key: json.loads(result) if result is not None else {"error": error} for key, state, result, error in rows}
+
+    # --- tasks ---
+    def claim(self, job_id, worker, limit=None, lease=None):
+        """
+        Leases up to limit (default: all) claimable tasks, pending ones and
+        those whose lease ran out, in job order. Returns [(task_key, payload)].
+        A lease held by a dead process on this host counts as run out, so a
+        restart after a kill picks its tasks up at once.
+        """
+        now, lease = time.time(), lease or lease_seconds()
+        with self._transaction() as conn:
+            owners = conn.execute(
+                "SELECT DISTINCT lease_owner FROM tasks WHERE job_id = ? AND state = ? AND lease_expires >= ?",
+                (job_id, RUNNING, now),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET lease_expires = 0 WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                [(job_id, RUNNING, owner) for owner, in owners if owner != worker and _is_dead_worker(owner)],
+            )
+            conn.execute(
+                "UPDATE tasks SET state = ?, error = ?, lease_owner = NULL, updated_at = ?"
+                " WHERE job_id = ? AND state = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, f"Worker lost the task {MAX_ATTEMPTS} times.", now, job_id, RUNNING, now, MAX_ATTEMPTS),
+            )
+            rows = conn.execute(
+                "SELECT task_key, payload FROM tasks WHERE job_id = ?"
+                " AND (state = ? OR (state = ? AND lease_expires < ?)) ORDER BY position LIMIT ?",
+                (job_id, PENDING, RUNNING, now, -1 if limit is None else limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?,"
+                " updated_at = ? WHERE job_id = ? AND task_key = ?",
+                [(RUNNING, worker, now + lease, now, job_id, key) for key, _ in rows],
+            )
+            self._finish_if_done(conn, job_id, now)
+        return [(key, json.loads(payload)) for key, payload in rows]
+
+    def renew(self, job_id, worker, lease=None):
+        """Extends the leases of every task worker is running in the job."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (now + (lease or lease_seconds()), job_id, RUNNING, worker),
+            )
+
+    def complete(self, job_id, task_key, result):
+        """Stores a task's result. A late result, from a worker whose lease ran out, still counts."""
+        self._settle(job_id, task_key, DONE, json.dumps(result, default=str), None)
+
+    def fail(self, job_id, task_key, error):
+        """Marks a task failed for good."""
+        self._settle(job_id, task_key, FAILED, None, str(error))
+
+    def retry(self, job_id, task_key, result):
+        """
+        Stores a transient error result. The task goes back to pending unless
+        it has been claimed MAX_ATTEMPTS times, when it fails with this result.
+        Returns True if it will run again.
+        """
+        now = time.time()
+        error = result.get("error") if isinstance(result, dict) else None
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET state = CASE WHEN attempts < ? THEN ? ELSE ? END, result = ?, error = ?,"
+                " lease_owner = NULL, lease_expires = NULL, updated_at = ?"
+                " WHERE job_id = ? AND task_key = ? AND state != ?",
+                (MAX_ATTEMPTS, PENDING, FAILED, json.dumps(result, default=str), str(error or result),
+                 now, job_id, task_key, DONE),
+            )
+            state = conn.execute(
+                "SELECT state FROM tasks WHERE job_id = ? AND task_key = ?", (job_id, task_key)
+            ).fetchone()
+            self._finish_if_done(conn, job_id, now)
+        return bool(state and state[0] == PENDING)
+
+    def _settle(self, job_id, task_key, state, result, error):
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET state = ?, result = ?, error = ?, lease_owner = NULL, lease_expires = NULL,"
+                " updated_at = ? WHERE job_id = ? AND task_key = ? AND state != ?",
+                (state, result, error, now, job_id, task_key, DONE),
+            )
+            self._finish_if_done(conn, job_id, now)
+
+    def _finish_if_done(self, conn, job_id, now):
+        open_tasks = conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE job_id = ? AND state IN (?, ?)", (job_id, PENDING, RUNNING)
+        ).fetchone()[0]
+        if not open_tasks:
+            conn.execute("UPDATE jobs SET finished_at = ? WHERE id = ? AND finished_at IS NULL", (now, job_id))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LeaseKeeper:
+    """Renews a worker's leases in a job from a background thread while the block runs."""
+
+    def __init__(self, store, job_id, worker, lease=None):
+        self.store, self.job_id, self.worker = store, job_id, worker
+        self.lease = lease or lease_seconds()
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(self.lease / 3):
+            try:
+                self.store.renew(self.job_id, self.worker, self.lease)
+            except sqlite3.Error:
+                continue
+
+    def __enter__(self):
+        threading.Thread(target=self._run, name="job-leases", daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_job_store():
+    """
+    Returns the process-wide job store. With SOS_JOB_STORE=off it lives in
+    memory, so runs still go through it but cannot be resumed.
+    """
+    global _store
+    path = os.environ.get(JOB_STORE_ENV) or DEFAULT_JOB_STORE_PATH
+    if path.lower() == "off":
+        path = ":memory:"
+    with _store_lock:
+        if _store is None or _store.path != path:
+            _store = JobStore(path)
+        return _store
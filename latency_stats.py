@@ -0,0 +1,178 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from deadline import budget_s
+from telemetry import span
+
+# Rolling latency histograms per (state, step), used to size step timeouts.
+# Engines wrap a step (loading the search form, waiting for results, loading
+# the detail page, running a Node script) in timed_step() and ask
+# step_budget_s()/step_budget_ms() for its timeout: once a step has history
+# the fixed default is replaced by a high quantile of what the portal has
+# recently taken plus a margin, so dead requests are cut early while a portal
+# that has slowed down gets a longer wait. Set SOS_LATENCY_STATS to a file
+# path to move the store, or "off" to always use the fixed defaults.
+LATENCY_PATH_ENV = "SOS_LATENCY_STATS"
+DEFAULT_LATENCY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "latency_stats.sqlite3")
+QUANTILE_ENV = "SOS_TIMEOUT_QUANTILE"
+MARGIN_ENV = "SOS_TIMEOUT_MARGIN"
+
+DEFAULT_QUANTILE = 0.99
+DEFAULT_MARGIN = 1.5      # timeout = quantile * margin
+MIN_SAMPLES = 10          # history needed before the default is replaced
+MIN_TIMEOUT = 5.0         # seconds; never cut a step shorter than this
+MAX_STRETCH = 2.0         # never wait longer than this many times the default
+DECAY = 0.98              # per-sample weight decay; roughly the last 50 samples count
+
+# Log-spaced bucket upper bounds: 50ms growing by 20% per bucket, up to ~40 minutes.
+BUCKETS = [0.05 * 1.2 ** i for i in range(75)]
+
+
+class LatencyHistogram:
+    def __init__(self, counts=None, samples=0):
+        self.counts = list(counts) if counts else [0.0] * len(BUCKETS)
+        self.samples = samples
+
+    def add(self, seconds):
+        self.counts = [c * DECAY for c in self.counts]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                break
+        self.counts[i] += 1.0
+        self.samples += 1
+
+    def quantile(self, q):
+        total = sum(self.counts)
+        if not total:
+            return None
+        target = q * total
+        running = 0.0
+        for count, bound in zip(self.counts, BUCKETS):
+            running += count
+            if running >= target:
+                return bound
+        return BUCKETS[-1]
+
+
+class LatencyStats:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS step_latency ("
+                " state TEXT NOT NULL, step TEXT NOT NULL, counts TEXT NOT NULL,"
+                " samples INTEGER NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (state, step))"
+            )
+        self._histograms = {}
+        for state, step, counts, samples in self._conn.execute(
+            "SELECT state, step, counts, samples FROM step_latency"
+        ):
+            counts = json.loads(counts)
+            if len(counts) == len(BUCKETS):
+                self._histograms[(state, step)] = LatencyHistogram(counts, samples)
+
+    def record(self, state_code, step, seconds):
+        key = (state_code.lower(), step)
+        with self._lock, self._conn:
+            histogram = self._histograms.setdefault(key, LatencyHistogram())
+            histogram.add(seconds)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO step_latency (state, step, counts, samples, updated_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key[0], step, json.dumps([round(c, 4) for c in histogram.counts]), histogram.samples, time.time()),
+            )
+
+    def quantile(self, state_code, step, q):
+        """q-quantile of the step's recent latency, or None with too little history."""
+        with self._lock:
+            histogram = self._histograms.get((state_code.lower(), step))
+            if histogram is None or histogram.samples < MIN_SAMPLES:
+                return None
+            return histogram.quantile(q)
+
+    def snapshot(self):
+        """{state: {step: {"samples", "p50", "p95", "p99"}}}"""
+        with self._lock:
+            items = list(self._histograms.items())
+        stats = {}
+        for (state, step), histogram in sorted(items):
+            stats.setdefault(state, {})[step] = {
+                "samples": histogram.samples,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+            }
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+def get_latency_stats():
+    """Returns the process-wide histogram store, or None if it has been disabled."""
+    global _stats
+    path = os.environ.get(LATENCY_PATH_ENV) or DEFAULT_LATENCY_PATH
+    if path.lower() == "off":
+        return None
+    with _stats_lock:
+        if _stats is None or _stats.path != path:
+            _stats = LatencyStats(path)
+        return _stats
+
+
+def adaptive_timeout(state_code, step, default_seconds):
+    """Timeout for a step: quantile * margin of its history, within [MIN_TIMEOUT, default * MAX_STRETCH]."""
+    stats = get_latency_stats()
+    if not stats:
+        return default_seconds
+    q = float(os.environ.get(QUANTILE_ENV) or DEFAULT_QUANTILE)
+    observed = stats.quantile(state_code, step, q)
+    if observed is None:
+        return default_seconds
+    margin = float(os.environ.get(MARGIN_ENV) or DEFAULT_MARGIN)
+    return min(max(observed * margin, MIN_TIMEOUT), default_seconds * MAX_STRETCH)
+
+def step_budget_s(state_code, step, default_seconds):
+    """adaptive_timeout(), capped by the current request deadline."""
+    return budget_s(adaptive_timeout(state_code, step, default_seconds))
+
+def step_budget_ms(state_code, step, default_ms):
+    """Playwright-style milliseconds version of step_budget_s()."""
+    return int(step_budget_s(state_code, step, default_ms / 1000.0) * 1000)
+
+
+def _is_timeout(error):
+    return "timeout" in type(error).__name__.lower()
+
+@contextlib.contextmanager
+def timed_step(state_code, step):
+    """
+    Records how long the block took, and reports it as a telemetry span.
+    Steps that time out are recorded too (at the time they gave up), so a
+    slowing portal pushes its own timeout up; other failures say little about
+    latency and are not recorded.
+    """
+    started = time.monotonic()
+    with span(state_code, step) as current:
+        try:
+            yield current
+        except Exception as e:
+            if _is_timeout(e):
+                _record(state_code, step, time.monotonic() - started)
+            raise
+    _record(state_code, step, time.monotonic() - started)
+
+def _record(state_code, step, seconds):
+    stats = get_latency_stats()
+    if stats:
+        stats.record(state_code, step, seconds)
@@ -0,0 +1,87 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Remembers where each (state, entity name) search ended up -- the detail page
+# URL, account id or file number the scraper followed from the top result --
+# so a repeat lookup can go straight to the detail page and skip the search.
+# Set SOS_LOCATOR_INDEX to a file path to move the index, or to "off" to
+# disable it.
+INDEX_PATH_ENV = "SOS_LOCATOR_INDEX"
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locator_index.sqlite3")
+
+
+def normalize_name(name):
+    """Case- and punctuation-insensitive key for an entity name."""
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", (name or "").casefold()).split())
+
+
+def report_locator(search_args, locator):
+    """Called by a scraper once it has resolved the detail locator for its top result."""
+    callback = (search_args or {}).get("on_locator")
+    if callback and locator:
+        callback(str(locator))
+
+
+class LocatorIndex:
+    """SQLite-backed (state, normalized name) -> detail locator map."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS locators ("
+                " state TEXT NOT NULL, name TEXT NOT NULL, locator TEXT NOT NULL,"
+                " updated_at REAL NOT NULL, PRIMARY KEY (state, name))"
+            )
+
+    def get(self, state_code, entity_name):
+        key = normalize_name(entity_name)
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT locator FROM locators WHERE state = ? AND name = ?",
+                (state_code.lower(), key),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, state_code, entity_name, locator):
+        key = normalize_name(entity_name)
+        if not key or not locator:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO locators (state, name, locator, updated_at) VALUES (?, ?, ?, ?)",
+                (state_code.lower(), key, locator, time.time()),
+            )
+
+    def forget(self, state_code, entity_name):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM locators WHERE state = ? AND name = ?",
+                (state_code.lower(), normalize_name(entity_name)),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_locator_index():
+    """Returns the process-wide index, or None if it has been disabled."""
+    global _index
+    path = os.environ.get(INDEX_PATH_ENV) or DEFAULT_INDEX_PATH
+    if path.lower() == "off":
+        return None
+    with _index_lock:
+        if _index is None or _index.path != path:
+            _index = LocatorIndex(path)
+        return _index
@@ -0,0 +1,309 @@
+import collections
+import contextlib
+import contextvars
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+from telemetry import current_lookup
+
+# Opt-in memory profiling of lookups, for sizing worker hosts. With
+# SOS_MEMORY_PROFILE set ("1", or a file path to also append one NDJSON
+# record per lookup) every dispatched lookup is sampled while it runs:
+#   - the RSS of the browser, driver and Node processes it started, read from
+#     /proc. Launchers register their pids (track_process); while a lookup
+#     runs alone, any other new child processes are counted against it too.
+#   - the Python heap growth from tracemalloc (exact while the lookup runs
+#     alone; with concurrent lookups it includes their allocations as well).
+# report() rolls the records up per engine and per state, including how many
+# concurrent lookups fit in a GB at the p95 footprint. tracemalloc slows
+# Python down noticeably, hence opt-in.
+#
+#   python memory_profile.py memory.ndjson   # report from a recorded file
+MEMORY_PROFILE_ENV = "SOS_MEMORY_PROFILE"
+
+SAMPLE_INTERVAL = 0.1   # seconds
+MAX_RECORDS = 5000
+GIB = 2 ** 30
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+# ----- /proc -----------------------------------------------------------------
+def process_children():
+    """{ppid: [child pids]} for every process, from one pass over /proc."""
+    children = collections.defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        children[int(stat.rsplit(")", 1)[1].split()[1])].append(int(entry))
+    return children
+
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def descendants(pid, children=None):
+    """pid and every process below it."""
+    children = process_children() if children is None else children
+    found, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        found.append(current)
+        pending.extend(children.get(current, ()))
+    return found
+
+def tree_rss(pid=None, children=None):
+    """Resident bytes of pid (default: this process) and all its descendants."""
+    return sum(rss_bytes(p) for p in descendants(pid or os.getpid(), children))
+
+
+class RssSampler:
+    """Samples tree_rss() in the background; peak is the highest sample since reset()."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.available = os.path.isdir("/proc")
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.available:
+            threading.Thread(target=self._run, name="rss-sampler", daemon=True).start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, tree_rss())
+
+    def reset(self):
+        self.peak = tree_rss() if self.available else 0
+
+    def stop(self):
+        self._stop.set()
+
+
+@functools.lru_cache(maxsize=None)
+def state_engine(state_code):
+    """Which engine a state's scraper drives by default, read from its module."""
+    try:
+        with open(os.path.join(ROOT, f"Search{state_code.upper()}.py"), encoding="utf-8") as f:
+            source = f.read()
+    except OSError:
+        return "unknown"
+    # WebForms scrapers (KY, WI) run over HTTP and keep Playwright only as a fallback
+    if "WebFormsClient" in source:
+        return "http"
+    if "node_runner" in source:
+        return "node"
+    if "playwright" in source:
+        return "playwright"
+    if "selenium" in source or "launch_uc_chrome" in source:
+        return "selenium"
+    return "http"
+
+
+# ----- Profiles --------------------------------------------------------------
+class LookupProfile:
+    __slots__ = ("lookup_id", "state", "engine", "start", "duration", "pids", "known_pids",
+                 "python_start", "python_peak", "children_peak", "peak", "processes", "exclusive")
+
+    def __init__(self, state_code, known_pids, python_start):
+        self.lookup_id = current_lookup()
+        self.state = state_code.lower()
+        self.engine = state_engine(self.state)
+        self.start = time.time()
+        self.duration = None
+        self.pids = set()             # processes counted against this lookup
+        self.known_pids = known_pids  # processes that existed before it started
+        self.python_start = python_start
+        self.python_peak = self.children_peak = self.peak = self.processes = 0
+        self.exclusive = True
+
+    def as_dict(self):
+        return {
+            "lookup_id": self.lookup_id, "state": self.state, "engine": self.engine,
+            "start": self.start, "duration": self.duration,
+            "python_peak_bytes": self.python_peak, "children_peak_bytes": self.children_peak,
+            "peak_bytes": self.peak, "processes": self.processes, "exclusive": self.exclusive,
+        }
+
+
+class MemoryProfiler:
+    def __init__(self, path=None, interval=SAMPLE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._active = []
+        self._records = collections.deque(maxlen=MAX_RECORDS)
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def begin(self, state_code):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        known = set(descendants(os.getpid())) if os.path.isdir("/proc") else set()
+        with self._lock:
+            profile = LookupProfile(state_code, known, tracemalloc.get_traced_memory()[0])
+            if self._active:
+                for other in self._active:
+                    other.exclusive = False
+                profile.exclusive = False
+            else:
+                tracemalloc.reset_peak()
+            self._active.append(profile)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="memory-profiler", daemon=True)
+                self._sampler.start()
+        return profile
+
+    def end(self, profile):
+        self._sample()
+        with self._lock:
+            self._active.remove(profile)
+            if profile.exclusive and tracemalloc.is_tracing():
+                profile.python_peak = max(profile.python_peak, tracemalloc.get_traced_memory()[1] - profile.python_start)
+                # The two peaks may not coincide; their sum errs on the side of sizing up
+                profile.peak = max(profile.peak, profile.python_peak + profile.children_peak)
+            profile.duration = time.time() - profile.start
+            record = profile.as_dict()
+            self._records.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self._sample()
+
+    def _sample(self):
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return
+        children = process_children() if os.path.isdir("/proc") else {}
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        if len(active) == 1 and children:
+            # Alone: every process started since it began is its own
+            profile = active[0]
+            profile.pids.update(p for p in descendants(os.getpid(), children) if p not in profile.known_pids)
+        for profile in active:
+            pids = {p for pid in list(profile.pids) for p in descendants(pid, children)}
+            rss = sum(rss_bytes(p) for p in pids)
+            python = max(0, traced - profile.python_start)
+            profile.children_peak = max(profile.children_peak, rss)
+            profile.python_peak = max(profile.python_peak, python)
+            profile.peak = max(profile.peak, rss + python)
+            profile.processes = max(profile.processes, len(pids))
+
+    def track(self, pid):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.pids.add(pid)
+
+    def records(self, state=None, engine=None):
+        with self._lock:
+            return [r for r in self._records
+                    if (state is None or r["state"] == state) and (engine is None or r["engine"] == engine)]
+
+    def report(self):
+        return memory_report(self.records())
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+def _rollup(records):
+    peaks = [r["peak_bytes"] for r in records]
+    p95 = _percentile(peaks, 0.95)
+    return {
+        "lookups": len(records),
+        "mean_mb": round(sum(peaks) / len(peaks) / 2**20, 1),
+        "p95_mb": round(p95 / 2**20, 1),
+        "max_mb": round(max(peaks) / 2**20, 1),
+        "python_p95_mb": round(_percentile([r["python_peak_bytes"] for r in records], 0.95) / 2**20, 1),
+        "children_p95_mb": round(_percentile([r["children_peak_bytes"] for r in records], 0.95) / 2**20, 1),
+        "lookups_per_gb": int(GIB // p95) if p95 else None,
+    }
+
+def memory_report(records):
+    """Per-engine and per-state footprints of profiled lookups."""
+    by_engine, by_state = collections.defaultdict(list), collections.defaultdict(list)
+    for record in records:
+        by_engine[record["engine"]].append(record)
+        by_state[record["state"]].append(record)
+    return {
+        "engines": {engine: _rollup(rs) for engine, rs in sorted(by_engine.items())},
+        "states": {state: dict(_rollup(rs), engine=rs[0]["engine"]) for state, rs in sorted(by_state.items())},
+    }
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+_current_profile = contextvars.ContextVar("memory_profile", default=None)
+
+def get_memory_profiler():
+    """Returns the process-wide profiler, or None unless SOS_MEMORY_PROFILE is set."""
+    global _profiler
+    setting = os.environ.get(MEMORY_PROFILE_ENV) or ""
+    if setting.lower() in ("", "0", "off", "false", "no"):
+        return None
+    with _profiler_lock:
+        path = None if setting.lower() in ("1", "on", "true", "yes") else setting
+        if _profiler is None or _profiler.path != path:
+            _profiler = MemoryProfiler(path)
+        return _profiler
+
+@contextlib.contextmanager
+def profile_lookup(state_code):
+    """Profiles the block as one lookup when profiling is on. Yields the LookupProfile, or None."""
+    profiler = get_memory_profiler()
+    if profiler is None:
+        yield None
+        return
+    profile = profiler.begin(state_code)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+        profiler.end(profile)
+
+def track_process(pid):
+    """Counts a launched browser, driver or Node process (and its children) against the current lookup."""
+    profiler = get_memory_profiler()
+    if profiler is not None and pid:
+        profiler.track(pid)
+
+
+def print_report(report):
+    print(f"{'':<14}{'lookups':>8}{'mean MB':>9}{'p95 MB':>9}{'max MB':>9}{'py p95':>9}{'child p95':>10}{'per GB':>8}")
+    rows = [(f"[{e}]", r) for e, r in report["engines"].items()]
+    rows += [(f"{s.upper()} {r['engine']}", r) for s, r in report["states"].items()]
+    for name, r in rows:
+        print(f"{name:<14}{r['lookups']:>8}{r['mean_mb']:>9}{r['p95_mb']:>9}{r['max_mb']:>9}"
+              f"{r['python_p95_mb']:>9}{r['children_p95_mb']:>10}{r['lookups_per_gb'] or '-':>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python memory_profile.py <memory profile .ndjson>")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        print_report(memory_report([json.loads(line) for line in f if line.strip()]))
@@ -0,0 +1,273 @@
+import atexit
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process metrics for capacity planning: lookups and latency per state,
+# error classes, cache hit ratios, and how many browsers, drivers and Node
+# processes are running. The dispatch layer, the runners and the engine
+# launchers update the shared registry; updates are a dict lookup and an add
+# under a lock, cheap enough to leave on. Exporters are opt-in:
+#   SOS_METRICS_PORT      serve Prometheus text on http://127.0.0.1:<port>/metrics
+#   SOS_METRICS_JSON      write a JSON snapshot to this path every
+#   SOS_METRICS_INTERVAL  seconds (default 60)
+METRICS_PORT_ENV = "SOS_METRICS_PORT"
+METRICS_JSON_ENV = "SOS_METRICS_JSON"
+METRICS_INTERVAL_ENV = "SOS_METRICS_INTERVAL"
+
+# Lookup latency buckets in seconds: scrapes range from sub-second API calls
+# to multi-minute CAPTCHA flows.
+LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180, 300, 600)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, (), value) for key, value in self._values.items()]
+
+    def snapshot(self):
+        with self._lock:
+            return {"|".join(key): value for key, value in self._values.items()}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}   # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            rows = [(key, list(row)) for key, row in self._values.items()]
+        samples = []
+        for key, row in rows:
+            for bound, count in zip(self.buckets, row):
+                samples.append((self.name + "_bucket", key, (("le", f"{bound:g}"),), count))
+            samples.append((self.name + "_bucket", key, (("le", "+Inf"),), row[-1]))
+            samples.append((self.name + "_sum", key, (), row[-2]))
+            samples.append((self.name + "_count", key, (), row[-1]))
+        return samples
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "|".join(key): {"count": row[-1], "sum": row[-2],
+                                "buckets": dict(zip((f"{b:g}" for b in self.buckets), row))}
+                for key, row in self._values.items()
+            }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def prometheus_text(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(metric.labelnames, key, extra)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """{"timestamp", "metrics": {name: {"type", "labels", "values": {"a|b": value}}}}"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            "timestamp": time.time(),
+            "metrics": {
+                m.name: {"type": m.kind, "labels": list(m.labelnames), "values": m.snapshot()} for m in metrics
+            },
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+LOOKUPS = REGISTRY.counter("sos_lookups_total", "Lookups finished, by state, outcome (hit/miss/error) and source.", ("state", "outcome", "source"))
+LOOKUP_SECONDS = REGISTRY.histogram("sos_lookup_seconds", "Lookup latency in seconds.", ("state", "source"))
+ERRORS = REGISTRY.counter("sos_errors_total", "Failed lookups by state and error class.", ("state", "error_type"))
+CACHE_REQUESTS = REGISTRY.counter("sos_cache_requests_total", "Cache lookups by cache and result (hit/stale/miss).", ("cache", "result"))
+IN_FLIGHT = REGISTRY.gauge("sos_lookups_in_flight", "Live lookups currently running.", ("state",))
+ACTIVE_ENGINES = REGISTRY.gauge("sos_active_engines", "Running browsers, Selenium drivers and Node processes.", ("engine",))
+WARM_PAGES = REGISTRY.gauge("sos_warm_pages", "Idle warm pages in the page pool.", ("state",))
+
+
+def observe_lookup(state_code, seconds, outcome, source, error_type=None):
+    """Records one finished lookup. source is where it ran ("dispatch", "worker_function", "run_scraper")."""
+    state_code = state_code.lower()
+    LOOKUPS.inc(state=state_code, outcome=outcome, source=source)
+    LOOKUP_SECONDS.observe(seconds, state=state_code, source=source)
+    if outcome == "error":
+        ERRORS.inc(state=state_code, error_type=error_type or "internal")
+
+def observe_cache(cache, result):
+    CACHE_REQUESTS.inc(cache=cache, result=result)
+
+def engine_started(engine):
+    ACTIVE_ENGINES.inc(engine=engine)
+
+def engine_stopped(engine):
+    ACTIVE_ENGINES.dec(engine=engine)
+
+
+# ----- Exporters -------------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = REGISTRY.prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Serves /metrics (Prometheus text) from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _lookups_by_state():
+    totals = {}
+    for key, value in LOOKUPS.snapshot().items():
+        state = key.split("|", 1)[0]
+        totals[state] = totals.get(state, 0) + value
+    return totals
+
+
+class JsonDumper:
+    """
+    Rewrites path with REGISTRY.snapshot() every interval seconds from a daemon
+    thread, plus "lookups_per_minute" per state over the last interval.
+    """
+
+    def __init__(self, path, interval=60.0):
+        self.path = path
+        self.interval = interval
+        self._previous = ({}, time.monotonic())
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-json", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def dump(self):
+        snapshot = REGISTRY.snapshot()
+        totals, now = _lookups_by_state(), time.monotonic()
+        previous, previous_at = self._previous
+        minutes = max(now - previous_at, 1e-6) / 60
+        snapshot["lookups_per_minute"] = {
+            state: (count - previous.get(state, 0)) / minutes for state, count in sorted(totals.items())
+        }
+        self._previous = (totals, now)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def stop(self):
+        self._stop.set()
+        self.dump()
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def start_exporters():
+    """Starts the exporters configured in the environment (once per process)."""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        serve_metrics(int(port))
+    path = os.environ.get(METRICS_JSON_ENV)
+    if path:
+        dumper = JsonDumper(path, float(os.environ.get(METRICS_INTERVAL_ENV) or 60)).start()
+        atexit.register(dumper.stop)
@@ -0,0 +1,65 @@
+import os
+import subprocess
+from browser_cache import acquire_profile, PROFILE_DIR_ENV
+from cancellation import ScrapeCancelled, kill_process, register_cleanup
+from latency_stats import step_budget_s, timed_step
+from telemetry import read_node_spans
+from metrics import engine_started, engine_stopped
+from traffic_capture import capture_env
+from memory_profile import track_process
+
+
+def run_node_script(state_code, command, timeout, shell=True, extra_env=None):
+    """
+    Runs one of the Node.js scrapers. Behaves like
+    subprocess.run(command, check=True, capture_output=True, text=True, ...),
+    raising the same CalledProcessError / TimeoutExpired / FileNotFoundError, so
+    the wrappers keep their own error messages.
+
+    When the shared browser cache is enabled the script gets a persistent
+    profile directory for the state in SOS_BROWSER_PROFILE_DIR. When recording
+    traffic (traffic_capture.py) it is told which state it records.
+
+    The script runs in its own process group, so a timeout or a cancelled
+    scrape kills Node together with the browser it started. The timeout is
+    adapted to the state's recent script run times (latency_stats) and capped
+    by the current request deadline, if any. Phase spans the script reports
+    (telemetry.js) are recorded and removed from the returned stderr.
+    """
+    timeout = step_budget_s(state_code, "script", timeout)
+    env = dict(os.environ, **capture_env(state_code), **(extra_env or {}))
+    slot = acquire_profile(state_code)
+    if slot:
+        env[PROFILE_DIR_ENV] = slot.path
+    scope = None
+    try:
+        proc = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            shell=shell, env=env, start_new_session=(os.name != "nt")
+        )
+        group = os.name != "nt"
+        scope, token = register_cleanup(lambda: kill_process(proc.pid, group=group))
+        engine_started("node")
+        track_process(proc.pid)
+        try:
+            with timed_step(state_code, "script"):
+                stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            kill_process(proc.pid, group=group)
+            stdout, stderr = proc.communicate()
+            stderr = read_node_spans(state_code, stderr)
+            raise subprocess.TimeoutExpired(command, timeout, output=stdout, stderr=stderr)
+        finally:
+            engine_stopped("node")
+            if scope is not None:
+                scope.unregister(token)
+
+        stderr = read_node_spans(state_code, stderr)
+        if scope is not None and scope.cancelled:
+            raise ScrapeCancelled()
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, command, output=stdout, stderr=stderr)
+        return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+    finally:
+        if slot:
+            slot.release()
@@ -0,0 +1,118 @@
+import asyncio
+import time
+from playwright.async_api import async_playwright
+from metrics import WARM_PAGES, engine_started, engine_stopped
+from browser_cache import open_state_page
+
+# state code -> (search form URL, selector that means the form is ready to type into)
+SEARCH_FORMS = {}
+
+def register_search_form(state_code, url, ready_selector):
+    """Called by scraper modules to declare a search form that can be pre-positioned."""
+    SEARCH_FORMS[state_code.lower()] = (url, ready_selector)
+
+
+class WarmPagePool:
+    """
+    Keeps a few Playwright pages per state already sitting on the search form,
+    so an interactive lookup can fill and submit straight away.
+
+    Pages are single-use: acquire() hands one out and immediately starts
+    pre-navigating a replacement in the background; release() closes the used
+    page. Each page lives in its own browser context, so cookies and form
+    state never leak between lookups. Pages get the same per-state hooks as
+    launch_chromium's browsers (HAR capture, portal override, navigate spans).
+
+        pool = WarmPagePool(["ut", "sc"])
+        await pool.start()
+        result = await search_ut({"entity_name": "acme", "page_pool": pool})
+        await pool.close()
+    """
+
+    def __init__(self, states=None, size=1, headless=True, max_idle=600, nav_timeout=60000):
+        self.states = [s.lower() for s in (states or SEARCH_FORMS)]
+        self.size = size
+        self.headless = headless
+        self.max_idle = max_idle  # seconds before a parked page is considered stale
+        self.nav_timeout = nav_timeout
+        self._playwright = None
+        self._browser = None
+        self._ready = {}
+        self._tasks = set()
+
+    def supports(self, state_code):
+        return self._browser is not None and state_code.lower() in self._ready
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        engine_started("browser")
+        for state in self.states:
+            if state not in SEARCH_FORMS:
+                continue
+            self._ready[state] = asyncio.Queue()
+            for _ in range(self.size):
+                self._refill(state)
+        return self
+
+    async def _open(self, state):
+        url, ready_selector = SEARCH_FORMS[state]
+        page = await open_state_page(self._browser, state)
+        try:
+            await page.goto(url, timeout=self.nav_timeout)
+            await page.wait_for_selector(ready_selector, timeout=self.nav_timeout)
+        except Exception:
+            await page.close()
+            raise
+        return page
+
+    async def _warm(self, state):
+        try:
+            page = await self._open(state)
+        except Exception as e:
+            print(f"Could not pre-position a {state.upper()} search page: {e}")
+            return
+        if self._ready[state].qsize() >= self.size:
+            await page.close()  # a burst of cold loads already refilled this state
+            return
+        await self._ready[state].put((page, time.monotonic()))
+        WARM_PAGES.set(self._ready[state].qsize(), state=state)
+
+    def _refill(self, state):
+        task = asyncio.create_task(self._warm(state))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def acquire(self, state_code):
+        """Returns a page on the state's search form, loading one now if none is parked."""
+        state = state_code.lower()
+        queue = self._ready[state]
+        self._refill(state)
+
+        while not queue.empty():
+            page, ready_at = queue.get_nowait()
+            WARM_PAGES.set(queue.qsize(), state=state)
+            if time.monotonic() - ready_at <= self.max_idle and not page.is_closed():
+                return page
+            await page.close()
+        # Nothing warm (first request, or a burst drained the pool): pay the load once.
+        return await self._open(state)
+
+    async def release(self, page):
+        if not page.is_closed():
+            await page.close()
+
+    async def close(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for queue in self._ready.values():
+            while not queue.empty():
+                page, _ = queue.get_nowait()
+                await self.release(page)
+        if self._browser:
+            await self._browser.close()
+            engine_stopped("browser")
+        if self._playwright:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
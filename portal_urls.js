@@ -0,0 +1,40 @@
+// Node side of portal_urls.py: with SOS_PORTAL_BASE_URL set, every request a
+// page makes to https://host/path?query is served from <base>/host/path?query
+// (the benchmark mock portal) instead. Works with Puppeteer and Playwright pages.
+const BASE = (process.env.SOS_PORTAL_BASE_URL || '').replace(/\/+$/, '');
+
+const portalUrl = (url) => {
+    if (!BASE || !/^https?:\/\//.test(url) || url.startsWith(BASE + '/')) return url;
+    const parsed = new URL(url);
+    return `${BASE}/${parsed.host}${parsed.pathname}${parsed.search}`;
+};
+
+// Resolves once the page's requests are being redirected (immediately without an override).
+const redirectPage = async (page) => {
+    if (!BASE) return;
+    if (typeof page.route === 'function') {
+        // Playwright
+        await page.route('**/*', async (route) => {
+            const url = portalUrl(route.request().url());
+            if (url === route.request().url()) return route.continue();
+            return route.fulfill({ response: await route.fetch({ url }) });
+        });
+        return;
+    }
+    // Puppeteer
+    await page.setRequestInterception(true);
+    page.on('request', async (request) => {
+        const url = portalUrl(request.url());
+        if (url === request.url()) return request.continue();
+        try {
+            const response = await fetch(url, { method: request.method(), headers: request.headers(), body: request.postData() });
+            const headers = {};
+            response.headers.forEach((value, name) => { headers[name] = value; });
+            await request.respond({ status: response.status, headers, body: Buffer.from(await response.arrayBuffer()) });
+        } catch (e) {
+            await request.abort('failed');
+        }
+    });
+};
+
+module.exports = { portalUrl, redirectPage };
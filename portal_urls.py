@@ -0,0 +1,97 @@
+import inspect
+import os
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+# Base-URL override for running the scrapers against a local stand-in for
+# the state portals (benchmarks/mock_portal.py). With SOS_PORTAL_BASE_URL set,
+# e.g. to http://127.0.0.1:8900, a request for https://host/path?query goes to
+# <base>/host/path?query instead:
+#   - requests sessions: override_session() mounts a rewriting adapter
+#     (webforms.WebFormsClient and CT); HI and NY rewrite with portal_url()
+#   - Playwright: every request of a page or context is fetched from the
+#     override and fulfilled (route_page/route_context, via browser_cache)
+#   - Selenium: driver.get() is rewritten; links the page follows are not
+#   - Node: portal_urls.js does the same for Puppeteer and Playwright pages
+PORTAL_BASE_ENV = "SOS_PORTAL_BASE_URL"
+
+
+def portal_base():
+    base = os.environ.get(PORTAL_BASE_ENV)
+    return base.rstrip("/") if base else None
+
+
+def portal_url(url):
+    """url rewritten onto the override base, or unchanged when no override is set."""
+    base = portal_base()
+    if not base or not url.startswith(("http://", "https://")) or url.startswith(base + "/"):
+        return url
+    parts = urlsplit(url)
+    rewritten = f"{base}/{parts.netloc}{parts.path or '/'}"
+    return rewritten + (f"?{parts.query}" if parts.query else "")
+
+
+def original_url(path):
+    """Inverse of portal_url() for a request path on the override server: "/host/p?q" -> "https://host/p?q"."""
+    host, _, rest = path.lstrip("/").partition("/")
+    return f"https://{host}/{rest}"
+
+
+# ----- requests --------------------------------------------------------------
+class PortalOverrideAdapter(HTTPAdapter):
+    """Sends to the override but reports the real URL, so relative links and redirects resolve as usual."""
+
+    def send(self, request, **kwargs):
+        original = request.url
+        request.url = portal_url(original)
+        response = super().send(request, **kwargs)
+        response.url = original
+        return response
+
+
+def override_session(session):
+    """Sends a requests session's traffic to the override, if one is set."""
+    if portal_base():
+        adapter = PortalOverrideAdapter()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+    return session
+
+
+# ----- Playwright ------------------------------------------------------------
+def _sync_handler(route):
+    url = portal_url(route.request.url)
+    if url == route.request.url:
+        route.continue_()
+    else:
+        route.fulfill(response=route.fetch(url=url))
+
+async def _async_handler(route):
+    url = portal_url(route.request.url)
+    if url == route.request.url:
+        await route.continue_()
+    else:
+        await route.fulfill(response=await route.fetch(url=url))
+
+
+def route_target(target):
+    """
+    Routes every request of a Playwright page or context to the override, if
+    one is set. Returns an awaitable for async Playwright objects.
+    """
+    if not portal_base():
+        return None
+    if inspect.iscoroutinefunction(target.route):
+        return target.route("**/*", _async_handler)
+    target.route("**/*", _sync_handler)
+    return None
+
+
+# ----- Selenium --------------------------------------------------------------
+def override_driver(driver):
+    """Rewrites driver.get() onto the override, if one is set."""
+    if portal_base():
+        original_get = driver.get
+        driver.get = lambda url: original_get(portal_url(url))
+    return driver
@@ -0,0 +1,112 @@
+import asyncio
+import re
+
+# The ND, PA, NM, ID, MI and CA portals all run the same SPA. The results grid
+# and the details drawer are rendered from these two XHR calls.
+SPA_API_PATTERNS = {
+    "search": re.compile(r"/api/Records/businesssearch", re.I),
+    "detail": re.compile(r"/api/FilingDetail/business/", re.I),
+}
+
+TITLE_PATTERN = re.compile(r"^(.*?)\s*\(([A-Za-z0-9]+)\)$")
+
+
+def _matcher(pattern):
+    return lambda response: bool(pattern.search(response.url)) and response.request.method != "OPTIONS"
+
+
+class ResponseCapture:
+    """
+    Records the XHR responses a page receives (page.on("response")) whose URL
+    matches one of the named patterns, so a scraper can read the JSON the SPA
+    renders from instead of waiting for the rendered DOM. For sync Playwright
+    pages; see AsyncResponseCapture for async ones.
+    """
+
+    def __init__(self, page, patterns=None):
+        self.page = page
+        self.patterns = patterns or SPA_API_PATTERNS
+        self.responses = {name: [] for name in self.patterns}
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        for name, pattern in self.patterns.items():
+            if _matcher(pattern)(response):
+                self.responses[name].append(response)
+
+    def wait_for(self, name, timeout=15000):
+        """Returns the parsed JSON of the latest `name` response, or None if none arrived in time."""
+        try:
+            if not self.responses[name]:
+                self.page.wait_for_event("response", predicate=_matcher(self.patterns[name]), timeout=timeout)
+            return self.responses[name][-1].json()
+        except Exception:
+            return None
+
+    def clear(self, name):
+        self.responses[name].clear()
+
+
+class AsyncResponseCapture:
+    """Async-Playwright version of ResponseCapture."""
+
+    def __init__(self, page, patterns=None):
+        self.page = page
+        self.patterns = patterns or SPA_API_PATTERNS
+        self.responses = {name: [] for name in self.patterns}
+        self._arrived = {name: asyncio.Event() for name in self.patterns}
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        for name, pattern in self.patterns.items():
+            if _matcher(pattern)(response):
+                self.responses[name].append(response)
+                self._arrived[name].set()
+
+    async def wait_for(self, name, timeout=15000):
+        """Returns the parsed JSON of the latest `name` response, or None if none arrived in time."""
+        try:
+            await asyncio.wait_for(self._arrived[name].wait(), timeout / 1000)
+            return await self.responses[name][-1].json()
+        except Exception:
+            return None
+
+    def clear(self, name):
+        self.responses[name].clear()
+        self._arrived[name].clear()
+
+
+# ----- Payload helpers -------------------------------------------------------
+def search_rows(payload):
+    """
+    Flattens a businesssearch payload into the rows of the results grid, in
+    display order: [{"id", "entity_name", "file_number", "raw"}, ...].
+    """
+    rows = (payload or {}).get("rows") or {}
+    if isinstance(rows, dict):
+        rows = [dict(row, ID=row.get("ID", key)) for key, row in rows.items()]
+
+    parsed = []
+    for row in rows:
+        title = row.get("TITLE")
+        if isinstance(title, list):
+            title = title[0] if title else ""
+        title = (title or "").strip()
+        match = TITLE_PATTERN.search(title)
+        parsed.append({
+            "id": row.get("ID"),
+            "entity_name": match.group(1).strip() if match else title,
+            "file_number": match.group(2).strip() if match else (row.get("RECORD_NUM") or "N/A"),
+            "raw": row,
+        })
+    return parsed
+
+
+def drawer_details(payload):
+    """Turns a FilingDetail payload into {label: value}, like the rendered details-list table."""
+    details = {}
+    for item in (payload or {}).get("DRAWER_DETAIL_LIST") or []:
+        label = (item.get("LABEL") or "").strip()
+        if label:
+            details[label] = (item.get("VALUE") or "").strip()
+    return details
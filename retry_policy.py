@@ -0,0 +1,140 @@
+import contextvars
+import os
+import queue
+import random
+import threading
+import time
+
+from cancellation import CancelScope, ScrapeCancelled, current_scope, scope_context
+from scraper_errors import annotate, classify, is_retryable
+from state_stats import get_state_stats
+
+# Retries for live searches, driven by the error classes in scraper_errors:
+# transient failures (timeouts, network errors, CAPTCHA walls, unexpected
+# exceptions) are retried with exponential backoff and full jitter, while
+# deterministic answers (not found, ambiguous, bad input, missing local
+# dependency) come back at once. With hedging on, an attempt that runs past
+# the state's p95 latency gets a second attempt started next to it; the first
+# usable answer wins and the other attempt is cancelled.
+#
+# search_args["retries"] (extra attempts) and search_args["hedge"] override
+# SOS_RETRY_ATTEMPTS (total attempts, default 2) and SOS_HEDGE (default off).
+ATTEMPTS_ENV = "SOS_RETRY_ATTEMPTS"
+HEDGE_ENV = "SOS_HEDGE"
+
+DEFAULT_ATTEMPTS = 2
+HEDGE_QUANTILE = 0.95
+MIN_ATTEMPT_SECONDS = 5.0   # don't start a retry with less budget than this
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=DEFAULT_ATTEMPTS, base_delay=2.0, max_delay=30.0, hedge=False):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+
+    def delay(self, attempt):
+        """Full-jitter backoff before attempt + 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def retry_policy(search_args):
+    """RetryPolicy for a search, from search_args with environment defaults."""
+    if search_args.get("retries") is not None:
+        attempts = int(search_args["retries"]) + 1
+    else:
+        attempts = int(os.environ.get(ATTEMPTS_ENV) or DEFAULT_ATTEMPTS)
+    hedge = search_args.get("hedge")
+    if hedge is None:
+        hedge = os.environ.get(HEDGE_ENV, "").lower() in ("1", "true", "yes", "on")
+    return RetryPolicy(max_attempts=attempts, hedge=bool(hedge))
+
+
+def run_with_retries(state_code, attempt, policy, deadline=None):
+    """
+    Calls attempt() until it returns something other than a transient error,
+    policy.max_attempts is used up, or the deadline leaves no room for
+    another try. Error results are annotated with "error_type", "retryable"
+    and, after a retry, "attempts".
+    """
+    scope = current_scope()
+    attempts = 0
+    while True:
+        attempts += 1
+        result = hedged_attempt(state_code, attempt) if policy.hedge else attempt()
+        error_type = classify(state_code, result)
+        if error_type is None or not is_retryable(error_type) or attempts >= policy.max_attempts:
+            break
+        delay = policy.delay(attempts)
+        if deadline is not None and deadline.remaining() < delay + MIN_ATTEMPT_SECONDS:
+            break
+        if scope is not None:
+            if scope.wait(delay):
+                raise ScrapeCancelled()
+        else:
+            time.sleep(delay)
+    annotate(state_code, result)
+    if attempts > 1 and isinstance(result, dict) and "error" in result:
+        result["attempts"] = attempts
+    return result
+
+
+def hedged_attempt(state_code, attempt):
+    """
+    attempt(), with a second copy started if the first is still running at
+    the state's p95 latency. Each copy runs in its own CancelScope (cancelled
+    along with the caller's); the loser is cancelled once there is an answer.
+    """
+    stats = get_state_stats()
+    hedge_after = stats.latency_quantile(state_code, HEDGE_QUANTILE) if stats else None
+    if hedge_after is None:
+        return attempt()
+
+    parent = current_scope()
+    answers = queue.Queue()
+    scopes = []
+
+    def start():
+        child = CancelScope()
+        scopes.append(child)
+        context = contextvars.copy_context()
+
+        def run():
+            with scope_context(child):
+                try:
+                    answers.put((child, attempt(), None))
+                except BaseException as e:
+                    answers.put((child, None, e))
+
+        threading.Thread(target=context.run, args=(run,), daemon=True).start()
+
+    token = parent.register(lambda: [s.cancel() for s in scopes]) if parent else None
+    try:
+        start()
+        try:
+            first = answers.get(timeout=hedge_after)
+        except queue.Empty:
+            start()
+            first = answers.get()
+        outcome = first
+        if len(scopes) > 1 and _transient(state_code, first):
+            # the other copy may still do better
+            outcome = answers.get()
+            if _transient(state_code, outcome) and first[2] is None:
+                outcome = first
+        for child in scopes:
+            if child is not outcome[0]:
+                child.cancel()
+    finally:
+        if token is not None:
+            parent.unregister(token)
+    _, result, error = outcome
+    if error is not None:
+        raise error
+    return result
+
+
+def _transient(state_code, answer):
+    _, result, error = answer
+    return error is not None or is_retryable(classify(state_code, result))
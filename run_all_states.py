@@ -1,6 +1,8 @@
 import asyncio
+import inspect
 import json
 import os
+import time
 from datetime import datetime
 
 # Import every state's primary search function
@@ -54,6 +56,14 @@ from SearchWA import search_wa
 from SearchWI import search_wi
 from SearchWV import search_wv
 from SearchWY import search_wy
+from Main import lookup_business_by_id, search_outcome
+from metrics import observe_lookup, start_exporters
+from scraper_errors import classify, is_retryable
+from telemetry import lookup_context
+from chrome_trace import export_chrome_trace, monitor_event_loop, trace_path
+from traffic_capture import serve_replay
+from memory_profile import profile_lookup
+from job_store import LeaseKeeper, get_job_store, worker_id
 
 # The dispatch table remains the same
 STATE_SEARCH_FUNCTIONS = {
@@ -72,43 +82,92 @@ STATE_SEARCH_FUNCTIONS = {
 async def run_scraper(state_code, search_function, search_args):
     """Asynchronously runs a single scraper and handles its errors."""
     print(f"Searching in {state_code.upper()}...")
+    started = time.monotonic()
     try:
-        # We now 'await' the result from every scraper function
-        result = await search_function(search_args)
+        filing_number = search_args.get("state_filing_numbers", {}).get(state_code)
+        if filing_number:
+            # Refresh of a known entity: skip the name search entirely.
+            result = await asyncio.to_thread(lookup_business_by_id, state_code, filing_number, search_args)
+            print(f"Finished lookup in {state_code.upper()}.")
+            return state_code, result
+        # Async scrapers run on this loop; sync ones in a worker thread so they don't block it
+        with lookup_context(state_code), profile_lookup(state_code):
+            if inspect.iscoroutinefunction(search_function):
+                result = await search_function(search_args)
+            else:
+                result = await asyncio.to_thread(search_function, search_args)
+                if inspect.isawaitable(result):
+                    result = await result
+        observe_lookup(state_code, time.monotonic() - started, search_outcome(state_code, result),
+                       "run_scraper", classify(state_code, result))
         print(f"Finished search in {state_code.upper()}.")
         return state_code, result
     except Exception as e:
         print(f"Error searching in {state_code.upper()}: {e}")
+        observe_lookup(state_code, time.monotonic() - started, "error", "run_scraper", "internal")
         return state_code, {"error": f"An unexpected error occurred: {e}"}
 
 async def main():
     """
     Asynchronously runs all state scrapers for a given entity name.
+
+    Each state is a task in the job store (job_store.py), and its result is
+    stored as soon as it finishes. Running this again after a crash resumes
+    the unfinished run, searching only the states that have no result yet.
     """
     # Replace with user input if desired
     entity_name_input = "google" 
     print(f"--- Starting All-State Search for: '{entity_name_input}' ---")
+    start_exporters()
+    serve_replay()
     
-    search_args = {"entity_name": entity_name_input}
-    
-    # Create a list of tasks to run concurrently
-    tasks = [run_scraper(code, func, search_args) for code, func in STATE_SEARCH_FUNCTIONS.items()]
-
-    # Run all tasks at once
-    results = await asyncio.gather(*tasks)
+    # state_filing_numbers maps state codes to known filing numbers for refresh runs
+    search_args = {"entity_name": entity_name_input, "state_filing_numbers": {}}
     
-    # Process the results into a final dictionary
-    all_results = {state_code: result for state_code, result in results}
-
-    # Save the final aggregated results
     output_dir = os.path.join(os.path.dirname(__file__), "all_state_results")
     os.makedirs(output_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     output_filename = os.path.join(output_dir, f"results_{timestamp}.json")
+    stream_filename = os.path.join(output_dir, f"results_{timestamp}.ndjson")
 
+    # With SOS_TRACE_FILE set, the run's timeline is written as a Chrome trace
+    trace_file = trace_path()
+    run_started = time.time()
+    loop_monitor = asyncio.create_task(monitor_event_loop()) if trace_file else None
+
+    store, worker = get_job_store(), worker_id()
+    job_id = store.open_job(f"run_all_states:{entity_name_input}",
+                            {code: {"state": code} for code in STATE_SEARCH_FUNCTIONS}, meta=search_args)
+    claimed = store.claim(job_id, worker)
+    print(f"Job {job_id}: searching {len(claimed)} states ({store.progress(job_id)})")
+
+    # Run all claimed states at once, storing and writing each state's result as soon
+    # as it finishes. States that end in a transient error go back to pending and
+    # are claimed again in the next round, up to the job store's MAX_ATTEMPTS.
+    with LeaseKeeper(store, job_id, worker), open(stream_filename, 'w') as stream_file:
+        while claimed:
+            tasks = [run_scraper(code, STATE_SEARCH_FUNCTIONS[code], search_args) for code, _ in claimed]
+            for next_done in asyncio.as_completed(tasks):
+                state_code, result = await next_done
+                if is_retryable(classify(state_code, result)) and store.retry(job_id, state_code, result):
+                    print(f"Will retry {state_code.upper()}: {result.get('error')}")
+                    continue
+                store.complete(job_id, state_code, result)
+                stream_file.write(json.dumps({"state": state_code, "result": result}) + "\n")
+                stream_file.flush()
+            claimed = store.claim(job_id, worker)
+
+    if not store.finished(job_id):
+        print(f"Job {job_id} still has states running in other processes: {store.progress(job_id)}")
+    all_results = store.results(job_id)
     with open(output_filename, 'w') as f:
         json.dump(all_results, f, indent=2)
 
+    if loop_monitor:
+        loop_monitor.cancel()
+        export_chrome_trace(trace_file, since=run_started)
+        print(f"Trace written to: {trace_file}")
+
     print(f"\n--- Search Complete. All results saved to: {output_filename} ---")
 
 # This is the standard way to run a top-level async function
@@ -54,6 +54,15 @@ from SearchNV import search_nv
 from SearchNH import search_nh
 from SearchOH import search_oh
 from SearchVT import search_vt
+from Main import lookup_business_by_id, run_search_function, search_outcome
+from state_stats import get_state_stats, order_states
+from metrics import observe_lookup, start_exporters
+from scraper_errors import classify, is_retryable
+from telemetry import lookup_context
+from chrome_trace import export_chrome_trace, trace_path
+from traffic_capture import serve_replay
+from memory_profile import profile_lookup
+from job_store import LeaseKeeper, get_job_store, worker_id
 
 # List of all 50 U.S. states
 STATE_CODES = [
@@ -122,7 +131,21 @@ def worker_function(state_code, search_args):
     """A worker function to perform the search for a single state."""
     try:
         print(f"Starting search for {state_code.upper()}...")
-        result_data = STATE_SEARCH_FUNCTIONS.get(state_code.lower())(search_args)
+        filing_number = search_args.get("state_filing_numbers", {}).get(state_code.lower())
+        if filing_number:
+            # Refresh of a known entity: skip the name search entirely.
+            result_data = lookup_business_by_id(state_code, filing_number, search_args)
+            return (state_code, result_data)
+        started = time.monotonic()
+        with lookup_context(state_code), profile_lookup(state_code):
+            # run_search_function runs async scrapers to completion in this thread
+            result_data = run_search_function(STATE_SEARCH_FUNCTIONS.get(state_code.lower()), search_args)
+        elapsed = time.monotonic() - started
+        outcome = search_outcome(state_code, result_data)
+        observe_lookup(state_code, elapsed, outcome, "worker_function", classify(state_code, result_data))
+        stats = get_state_stats()
+        if stats:
+            stats.record(state_code, elapsed, outcome)
         return (state_code, result_data)
     except Exception as e:
         return (state_code, {"error": f"An unexpected error occurred: {str(e)}"})
@@ -130,35 +153,70 @@ def worker_function(state_code, search_args):
 def main():
     """
     Iterates through all 50 states concurrently and saves all results to a single JSON file.
+
+    Each state is a task in the job store (job_store.py), and its result is
+    stored as soon as it finishes. Running this again after a crash resumes
+    the unfinished run. More processes started on the same job file share
+    the remaining states.
     """
     search_args = {
         "entity_name": "Google",
+        # Known filing numbers per state (e.g. {"ny": "123456"}) for refresh runs
+        "state_filing_numbers": {},
         # Add other potential args here if needed
     }
     
-    all_results = {}
-    
-    print(f"Starting concurrent business search for '{search_args['entity_name']}' across all 50 states...")
+    start_exporters()
+    serve_replay()
+    run_started = time.time()
+    max_workers = 10
+
+    # Historically slowest states first, so they don't start last
+    store, worker = get_job_store(), worker_id()
+    job_id = store.open_job(f"run_concurrent_states:{search_args['entity_name']}",
+                            {state: {"state": state} for state in order_states(STATE_CODES)}, meta=search_args)
+    print(f"Starting concurrent business search for '{search_args['entity_name']}' across all 50 states "
+          f"(job {job_id}: {store.progress(job_id)})...")
 
     # We use a ThreadPoolExecutor for I/O-bound tasks
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        # Map the worker function to the state codes
-        future_to_state = {executor.submit(worker_function, state, search_args): state for state in STATE_CODES}
-        
-        for future in concurrent.futures.as_completed(future_to_state):
-            state_code = future_to_state[future]
-            try:
-                state_code, result_data = future.result()
-                all_results[state_code] = result_data
+    with LeaseKeeper(store, job_id, worker), concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_state = {}
+        while True:
+            # Keep every worker busy with states no one else has claimed
+            free = max_workers - len(future_to_state)
+            for state, _ in store.claim(job_id, worker, limit=free) if free else []:
+                future_to_state[executor.submit(worker_function, state, search_args)] = state
+            if not future_to_state:
+                break
+            done, _ = concurrent.futures.wait(future_to_state, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                state_code = future_to_state.pop(future)
+                try:
+                    state_code, result_data = future.result()
+                except Exception as exc:
+                    result_data = {"error": f"An unexpected error occurred: {exc}"}
+                    print(f"Error while processing {state_code.upper()}: {exc}")
+                # Transient errors go back to pending and are claimed again, up to MAX_ATTEMPTS
+                if is_retryable(classify(state_code, result_data)) and store.retry(job_id, state_code, result_data):
+                    print(f"Will retry {state_code.upper()}: {result_data.get('error')}")
+                    continue
+                store.complete(job_id, state_code, result_data)
                 print(f"Finished search for {state_code.upper()}.")
-            except Exception as exc:
-                print(f"Error while processing {state_code.upper()}: {exc}")
 
+    if not store.finished(job_id):
+        print(f"Job {job_id} still has states running in other processes: {store.progress(job_id)}")
+    all_results = store.results(job_id)
     output_filename = "all_states_results_concurrent.json"
     with open(output_filename, 'w') as f:
         json.dump(all_results, f, indent=2)
 
     print(f"\nAll search results have been saved to '{output_filename}'.")
 
+    # With SOS_TRACE_FILE set, also write the run's timeline as a Chrome trace
+    trace_file = trace_path()
+    if trace_file:
+        export_chrome_trace(trace_file, since=run_started)
+        print(f"Trace written to '{trace_file}'.")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
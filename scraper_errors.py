@@ -0,0 +1,78 @@
+import re
+
+from search_cache import is_not_found
+
+# Error classes for scraper results. The Search* modules return free-form
+# {"error": ...} dicts; classify() maps those messages (and the Node stderr
+# in "details") onto a small fixed set so callers can tell a slow portal from
+# a missing entity, a CAPTCHA wall or a broken parser. annotate() adds the
+# class to the result as "error_type" plus a "retryable" flag.
+
+TIMEOUT = "timeout"              # page load / wait / process timed out
+NETWORK = "network"              # request failed, bad status, page did not load
+BLOCKED = "blocked"              # CAPTCHA, access denied, rate limited
+PARSE = "parse"                  # page loaded but the expected data was not there
+INTERNAL = "internal"            # unexpected exception or Node script failure
+NOT_FOUND = "not_found"          # the portal answered: no such entity
+AMBIGUOUS = "ambiguous"          # several results, none matched well enough
+INVALID_INPUT = "invalid_input"  # missing or unusable search arguments
+DEPENDENCY = "dependency"        # local setup: node, ffmpeg, Vosk model...
+DEADLINE = "deadline"            # the caller's time budget ran out
+UNAVAILABLE = "unavailable"      # the state's circuit breaker is open
+
+# Worth another attempt: the same search may well succeed a moment later.
+TRANSIENT = {TIMEOUT, NETWORK, BLOCKED, INTERNAL}
+# Classes that say something about the portal's health (see circuit_breaker).
+PORTAL_FAILURES = {TIMEOUT, NETWORK, BLOCKED, PARSE, INTERNAL}
+
+# First match wins; checked against the lower-cased error message and details.
+PATTERNS = [
+    (DEPENDENCY, r"dependency missing|command was not found|not installed|no module named"),
+    (INVALID_INPUT, r"\brequired\b|must be at least|refine your search|not supported"),
+    (AMBIGUOUS, r"multiple results found|no suitable match"),
+    (BLOCKED, r"captcha|access denied|forbidden|\b403\b|\b429\b|too many requests|blocked|cloudflare"),
+    (TIMEOUT, r"timed out|timeout"),
+    (NETWORK, r"request failed|failed initial get|could not load|failed to load|did not load"
+              r"|non-json|connection|net::err|econn|enotfound|status [45]\d\d"),
+    (NOT_FOUND, r"^no (results|entity|records|matching|valid results) (were )?found"),
+    (PARSE, r"pars|extract|not found|table format|missing a|no data rows|did not produce an output"),
+]
+_COMPILED = [(kind, re.compile(pattern)) for kind, pattern in PATTERNS]
+
+
+def classify(state_code, result):
+    """Error class of a scraper result, or None if it is not an error."""
+    if is_not_found(state_code, result):
+        return NOT_FOUND
+    if not isinstance(result, dict) or "error" not in result:
+        # An empty answer is a miss (several Node scripts also write one on
+        # failure), not evidence that the portal is broken
+        return None if result not in (None, [], {}) else NOT_FOUND
+    if result.get("error_type"):
+        return result["error_type"]
+    if result.get("deadline_exceeded"):
+        return DEADLINE
+    if result.get("unavailable"):
+        return UNAVAILABLE
+    text = str(result.get("error") or "").lower()
+    details = str(result.get("details") or "").lower()
+    for kind, pattern in _COMPILED:
+        if pattern.search(text):
+            return kind
+    for kind, pattern in _COMPILED:
+        if kind != NOT_FOUND and pattern.search(details):
+            return kind
+    return INTERNAL
+
+
+def is_retryable(error_type):
+    return error_type in TRANSIENT
+
+
+def annotate(state_code, result):
+    """Adds "error_type" and "retryable" to an error dict (in place); other results pass through."""
+    if isinstance(result, dict) and "error" in result:
+        error_type = classify(state_code, result)
+        result["error_type"] = error_type
+        result["retryable"] = is_retryable(error_type)
+    return result
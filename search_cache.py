@@ -0,0 +1,300 @@
+import concurrent.futures
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from locator_index import normalize_name
+
+# Results cache shared by Main's dispatch. Set SOS_SEARCH_CACHE to a file path
+# to move it, or to "off" to disable caching.
+CACHE_PATH_ENV = "SOS_SEARCH_CACHE"
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.sqlite3")
+NEGATIVE_TTL_ENV = "SOS_NEGATIVE_TTL"   # seconds, default 6 hours
+RESULT_TTL_ENV = "SOS_RESULT_TTL"       # seconds a found record is fresh, default 24 hours
+STALE_TTL_ENV = "SOS_STALE_TTL"         # seconds a stale record may still be served, default 30 days
+SWR_ENV = "SOS_STALE_WHILE_REVALIDATE"  # "1" serves stale records while refreshing them
+REFRESH_DEADLINE_ENV = "SOS_REFRESH_DEADLINE"  # seconds a background refresh may run, default 120
+DEFAULT_REFRESH_DEADLINE = 120.0
+# Caller-bound search_args a background refresh must not inherit
+CALLER_ARGS = ("deadline", "event_loop", "page_pool", "on_locator")
+
+
+# --- NOT-FOUND CLASSIFICATION ---
+# How each scraper says "this name does not exist here". Anything else that
+# comes back as an error (timeouts, captchas, layout changes) is NOT cached.
+NOT_FOUND_MESSAGES = {
+    "al": ("No results found for entity",),
+    "ar": ("No valid results found.",),
+    "co": ("No entity found for Colorado ID number",),
+    "ct": ("No results found.",),
+    "de": ("No valid results found.",),
+    "fl": ("No results found for '",),
+    "hi": ("No results found for '", "No entity found for file number"),
+    "id": ("No results found for '",),
+    "ky": ("No matching organizations were found",),
+    "ma": ("No results found for entity:",),
+    "mn": ("No results found for '",),
+    "mo": ("No records found for '",),
+    "ms": ("No results found for '",),
+    "nc": ("No results found for '",),
+    "nj": ("No results found for '",),
+    "nm": ("No results found for '",),
+    "ny": ("No results found for entity name", "No entity found for DOS ID"),
+}
+
+# Scrapers that answer a miss with an empty list (or, for NE, an empty object)
+# and report failures as an error dict, so an empty answer really is a miss.
+EMPTY_RESULT_STATES = {"co", "la", "mt", "nd", "ne", "pa", "ri", "sc", "tx", "ut", "wi", "wy"}
+
+
+def is_not_found(state_code, result):
+    """True if result is this state's "no such entity" answer."""
+    state_code = state_code.lower()
+    if state_code in EMPTY_RESULT_STATES and result in ([], {}):
+        return True
+    if isinstance(result, dict) and isinstance(result.get("error"), str):
+        return result["error"].startswith(NOT_FOUND_MESSAGES.get(state_code, ()))
+    return False
+
+
+def search_key(search_args):
+    """Cache key for a search: the filing number if given, else the normalized name."""
+    filing_number = str(search_args.get("state_filing_number") or "").strip()
+    if filing_number:
+        return "id:" + filing_number
+    name = normalize_name(search_args.get("entity_name"))
+    return "name:" + name if name else None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no deletes; rebuilt on load)."""
+
+    def __init__(self, size_bits=1 << 20, hashes=7):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bytearray(size_bits // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class NegativeCache:
+    """
+    Remembers not-found answers per (state, search key) for a short TTL. The
+    rows live in SQLite; a Bloom filter in front answers the common "never
+    missed here" case without touching the database.
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = path
+        self.ttl = ttl if ttl is not None else float(os.environ.get(NEGATIVE_TTL_ENV, "21600"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS negative_results ("
+                " state TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, PRIMARY KEY (state, key))"
+            )
+            self._conn.execute("DELETE FROM negative_results WHERE expires_at <= ?", (time.time(),))
+        self._bloom = BloomFilter()
+        for state, key in self._conn.execute("SELECT state, key FROM negative_results"):
+            self._bloom.add(f"{state}|{key}")
+
+    def get(self, state_code, key):
+        """Returns the cached not-found result, or None."""
+        state_code = state_code.lower()
+        if not key or f"{state_code}|{key}" not in self._bloom:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, expires_at FROM negative_results WHERE state = ? AND key = ?",
+                (state_code, key),
+            ).fetchone()
+        if not row or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    def put(self, state_code, key, result):
+        state_code = state_code.lower()
+        if not key:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO negative_results (state, key, result, expires_at) VALUES (?, ?, ?, ?)",
+                (state_code, key, json.dumps(result), time.time() + self.ttl),
+            )
+        self._bloom.add(f"{state_code}|{key}")
+
+    def discard(self, state_code, key):
+        state_code = state_code.lower()
+        if not key or f"{state_code}|{key}" not in self._bloom:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM negative_results WHERE state = ? AND key = ?", (state_code, key)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    Found records per (state, search key). A record is fresh for ttl seconds
+    and may be served stale (see Revalidator) for up to stale_ttl seconds.
+    """
+
+    def __init__(self, path, ttl=None, stale_ttl=None):
+        self.path = path
+        self.ttl = ttl if ttl is not None else float(os.environ.get(RESULT_TTL_ENV, "86400"))
+        self.stale_ttl = stale_ttl if stale_ttl is not None else float(os.environ.get(STALE_TTL_ENV, "2592000"))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " state TEXT NOT NULL, key TEXT NOT NULL, result TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (state, key))"
+            )
+            self._conn.execute("DELETE FROM results WHERE stored_at <= ?", (time.time() - self.stale_ttl,))
+
+    def get(self, state_code, key):
+        """Returns (result, stored_at, is_fresh), or None if nothing servable is cached."""
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, stored_at FROM results WHERE state = ? AND key = ?",
+                (state_code.lower(), key),
+            ).fetchone()
+        if not row:
+            return None
+        age = time.time() - row[1]
+        if age > self.stale_ttl:
+            return None
+        return json.loads(row[0]), row[1], age <= self.ttl
+
+    def put(self, state_code, key, result):
+        if not key:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (state, key, result, stored_at) VALUES (?, ?, ?, ?)",
+                (state_code.lower(), key, json.dumps(result), time.time()),
+            )
+
+    def discard(self, state_code, key):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results WHERE state = ? AND key = ?", (state_code.lower(), key))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def mark_stale(result, stored_at):
+    """Copy of a cached result with "stale" / "cached_at" on every record."""
+    marked = copy.deepcopy(result)
+    cached_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stored_at))
+    for record in (marked if isinstance(marked, list) else [marked]):
+        if isinstance(record, dict):
+            record["stale"] = True
+            record["cached_at"] = cached_at
+    return marked
+
+
+class Revalidator:
+    """
+    Runs background refreshes for stale records, at most one per
+    (state, search key) at a time.
+    """
+
+    def __init__(self, refresh, max_workers=4):
+        self._refresh = refresh
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="revalidate")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+
+    def schedule(self, state_code, key, search_args):
+        """Starts refresh(state_code, search_args) unless one is already running; returns its future."""
+        with self._lock:
+            future = self._in_flight.get((state_code, key))
+            if future is not None:
+                return future
+            future = self._executor.submit(self._refresh, state_code, search_args)
+            self._in_flight[(state_code, key)] = future
+        future.add_done_callback(lambda _f: self._done(state_code, key))
+        return future
+
+    def _done(self, state_code, key):
+        with self._lock:
+            self._in_flight.pop((state_code, key), None)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+def stale_while_revalidate_default():
+    return os.environ.get(SWR_ENV, "0") not in ("", "0", "false", "no")
+
+
+def refresh_args(search_args):
+    """
+    search_args for a background refresh: the caller's deadline, event loop,
+    page pool and locator callback are dropped (the caller is gone by the
+    time it runs) and it gets its own SOS_REFRESH_DEADLINE budget.
+    """
+    args = {k: v for k, v in search_args.items() if k not in CALLER_ARGS}
+    args["refresh"] = True
+    args["deadline"] = float(os.environ.get(REFRESH_DEADLINE_ENV) or DEFAULT_REFRESH_DEADLINE)
+    return args
+
+
+def cache_path():
+    path = os.environ.get(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH
+    return None if path.lower() == "off" else path
+
+
+_negative_cache = None
+_cache_lock = threading.Lock()
+
+def get_negative_cache():
+    """Returns the process-wide negative cache, or None if caching is off."""
+    global _negative_cache
+    path = cache_path()
+    if path is None:
+        return None
+    with _cache_lock:
+        if _negative_cache is None or _negative_cache.path != path:
+            _negative_cache = NegativeCache(path)
+        return _negative_cache
+
+
+_result_cache = None
+
+def get_result_cache():
+    """Returns the process-wide result cache, or None if caching is off."""
+    global _result_cache
+    path = cache_path()
+    if path is None:
+        return None
+    with _cache_lock:
+        if _result_cache is None or _result_cache.path != path:
+            _result_cache = ResultCache(path)
+        return _result_cache
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
+
+from state_stats import order_states
+from circuit_breaker import get_circuit_breakers
+from telemetry import get_span_recorder
+from metrics import REGISTRY, start_exporters
+from chrome_trace import chrome_trace
+from traffic_capture import serve_replay
+from memory_profile import get_memory_profiler
+from Main import STATE_SEARCH_FUNCTIONS, search_business_by_state, search_first_hits, stream_search_states
+
+# Long-running local search service. Everything is imported once at startup and
+# the warm page pool (when Playwright is available) keeps search forms open
+# between requests, so callers skip the cold start of the one-shot scripts.
+#
+#   GET  /health        service status and per-state circuit breaker health
+#   GET  /states
+#   POST /search        {"state": "ny", "entity_name": "..."}        -> result
+#   POST /search/multi  {"states": ["ny", "hi"], "entity_name": "..."} -> {state: result}
+#   POST /search/stream same body as /search/multi; one {"state", "result", "elapsed"}
+#                       line per state as it finishes (NDJSON, or Server-Sent
+#                       Events when the request has Accept: text/event-stream)
+#   POST /search/first  same body plus "hits" (default 1) and "deadline" (seconds);
+#                       returns once that many states matched, cancelling the rest
+#   POST /jobs          {"searches": [{"state": "ny", "entity_name": "..."}, ...]} -> {"job_id": ...}
+#   GET  /jobs/<id>     -> job status and results so far (kept SOS_SERVICE_JOB_TTL
+#                       seconds after the job finishes, default 1 hour)
+#   GET  /spans         recorded phase spans, filtered by ?state=&lookup=&phase=
+#   GET  /spans/summary per-state, per-phase totals
+#   GET  /trace         recorded spans as a Chrome trace (chrome://tracing, Perfetto)
+#   GET  /metrics       Prometheus text (see metrics.py)
+#   GET  /memory        per-engine and per-state lookup footprints (memory_profile.py)
+#
+# "states" may be omitted for /search/multi to search every state. Any other
+# keys in the body are passed through as search_args.
+HOST_ENV = "SOS_SERVICE_HOST"
+PORT_ENV = "SOS_SERVICE_PORT"
+CONCURRENCY_ENV = "SOS_SERVICE_CONCURRENCY"  # scrapes running at once, default 10
+JOB_TTL_ENV = "SOS_SERVICE_JOB_TTL"          # seconds a finished job stays readable, default 3600
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_FINISHED_JOBS = 1000   # oldest finished jobs beyond this are dropped even within the TTL
+REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON.")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object.")
+        return data
+
+
+async def read_request(reader):
+    """Parses one HTTP/1.1 request from the stream, or returns None on EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length header.")
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length header.")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return Request(method.upper(), url.path.rstrip("/") or "/", url.query, headers, body)
+
+
+def encode_response(status, payload):
+    """JSON response, or plain text when payload is already a string."""
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, indent=2).encode("utf-8"), "application/json"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+class SearchService:
+    def __init__(self, concurrency=None, warm_pool=True):
+        self.concurrency = concurrency or int(os.environ.get(CONCURRENCY_ENV, "10"))
+        self.job_ttl = float(os.environ.get(JOB_TTL_ENV) or 3600)
+        self.warm_pool = warm_pool
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="search"
+        )
+        self.page_pool = None
+        self.jobs = {}
+        self._job_tasks = set()
+        self.loop = None
+        self.server = None
+
+    # --- lifecycle ---
+    async def start(self, host, port):
+        self.loop = asyncio.get_running_loop()
+        if self.warm_pool:
+            try:
+                from page_pool import WarmPagePool
+                self.page_pool = await WarmPagePool().start()
+            except Exception as e:
+                print(f"Warm page pool unavailable, searches will launch their own browsers: {e}")
+                self.page_pool = None
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.page_pool:
+            await self.page_pool.close()
+        self.executor.shutdown(wait=False)
+
+    # --- searching ---
+    def build_search_args(self, body):
+        search_args = {k: v for k, v in body.items() if k not in ("state", "states", "searches")}
+        search_args["event_loop"] = self.loop
+        if self.page_pool:
+            search_args["page_pool"] = self.page_pool
+        return search_args
+
+    async def search(self, state_code, search_args):
+        """Runs one state's search on the worker pool, never raising."""
+        try:
+            return await self.loop.run_in_executor(
+                self.executor, search_business_by_state, state_code, search_args
+            )
+        except Exception as e:
+            return {"error": f"An unexpected error occurred: {e}"}
+
+    async def search_many(self, state_codes, search_args):
+        state_codes = order_states(state_codes, "makespan")
+        results = await asyncio.gather(*(self.search(code, dict(search_args)) for code in state_codes))
+        return dict(zip(state_codes, results))
+
+    def resolve_states(self, body):
+        states = body.get("states")
+        if states is None:
+            return list(STATE_SEARCH_FUNCTIONS)
+        if not isinstance(states, list) or not states:
+            raise HTTPError(400, "'states' must be a non-empty list of state codes.")
+        states = [str(s).lower() for s in states]
+        unknown = [s for s in states if s not in STATE_SEARCH_FUNCTIONS]
+        if unknown:
+            raise HTTPError(400, f"Unsupported states: {', '.join(s.upper() for s in unknown)}")
+        return states
+
+    async def stream(self, writer, request):
+        """
+        Writes per-state results as they complete, as chunked NDJSON or SSE.
+        Once the headers are out an error can't become a 500, so it is sent
+        as a final {"error": ...} record ("error" event with SSE) instead.
+        """
+        body = request.json()
+        state_codes = self.resolve_states(body)
+        search_args = self.build_search_args(body)
+        sse = "text/event-stream" in request.headers.get("accept", "")
+
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {'text/event-stream' if sse else 'application/x-ndjson'}\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+
+        def chunk(data):
+            return f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n"
+
+        results = stream_search_states(state_codes, search_args, run=self.search, max_concurrency=self.concurrency)
+        try:
+            try:
+                async for item in results:
+                    line = json.dumps(item)
+                    data = f"event: result\ndata: {line}\n\n" if sse else line + "\n"
+                    writer.write(chunk(data.encode("utf-8")))
+                    await writer.drain()
+            except ConnectionError:
+                raise
+            except Exception as e:
+                line = json.dumps({"error": f"An unexpected error occurred: {e}"})
+                writer.write(chunk((f"event: error\ndata: {line}\n\n" if sse else line + "\n").encode("utf-8")))
+            else:
+                if sse:
+                    writer.write(chunk(b"event: done\ndata: {}\n\n"))
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            await results.aclose()
+
+    # --- batch jobs ---
+    def prune_jobs(self):
+        """Drops finished jobs older than the TTL, and the oldest beyond MAX_FINISHED_JOBS."""
+        now = time.time()
+        finished = sorted((job["finished_at"], job_id) for job_id, job in self.jobs.items() if job["finished_at"])
+        for i, (finished_at, job_id) in enumerate(finished):
+            if now - finished_at > self.job_ttl or i < len(finished) - MAX_FINISHED_JOBS:
+                del self.jobs[job_id]
+
+    def submit_job(self, searches):
+        self.prune_jobs()
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "running",
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "total": len(searches),
+            "completed": 0,
+            "results": [None] * len(searches),
+        }
+        self.jobs[job_id] = job
+
+        async def run_one(i, item):
+            state_code = str(item.get("state", "")).lower()
+            result = await self.search(state_code, self.build_search_args(item))
+            job["results"][i] = {"state": state_code, "result": result}
+            job["completed"] += 1
+
+        async def run_all():
+            await asyncio.gather(*(run_one(i, item) for i, item in enumerate(searches)))
+            job["status"] = "done"
+            job["finished_at"] = time.time()
+            self.prune_jobs()
+
+        task = asyncio.create_task(run_all())
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+        return job
+
+    # --- routing ---
+    async def route(self, request):
+        if request.path == "/health":
+            breakers = get_circuit_breakers()
+            return 200, {"status": "ok", "jobs": len(self.jobs),
+                         "states": breakers.health() if breakers else {}}
+
+        if request.path == "/states":
+            return 200, {"states": sorted(STATE_SEARCH_FUNCTIONS)}
+
+        if request.path == "/metrics":
+            return 200, REGISTRY.prometheus_text()
+
+        if request.path == "/memory":
+            profiler = get_memory_profiler()
+            if not profiler:
+                raise HTTPError(404, "Memory profiling is off.")
+            return 200, profiler.report()
+
+        if request.path in ("/spans", "/spans/summary", "/trace"):
+            recorder = get_span_recorder()
+            if not recorder:
+                raise HTTPError(404, "Span recording is off.")
+            query = {k: v[-1] for k, v in parse_qs(request.query).items()}
+            if request.path == "/spans/summary":
+                return 200, recorder.summary(state=query.get("state"))
+            if request.path == "/trace":
+                return 200, chrome_trace(recorder.query(state=query.get("state")))
+            return 200, {"spans": recorder.query(
+                state=query.get("state"), lookup_id=query.get("lookup"), phase=query.get("phase"))}
+
+        if request.path == "/search":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST.")
+            body = request.json()
+            state_code = str(body.get("state", "")).lower()
+            if state_code not in STATE_SEARCH_FUNCTIONS:
+                raise HTTPError(400, f"State {state_code.upper() or '(missing)'} is not supported.")
+            return 200, await self.search(state_code, self.build_search_args(body))
+
+        if request.path == "/search/multi":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST.")
+            body = request.json()
+            return 200, await self.search_many(self.resolve_states(body), self.build_search_args(body))
+
+        if request.path == "/search/first":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST.")
+            body = request.json()
+            try:
+                hits = int(body.pop("hits", 1))
+                deadline = body.pop("deadline", None)
+                deadline = float(deadline) if deadline is not None else None
+            except (TypeError, ValueError):
+                raise HTTPError(400, "'hits' must be an integer and 'deadline' a number of seconds.")
+            search_args = self.build_search_args(body)
+            return 200, await search_first_hits(
+                self.resolve_states(body), search_args, hits=hits, deadline=deadline,
+                max_concurrency=self.concurrency,
+            )
+
+        if request.path == "/jobs":
+            if request.method != "POST":
+                raise HTTPError(405, "Use POST.")
+            searches = request.json().get("searches")
+            if not isinstance(searches, list) or not searches:
+                raise HTTPError(400, "'searches' must be a non-empty list.")
+            for item in searches:
+                if not isinstance(item, dict) or str(item.get("state", "")).lower() not in STATE_SEARCH_FUNCTIONS:
+                    raise HTTPError(400, f"Invalid search entry: {item!r}")
+            job = self.submit_job(searches)
+            return 202, {"job_id": job["job_id"], "total": job["total"]}
+
+        if request.path.startswith("/jobs/"):
+            self.prune_jobs()
+            job = self.jobs.get(request.path[len("/jobs/"):])
+            if job is None:
+                raise HTTPError(404, "No such job.")
+            return 200, job
+
+        raise HTTPError(404, f"No route for {request.path}.")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    return
+                if request.path == "/search/stream":
+                    if request.method != "POST":
+                        raise HTTPError(405, "Use POST.")
+                    await self.stream(writer, request)
+                    return
+                status, payload = await self.route(request)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except Exception as e:
+                status, payload = 500, {"error": f"An unexpected error occurred: {e}"}
+            writer.write(encode_response(status, payload))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, warm_pool=True):
+    start_exporters()
+    serve_replay()
+    service = await SearchService(warm_pool=warm_pool).start(host, port)
+    print(f"Search service listening on http://{host}:{port}")
+    try:
+        async with service.server:
+            await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local business search service.")
+    parser.add_argument("--host", default=os.environ.get(HOST_ENV, "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get(PORT_ENV, "8765")))
+    parser.add_argument("--no-warm-pool", action="store_true", help="don't pre-open search forms")
+    args = parser.parse_args()
+
+    if os.name == 'nt':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(serve(args.host, args.port, warm_pool=not args.no_warm_pool))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import concurrent.futures
+import copy
+import json
+import threading
+
+from cancellation import ScrapeCancelled
+from locator_index import normalize_name
+
+# search_args entries that are per-caller plumbing rather than part of the query
+NON_QUERY_ARGS = {
+    "page_pool", "event_loop", "on_locator", "refresh", "stale_while_revalidate", "deadline", "retries", "hedge",
+}
+
+
+def flight_key(state_code, search_args):
+    """Identity of a lookup: state plus its normalized, JSON-able arguments."""
+    query = {}
+    for name, value in search_args.items():
+        if name in NON_QUERY_ARGS or callable(value):
+            continue
+        if name == "entity_name":
+            value = normalize_name(value)
+        elif isinstance(value, str):
+            value = value.strip()
+        query[name] = value
+    return state_code.lower() + "|" + json.dumps(query, sort_keys=True, default=repr)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs the
+    function, everyone who arrives while it is running waits for and gets a
+    copy of the same result (or exception).
+
+    Callers can differ in budget (deadline, cancel scope), which is not part
+    of the key. An outcome that reflects only the leader's budget - a
+    ScrapeCancelled, or a result shareable(result) rejects - is not handed
+    on: each waiting caller runs its own fn instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, shareable=None):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._calls[key] = future
+
+        if not leader:
+            try:
+                result = future.result()
+            except ScrapeCancelled:
+                return fn()
+            if shareable is not None and not shareable(result):
+                return fn()
+            return copy.deepcopy(result)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+import time
+
+# Per-state history used to order multi-state fan-outs: how long a live
+# search usually takes, how often it fails, and how often it finds the
+# entity. Set SOS_STATE_STATS to a file path to move it, or "off" to disable.
+STATS_PATH_ENV = "SOS_STATE_STATS"
+DEFAULT_STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state_stats.sqlite3")
+
+EWMA_WEIGHT = 0.2          # weight of the newest latency sample
+DEFAULT_LATENCY = 60.0     # seconds assumed for a state with no history
+HIT_PRIOR = (1, 4)         # (hits, runs) pseudo-counts: unknown states start at 25%
+LATENCY_SAMPLES = 200      # recent latencies kept per state for quantiles
+
+
+class StateStats:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS state_stats ("
+                " state TEXT PRIMARY KEY, runs INTEGER NOT NULL, errors INTEGER NOT NULL,"
+                " hits INTEGER NOT NULL, latency REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS latency_samples ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, state TEXT NOT NULL, seconds REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS latency_samples_state ON latency_samples (state, id)")
+
+    def record(self, state_code, seconds, outcome):
+        """outcome is "hit", "miss" (searched fine, no such entity) or "error"."""
+        state_code = state_code.lower()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT runs, errors, hits, latency FROM state_stats WHERE state = ?", (state_code,)
+            ).fetchone()
+            runs, errors, hits, latency = row or (0, 0, 0, seconds)
+            latency = latency + EWMA_WEIGHT * (seconds - latency) if row else seconds
+            self._conn.execute(
+                "INSERT OR REPLACE INTO state_stats (state, runs, errors, hits, latency, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (state_code, runs + 1, errors + (outcome == "error"), hits + (outcome == "hit"),
+                 latency, time.time()),
+            )
+            self._conn.execute(
+                "INSERT INTO latency_samples (state, seconds) VALUES (?, ?)", (state_code, seconds)
+            )
+            self._conn.execute(
+                "DELETE FROM latency_samples WHERE state = ? AND id <= ("
+                " SELECT id FROM latency_samples WHERE state = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (state_code, state_code, LATENCY_SAMPLES),
+            )
+
+    def latency_quantile(self, state_code, q, min_samples=5):
+        """q-quantile (0..1) of the state's recent latencies, or None with too little history."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seconds FROM latency_samples WHERE state = ?", (state_code.lower(),)
+            ).fetchall()
+        if len(rows) < min_samples:
+            return None
+        samples = sorted(r[0] for r in rows)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self):
+        """{state: {"runs", "errors", "hits", "latency", "success_rate", "hit_rate"}}"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, runs, errors, hits, latency FROM state_stats").fetchall()
+        stats = {}
+        for state, runs, errors, hits, latency in rows:
+            stats[state] = {
+                "runs": runs,
+                "errors": errors,
+                "hits": hits,
+                "latency": latency,
+                "success_rate": (runs - errors) / runs if runs else 1.0,
+                "hit_rate": (hits + HIT_PRIOR[0]) / (runs + HIT_PRIOR[1]),
+            }
+        return stats
+
+    def order(self, state_codes, mode="makespan"):
+        """
+        Orders states for a fan-out.
+
+        "makespan": longest expected latency first, so the slow portals start
+        while the fast ones fill the remaining worker slots.
+        "first_hits": most likely to find the entity per second of expected
+        work first, for runs that stop after a few hits.
+        """
+        stats = self.snapshot()
+        known = [s["latency"] for s in stats.values()]
+        default_latency = sorted(known)[len(known) // 2] if known else DEFAULT_LATENCY
+        default_hit_rate = HIT_PRIOR[0] / HIT_PRIOR[1]
+
+        def expected_latency(code):
+            return stats[code]["latency"] if code in stats else default_latency
+
+        def hit_value(code):
+            s = stats.get(code)
+            hit_rate = s["hit_rate"] * s["success_rate"] if s else default_hit_rate
+            return hit_rate / max(expected_latency(code), 0.1)
+
+        codes = [c.lower() for c in state_codes]
+        if mode == "first_hits":
+            return sorted(codes, key=hit_value, reverse=True)
+        return sorted(codes, key=expected_latency, reverse=True)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+def get_state_stats():
+    """Returns the process-wide stats store, or None if it has been disabled."""
+    global _stats
+    path = os.environ.get(STATS_PATH_ENV) or DEFAULT_STATS_PATH
+    if path.lower() == "off":
+        return None
+    with _stats_lock:
+        if _stats is None or _stats.path != path:
+            _stats = StateStats(path)
+        return _stats
+
+def order_states(state_codes, mode="makespan"):
+    """order() on the shared store; the input order if stats are disabled."""
+    stats = get_state_stats()
+    return stats.order(state_codes, mode) if stats else [c.lower() for c in state_codes]
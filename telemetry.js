@@ -0,0 +1,63 @@
+// Phase spans for the Node scrapers. Each span is written to stderr as one
+// "@@SPAN <json>" line; node_runner.py records them against the current
+// lookup (see telemetry.py) and strips them from the stderr it returns.
+const { redirectPage } = require('./portal_urls');
+const { recordPage } = require('./capture');
+
+const PREFIX = '@@SPAN ';
+const scriptStart = Date.now();
+let firstPage = true;
+
+const emit = (phase, start, outcome, bytes) => {
+    const span = { phase, start: start / 1000, duration: (Date.now() - start) / 1000, outcome };
+    if (bytes !== undefined) span.bytes = bytes;
+    process.stderr.write(PREFIX + JSON.stringify(span) + '\n');
+};
+
+// Times fn() as one phase; the outcome is the error's name if it throws.
+const span = async (phase, fn) => {
+    const start = Date.now();
+    try {
+        const result = await fn();
+        emit(phase, start, 'ok');
+        return result;
+    } catch (e) {
+        emit(phase, start, (e && e.name) || 'Error');
+        throw e;
+    }
+};
+
+// Works with Puppeteer and Playwright pages: reports script start-up (Node plus
+// browser launch) once, then every goto() as a "navigate" span with the bytes
+// received while it ran. Also points the page at the portal override, if any
+// (portal_urls.js), and records its traffic when capturing (capture.js);
+// goto() waits for the override to be in place.
+const instrumentPage = (page) => {
+    if (firstPage) {
+        firstPage = false;
+        emit('launch', scriptStart, 'ok');
+    }
+    let received = 0;
+    page.on('response', (response) => {
+        try { received += parseInt(response.headers()['content-length'] || '0', 10) || 0; } catch (e) { /* ignore */ }
+    });
+    recordPage(page);
+    const redirected = redirectPage(page);
+    const goto = page.goto.bind(page);
+    page.goto = async (url, options) => {
+        await redirected;
+        const start = Date.now();
+        const before = received;
+        try {
+            const response = await goto(url, options);
+            emit('navigate', start, 'ok', received - before);
+            return response;
+        } catch (e) {
+            emit('navigate', start, (e && e.name) || 'Error', received - before);
+            throw e;
+        }
+    };
+    return page;
+};
+
+module.exports = { span, instrumentPage };
@@ -0,0 +1,251 @@
+import collections
+import contextlib
+import contextvars
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+
+# Per-phase spans for state lookups. Each live search runs inside lookup_context(),
+# which gives it an id; the engines open span(state, phase) around their
+# phases (browser launch, navigation, HTTP calls, result/detail waits,
+# parsing) and the Node wrappers report theirs over stderr (see telemetry.js
+# and node_runner.py). Spans carry start time, duration, bytes and outcome,
+# are kept in an in-memory ring for querying, and with SOS_SPAN_FILE set are
+# also appended to that file as NDJSON. SOS_SPANS=off turns recording off.
+SPANS_ENV = "SOS_SPANS"
+SPAN_FILE_ENV = "SOS_SPAN_FILE"
+BUFFER_ENV = "SOS_SPAN_BUFFER"
+
+DEFAULT_BUFFER = 20000
+NODE_SPAN_PREFIX = "@@SPAN "   # stderr line prefix used by telemetry.js
+
+
+class Span:
+    __slots__ = ("lookup_id", "state", "phase", "start", "duration", "bytes", "outcome", "thread", "attrs")
+
+    def __init__(self, state, phase, lookup_id=None, start=None, attrs=None):
+        self.lookup_id = lookup_id
+        self.state = state
+        self.phase = phase
+        self.start = time.time() if start is None else start
+        self.duration = None
+        self.bytes = None
+        self.outcome = "ok"
+        self.thread = threading.current_thread().name
+        self.attrs = attrs or {}
+
+    def add_bytes(self, count):
+        self.bytes = (self.bytes or 0) + count
+
+    def as_dict(self):
+        span = {name: getattr(self, name) for name in self.__slots__ if name != "attrs"}
+        span.update(self.attrs)
+        return span
+
+
+class SpanRecorder:
+    def __init__(self, maxlen=DEFAULT_BUFFER, path=None):
+        self.path = path
+        self._spans = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self._spans.append(span)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span.as_dict(), default=str) + "\n")
+
+    def query(self, state=None, lookup_id=None, phase=None, since=None):
+        """Recorded spans (as dicts, oldest first) matching all the given filters."""
+        with self._lock:
+            spans = list(self._spans)
+        return [
+            s.as_dict() for s in spans
+            if (state is None or s.state == state.lower())
+            and (lookup_id is None or s.lookup_id == lookup_id)
+            and (phase is None or s.phase == phase)
+            and (since is None or s.start >= since)
+        ]
+
+    def summary(self, state=None):
+        """{state: {phase: {"count", "errors", "total", "mean", "max", "bytes"}}}"""
+        summary = {}
+        for span in self.query(state=state):
+            phase = summary.setdefault(span["state"], {}).setdefault(
+                span["phase"], {"count": 0, "errors": 0, "total": 0.0, "max": 0.0, "bytes": 0}
+            )
+            duration = span["duration"] or 0.0
+            phase["count"] += 1
+            phase["errors"] += span["outcome"] != "ok"
+            phase["total"] += duration
+            phase["max"] = max(phase["max"], duration)
+            phase["bytes"] += span["bytes"] or 0
+        for phases in summary.values():
+            for phase in phases.values():
+                phase["mean"] = phase["total"] / phase["count"]
+        return summary
+
+    def export(self, path, **filters):
+        """Writes the matching spans to path as NDJSON; returns how many were written."""
+        spans = self.query(**filters)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, default=str) + "\n")
+        return len(spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+def get_span_recorder():
+    """Returns the process-wide span recorder, or None if spans are off."""
+    global _recorder
+    if os.environ.get(SPANS_ENV, "").lower() == "off":
+        return None
+    with _recorder_lock:
+        path = os.environ.get(SPAN_FILE_ENV) or None
+        if _recorder is None or _recorder.path != path:
+            _recorder = SpanRecorder(int(os.environ.get(BUFFER_ENV) or DEFAULT_BUFFER), path)
+        return _recorder
+
+
+# ----- Recording -------------------------------------------------------------
+_current_lookup = contextvars.ContextVar("lookup_id", default=None)
+
+def current_lookup():
+    return _current_lookup.get()
+
+@contextlib.contextmanager
+def span(state_code, phase, **attrs):
+    """
+    Times the block as one phase of the current lookup. Set .bytes (or call
+    add_bytes) and .outcome on the yielded span; an exception leaving the
+    block sets the outcome to its class name.
+    """
+    current = Span(state_code.lower(), phase, current_lookup(), attrs=attrs)
+    started = time.monotonic()
+    try:
+        yield current
+    except BaseException as e:
+        current.outcome = type(e).__name__
+        raise
+    finally:
+        current.duration = time.monotonic() - started
+        recorder = get_span_recorder()
+        if recorder:
+            recorder.record(current)
+
+@contextlib.contextmanager
+def lookup_context(state_code, **attrs):
+    """Starts a lookup: spans opened inside share its id. Yields the "lookup" span."""
+    token = _current_lookup.set(uuid.uuid4().hex[:12])
+    try:
+        with span(state_code, "lookup", **attrs) as current:
+            yield current
+    finally:
+        _current_lookup.reset(token)
+
+def record_span(state_code, phase, start, duration, bytes=None, outcome="ok", **attrs):
+    """Records a span timed elsewhere (e.g. reported by a Node script)."""
+    recorder = get_span_recorder()
+    if not recorder:
+        return
+    reported = Span(state_code.lower(), phase, current_lookup(), start=start, attrs=attrs)
+    reported.duration = duration
+    reported.bytes = bytes
+    reported.outcome = outcome
+    recorder.record(reported)
+
+
+def read_node_spans(state_code, stderr):
+    """Records the "@@SPAN {...}" lines a Node script wrote to stderr; returns stderr without them."""
+    if not stderr or NODE_SPAN_PREFIX not in stderr:
+        return stderr
+    kept = []
+    for line in stderr.splitlines(keepends=True):
+        if not line.startswith(NODE_SPAN_PREFIX):
+            kept.append(line)
+            continue
+        try:
+            reported = json.loads(line[len(NODE_SPAN_PREFIX):])
+            record_span(
+                state_code, reported.pop("phase"), reported.pop("start"), reported.pop("duration"),
+                bytes=reported.pop("bytes", None), outcome=reported.pop("outcome", "ok"), **reported
+            )
+        except (ValueError, KeyError, TypeError):
+            kept.append(line)
+    return "".join(kept)
+
+
+# ----- Engine hooks ----------------------------------------------------------
+def instrument_page(state_code, page):
+    """
+    Wraps a Playwright page (sync or async) so every goto() is a "navigate"
+    span carrying the bytes of the responses that arrived meanwhile.
+    """
+    if getattr(page, "_sos_instrumented", False):
+        return page
+    page._sos_instrumented = True
+    received = [0]
+
+    def on_response(response):
+        try:
+            received[0] += int(response.headers.get("content-length") or 0)
+        except (ValueError, AttributeError):
+            pass
+
+    page.on("response", on_response)
+    original_goto = page.goto
+
+    if inspect.iscoroutinefunction(original_goto):
+        async def goto(url, **kwargs):
+            with span(state_code, "navigate", url=url) as current:
+                before = received[0]
+                try:
+                    return await original_goto(url, **kwargs)
+                finally:
+                    current.bytes = received[0] - before
+    else:
+        def goto(url, **kwargs):
+            with span(state_code, "navigate", url=url) as current:
+                before = received[0]
+                try:
+                    return original_goto(url, **kwargs)
+                finally:
+                    current.bytes = received[0] - before
+
+    page.goto = goto
+    return page
+
+def instrument_driver(state_code, driver):
+    """Makes every Selenium driver.get() a "navigate" span."""
+    original_get = driver.get
+
+    def get(url):
+        with span(state_code, "navigate", url=url):
+            return original_get(url)
+
+    driver.get = get
+    return driver
+
+def instrument_session(state_code, session):
+    """Records every response of a requests session as an "http" span."""
+    def on_response(response, *args, **kwargs):
+        elapsed = response.elapsed.total_seconds()
+        record_span(
+            state_code, "http", time.time() - elapsed, elapsed,
+            bytes=int(response.headers.get("content-length") or 0) or None,
+            outcome="ok" if response.ok else f"http_{response.status_code}",
+            url=response.url,
+        )
+
+    session.hooks.setdefault("response", []).append(on_response)
+    return session
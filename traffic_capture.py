@@ -0,0 +1,129 @@
+import base64
+import json
+import os
+import threading
+import uuid
+
+from portal_urls import PORTAL_BASE_ENV, original_url, portal_base
+
+# Record/replay of portal traffic, for deterministic regression and
+# performance runs without the live sites.
+#   SOS_CAPTURE=record  every request a lookup makes is saved under
+#                       SOS_CAPTURE_DIR (default ./captures):
+#       requests (CT, HI, NY, KY, WI)  <dir>/<state>.ndjson
+#       Node scripts (capture.js)      <dir>/<state>.ndjson
+#       Playwright                     one HAR per context, <dir>/<state>-<id>.har
+#     Selenium traffic is not captured (WebDriver has no network hook).
+#   SOS_CAPTURE=replay  serve_replay() starts the mock portal
+#                       (benchmarks/mock_portal.py) on the captures and points
+#                       SOS_PORTAL_BASE_URL at it, so every engine loads from disk.
+# The .ndjson lines are in the mock portal's fixture format, so a capture
+# directory can also be copied into benchmarks/fixtures as it is.
+CAPTURE_ENV = "SOS_CAPTURE"
+CAPTURE_DIR_ENV = "SOS_CAPTURE_DIR"
+CAPTURE_STATE_ENV = "SOS_CAPTURE_STATE"   # tells the Node scripts which state they record
+DEFAULT_CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "captures")
+
+TEXT_TYPES = ("text/", "json", "javascript", "xml", "x-www-form-urlencoded")
+# The recorded body is stored decoded, so these would describe it wrongly
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_write_lock = threading.Lock()
+
+
+def capture_mode():
+    mode = (os.environ.get(CAPTURE_ENV) or "").lower()
+    return mode if mode in ("record", "replay") else None
+
+def capture_dir():
+    return os.path.abspath(os.environ.get(CAPTURE_DIR_ENV) or DEFAULT_CAPTURE_DIR)
+
+def recording():
+    return capture_mode() == "record"
+
+
+# ----- Recording -------------------------------------------------------------
+def _real_url(url):
+    base = portal_base()
+    return original_url(url[len(base):]) if base and url.startswith(base + "/") else url
+
+def exchange_entry(state_code, method, url, request_body, status, headers, body):
+    """One request/response pair in the mock portal's fixture format."""
+    entry = {"state": state_code, "method": method.upper(), "url": _real_url(url), "status": status,
+             "headers": {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}}
+    if request_body:
+        entry["request_body"] = request_body.decode("utf-8", "replace") if isinstance(request_body, bytes) else request_body
+    content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+    if any(kind in content_type for kind in TEXT_TYPES):
+        try:
+            entry["body"] = body.decode("utf-8")
+            return entry
+        except UnicodeDecodeError:
+            pass
+    entry["body_base64"] = base64.b64encode(body).decode("ascii")
+    return entry
+
+def record_exchange(state_code, entry):
+    """Appends an exchange to <capture dir>/<state>.ndjson."""
+    path = os.path.join(capture_dir(), f"{state_code.lower()}.ndjson")
+    line = json.dumps(entry) + "\n"
+    with _write_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+def record_response(state_code, response):
+    """Records a requests Response (and the request that produced it)."""
+    request = response.request
+    record_exchange(state_code, exchange_entry(
+        state_code, request.method, response.url, request.body,
+        response.status_code, dict(response.headers), response.content,
+    ))
+
+
+def capture_hooks(state_code):
+    """hooks= argument for one-off requests.get/post calls: records the response when recording."""
+    if not recording():
+        return {}
+    return {"response": lambda response, *args, **kwargs: record_response(state_code, response)}
+
+def capture_session(state_code, session):
+    """Records every response of a requests session when recording."""
+    if recording():
+        session.hooks.setdefault("response", []).append(
+            lambda response, *args, **kwargs: record_response(state_code, response))
+    return session
+
+
+def har_options(state_code):
+    """Playwright context options that record a HAR of the context when recording."""
+    if not recording():
+        return {}
+    os.makedirs(capture_dir(), exist_ok=True)
+    return {"record_har_path": os.path.join(capture_dir(), f"{state_code.lower()}-{uuid.uuid4().hex[:12]}.har")}
+
+def capture_env(state_code):
+    """Environment for a Node script, so capture.js records the state's traffic when recording."""
+    if not recording():
+        return {}
+    return {CAPTURE_STATE_ENV: state_code.lower(), CAPTURE_DIR_ENV: capture_dir()}
+
+
+# ----- Replay ----------------------------------------------------------------
+_replay_server = None
+
+def serve_replay(latency=0.0):
+    """
+    In replay mode, starts the mock portal on the capture directory (once per
+    process) and sets SOS_PORTAL_BASE_URL. Returns the server, or None when
+    not replaying or an override is already set.
+    """
+    global _replay_server
+    if capture_mode() != "replay" or (portal_base() and _replay_server is None):
+        return _replay_server
+    if _replay_server is None:
+        from benchmarks.mock_portal import MockPortal, load_exchanges
+        _replay_server = MockPortal(load_exchanges(capture_dir()), latency=latency).start()
+        os.environ[PORTAL_BASE_ENV] = _replay_server.base_url
+        print(f"Replaying {len(_replay_server.index)} captured responses from {capture_dir()}")
+    return _replay_server
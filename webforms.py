@@ -0,0 +1,140 @@
+import re
+import requests
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from portal_urls import override_session
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+# Matches javascript:__doPostBack('ctl00$MainContent$gvSearchResults','Select$0')
+DO_POSTBACK_PATTERN = re.compile(r"__doPostBack\(\s*['\"]([^'\"]*)['\"]\s*,\s*['\"]([^'\"]*)['\"]\s*\)")
+
+
+class WebFormsError(Exception):
+    """Raised when a page does not look like the WebForms page we expected."""
+
+
+class WebFormsClient:
+    """
+    A small HTTP client for ASP.NET WebForms portals.
+
+    It keeps one requests.Session (so ASP.NET_SessionId and other cookies carry
+    across requests), remembers the last page it loaded, and re-posts every
+    hidden field (__VIEWSTATE, __EVENTVALIDATION, ...) on the next postback the
+    same way the browser would.
+    """
+
+    def __init__(self, session=None, timeout=30, headers=None):
+        self.session = override_session(session or requests.Session())
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.timeout = timeout
+        self.url = None
+        self.html = ""
+        self.soup = None
+
+    # ----- Page loading ------------------------------------------------------
+    def _load(self, response):
+        if response.status_code != 200 or not response.text:
+            raise WebFormsError(f"Unexpected response ({response.status_code}) from {response.url}.")
+        self.url = response.url
+        self.html = response.text
+        self.soup = BeautifulSoup(response.text, "html.parser")
+        return self.soup
+
+    def get(self, url):
+        """Loads a page with GET and makes it the current page."""
+        return self._load(self.session.get(url, timeout=self.timeout))
+
+    def follow(self, href):
+        """Follows a results-grid link, whether it is a plain href or a __doPostBack call."""
+        if not href:
+            raise WebFormsError("Cannot follow an empty link.")
+        m = DO_POSTBACK_PATTERN.search(href)
+        if m:
+            return self.postback(m.group(1), m.group(2))
+        return self.get(urljoin(self.url, href))
+
+    # ----- Form handling -----------------------------------------------------
+    def _form(self):
+        if self.soup is None:
+            raise WebFormsError("No page has been loaded yet.")
+        form = self.soup.find("form")
+        if form is None:
+            raise WebFormsError(f"No <form> found on {self.url}.")
+        return form
+
+    def form_fields(self):
+        """
+        Harvests the fields a browser would post for the current form: hidden
+        inputs (view state, event validation), text inputs, checked boxes and
+        the selected option of every <select>. Submit buttons are left out; only
+        the one that was "clicked" gets posted.
+        """
+        fields = {}
+        form = self._form()
+        for inp in form.find_all("input"):
+            name = inp.get("name")
+            if not name:
+                continue
+            input_type = (inp.get("type") or "text").lower()
+            if input_type in ("submit", "button", "image", "reset", "file"):
+                continue
+            if input_type in ("checkbox", "radio") and not inp.has_attr("checked"):
+                continue
+            fields[name] = inp.get("value", "")
+        for select in form.find_all("select"):
+            name = select.get("name")
+            if not name:
+                continue
+            option = select.find("option", selected=True) or select.find("option")
+            if option is not None:
+                fields[name] = option.get("value", option.get_text(strip=True))
+        for textarea in form.find_all("textarea"):
+            if textarea.get("name"):
+                fields[textarea["name"]] = textarea.get_text()
+        return fields
+
+    def option_value(self, select_name, label_or_value):
+        """Resolves a <select> option by its value or visible label, like Playwright's select_option."""
+        select = self._form().find("select", attrs={"name": select_name})
+        if select is None:
+            raise WebFormsError(f"Select '{select_name}' not found on {self.url}.")
+        for option in select.find_all("option"):
+            value = option.get("value", option.get_text(strip=True))
+            if label_or_value in (value, option.get_text(strip=True)):
+                return value
+        raise WebFormsError(f"Option '{label_or_value}' not found in '{select_name}'.")
+
+    def _post(self, fields):
+        form = self._form()
+        action = urljoin(self.url, form.get("action") or self.url)
+        headers = {"Referer": self.url, "Content-Type": "application/x-www-form-urlencoded"}
+        return self._load(self.session.post(action, data=fields, headers=headers, timeout=self.timeout))
+
+    def submit(self, values=None, button=None):
+        """
+        Posts the current form back with `values` layered over the harvested
+        fields. `button` is the name attribute of the submit button to "click".
+        """
+        fields = self.form_fields()
+        fields.update(values or {})
+        if button:
+            btn = self._form().find("input", attrs={"name": button})
+            if btn is None:
+                raise WebFormsError(f"Button '{button}' not found on {self.url}.")
+            fields[button] = btn.get("value", "")
+        return self._post(fields)
+
+    def postback(self, event_target, event_argument="", values=None):
+        """Triggers a __doPostBack(event_target, event_argument) on the current form."""
+        fields = self.form_fields()
+        fields.update(values or {})
+        fields["__EVENTTARGET"] = event_target
+        fields["__EVENTARGUMENT"] = event_argument
+        return self._post(fields)